@@ -13,12 +13,22 @@ def create_app(config_name='default'):
     """应用工厂函数"""
     app = Flask(__name__)
 
+    # 上传文件在表单解析时边接收边校验（类型、文件头、大小）
+    from app.utils.upload_validation import UploadRequest
+    app.request_class = UploadRequest
+
     # 加载配置
     app.config.from_object(config[config_name])
+
+    # 部署在反向代理之后时，request.remote_addr 取代理转发的客户端IP
+    proxy_count = app.config.get('TRUSTED_PROXY_COUNT', 0)
+    if proxy_count:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_count, x_proto=proxy_count)
     
-    # 设置JSON中文编码
-    app.config['JSON_AS_ASCII'] = False
-    app.config['JSONIFY_MIMETYPE'] = 'application/json; charset=utf-8'
+    # JSON序列化：优先使用 orjson，未安装时使用标准库（中文不转义）
+    from app.utils.json_provider import init_json_provider
+    init_json_provider(app)
 
     # 配置日志系统 - 输出到控制台
     if not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
@@ -48,10 +58,26 @@ def create_app(config_name='default'):
     db.init_app(app)
     CORS(app, origins=app.config['CORS_ORIGINS'], supports_credentials=True)
 
+    # 初始化密码哈希配置（BCRYPT_ROUNDS=auto 时校准工作因子）
+    from app.utils.password_utils import init_password_hashing
+    init_password_hashing(app)
+
+    # 编译业务校验规则
+    from app.services.validation_service import init_loan_rules
+    init_loan_rules(app)
+
+    # 请求阶段计时（Server-Timing 头与结构化日志）和采样性能分析
+    from app.utils.timing import init_request_timing
+    init_request_timing(app)
+
     # 注册蓝图
     from app.api.auth_controller import auth_bp
     from app.api.loan_controller import loan_bp
     app.register_blueprint(auth_bp)
     app.register_blueprint(loan_bp)
 
+    # 注册命令行命令
+    from app.commands import register_commands
+    register_commands(app)
+
     return app
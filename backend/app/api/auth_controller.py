@@ -7,12 +7,13 @@ from app.schemas.user_schema import (
     UserResponseSchema
 )
 from app.services.auth_service import AuthService
-from app.utils.jwt_utils import token_required
+from app.utils.jwt_utils import token_required, invalidate_token
 from app.utils.response import ApiResponse
 from app.utils.exceptions import (
     BaseException as CustomBaseException,
     BadRequestException,
     ForbiddenException,
+    TooManyRequestsException,
     UnauthorizedException
 )
 
@@ -28,7 +29,7 @@ def login():
         data = request.get_json() or {}
         login_data = UserLoginSchema(**data)
 
-        result = AuthService.login_user(login_data)
+        result = AuthService.login_user(login_data, client_ip=request.remote_addr)
 
         return ApiResponse.success(
             data={
@@ -48,6 +49,10 @@ def login():
         logger.warning(f"登录认证失败: {e.message}")
         return ApiResponse.auth_error(e.message)
 
+    except TooManyRequestsException as e:
+        logger.warning(f"登录请求被拒绝: {e.message}")
+        return ApiResponse.rate_limit_error(e.message)
+
     except CustomBaseException as e:
         logger.error(f"登录业务错误: {e.message}")
         return ApiResponse.error(msg=e.message)
@@ -67,6 +72,9 @@ def logout():
         user_id = request.current_user.get('user_id')
         user = AuthService.get_current_user_info(user_id)
 
+        # 移除已验证Token缓存，后续请求重新完整校验
+        invalidate_token(getattr(request, 'current_token', None))
+
         return ApiResponse.success(
             data={'username': user.user_name},
             msg='成功退出登录'
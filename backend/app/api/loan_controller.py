@@ -1,107 +1,45 @@
 """
 贷款申请相关的API控制器
 """
-from flask import Blueprint, request
+from flask import Blueprint, Response, request, current_app, make_response, stream_with_context
 from app.services.loan_service import LoanService
+from app.services.loan_export_service import EXPORT_CONTENT_TYPES, LoanExportService
+from app.services.loan_import_service import LoanImportService
+from app.services.storage_service import StorageService
+from app.services.upload_session_service import UploadSessionService
 from app.utils.jwt_utils import token_required
 from app.utils.response import ApiResponse
-from pydantic import ValidationError
-from app.schemas.loan_schema import LoanApplicationCreate
+from app.utils.timing import phase
+from app.utils.exceptions import (
+    BaseException as CustomBaseException,
+    BadRequestException,
+    ConflictException,
+    FileValidationException,
+    ForbiddenException,
+    NotFoundException,
+    TooManyRequestsException
+)
+from app.services.validation_service import (
+    load_receipted_loan_data,
+    sign_loan_receipt,
+    validate_loan_batch,
+    validate_loan_data,
+    with_file_placeholders
+)
 
 
 # 创建蓝图
 loan_bp = Blueprint('loan', __name__, url_prefix='/api/loan')
 
 
-def format_validation_errors(validation_errors):
+def is_flag_disabled(value):
     """
-    格式化Pydantic验证错误列表
+    判断表单开关参数是否为关闭状态
     
-    :param validation_errors: Pydantic ValidationError的errors()列表
-    :return: 格式化后的错误列表
+    :param value: 参数值（未传时为None）
+    :return: 值为 false/0/no/off 时返回True
     """
-    formatted_errors = []
-    
-    for error in validation_errors:
-        field = error['loc'][-1] if error['loc'] else 'unknown'
-        error_type = error['type']
-        
-        # 自定义中文错误消息
-        if 'missing' in error_type:
-            msg = f'{field} 字段不能为空'
-        elif 'string_type' in error_type:
-            msg = f'{field} 必须是文本类型'
-        elif 'float_type' in error_type or 'int_type' in error_type:
-            msg = f'{field} 必须是数字'
-        elif 'greater_than' in error_type or 'greater_than_equal' in error_type:
-            msg = f'{field} 不能为负数'
-        elif 'string_too_short' in error_type or 'string_too_long' in error_type:
-            msg = f'{field} 长度不符合要求'
-        else:
-            msg = error['msg']
-        
-        formatted_errors.append({
-            'field': field,
-            'msg': msg,
-            'type': error_type
-        })
-    
-    return formatted_errors
-
-
-def validate_business_rules(loan_data):
-    """
-    验证业务逻辑规则（贷款目的与期限的相关性检查）
-    
-    :param loan_ LoanApplicationCreate对象
-    :return: 错误列表，如果没有错误则返回空列表
-    """
-    errors = []
-    
-    loan_purpose = loan_data.loan_purpose
-    loan_term = float(loan_data.loan_term)
-    
-    # 信用贷款期限检查：不超过5年
-    if loan_purpose == 'credit' and loan_term > 5:
-        errors.append({
-            'field': 'loan_term',
-            'msg': '信用贷款期限不能超过5年',
-            'type': 'business_rule'
-        })
-    
-    # 税贷期限检查：不超过2年
-    if loan_purpose == 'tax' and loan_term > 2:
-        errors.append({
-            'field': 'loan_term',
-            'msg': '税贷期限不能超过2年',
-            'type': 'business_rule'
-        })
-    
-    return errors
-
-
-def validate_loan_data(data):
-    """
-    统一的数据校验方法（Pydantic验证 + 业务规则验证）
-    
-    :param data: 表单数据字典
-    :return: (loan_data, errors) - 如果验证成功返回(loan_data对象, None)，否则返回(None, 错误列表)
-    """
-    # 1. Pydantic基础验证
-    try:
-        loan_data = LoanApplicationCreate(**data)
-    except ValidationError as e:
-        # 格式化Pydantic验证错误
-        formatted_errors = format_validation_errors(e.errors())
-        return None, formatted_errors
-    
-    # 2. 业务规则验证
-    business_errors = validate_business_rules(loan_data)
-    if business_errors:
-        return None, business_errors
-    
-    # 验证通过
-    return loan_data, None
+    return value is not None and value.strip().lower() in ('false', '0', 'no', 'off')
 
 
 @loan_bp.route('/apply', methods=['POST'])
@@ -114,40 +52,109 @@ def validate_and_upload():
     需要认证
     """
     try:
-        # 1. 获取表单数据
-        data = request.form.to_dict()
+        # 1. 获取表单数据（multipart 解析，上传文件在此阶段边接收边校验）
+        with phase('form'):
+            data = request.form.to_dict()
+        
+        # 已通过分块上传接口完成上传时，以 upload_id 代替表单文件
+        upload_id = data.pop('upload_id', None)
+        
+        # 客户端已单独缓存图表数据时，可通过 include_financial_data=false 省略
+        include_financial_data = not is_flag_disabled(data.pop('include_financial_data', None))
+        
+        # 确认页刷新图表数据时会带上之前的回执，重新校验后签发新的回执
+        data.pop('receipt', None)
         
         # 2. 添加文件占位符以通过Pydantic验证（先验证表单数据）
-        data['prop_proof_docs'] = 'temp_file_path'
-        data['prop_proof_docs_name'] = 'temp_filename'
+        data = with_file_placeholders(data)
         
         # 3. 先验证表单数据（Pydantic验证 + 业务规则验证）
-        loan_data, errors = validate_loan_data(data)
+        with phase('validate'):
+            loan_data, errors = validate_loan_data(data)
         if errors:
             return ApiResponse.validation_error('数据验证失败，请检查输入信息', errors)
         
         # 4. 表单验证通过后，再检查文件是否上传
         file = request.files.get('prop_proof_docs')
-        if not file or not file.filename:
+        if (not file or not file.filename) and not upload_id:
             return ApiResponse.file_error('请上传财产证明文件')
         
-        # 5. 上传文件
+        # 5. 上传文件（或使用已完成的分块上传）
         try:
-            file_info = LoanService.upload_file_only(file)
+            with phase('upload'):
+                if file and file.filename:
+                    file_info = LoanService.upload_file_only(file, request.current_user.get('user_id'))
+                else:
+                    file_info = UploadSessionService.get_file_info(
+                        upload_id, request.current_user.get('user_id')
+                    )
         except Exception as file_error:
-            return ApiResponse.file_error(f'文件上传失败: {str(file_error)}')
+            return ApiResponse.file_error(f'文件上传失败: {getattr(file_error, "message", str(file_error))}')
+        
+        with phase('receipt'):
+            response_data = {
+                'loan_data': loan_data,
+                'file_info': file_info,
+                # /confirm 提交相同数据和文件时凭回执跳过重复校验
+                'receipt': sign_loan_receipt(loan_data, file_info, request.current_user.get('user_id'))
+            }
         
         # 6. 获取财务图表数据
-        financial_data = LoanService.get_chart_data()
+        if include_financial_data:
+            with phase('chart'):
+                response_data['financial_data'] = LoanService.get_chart_data()
         
-        return ApiResponse.success(
-            data={
-                'loan_data': loan_data.model_dump(),
-                'file_info': file_info,
-                'financial_data': financial_data
-            },
-            msg='数据验证成功，请在下一步确认您的贷款申请信息'
+        # 校验后的 Pydantic 模型直接序列化，不再生成中间字典
+        with phase('encode'):
+            return ApiResponse.success_model(
+                data=response_data,
+                msg='数据验证成功，请在下一步确认您的贷款申请信息'
+            )
+    
+    except FileValidationException as e:
+        # 表单解析时文件校验失败，请求体剩余部分不再读取
+        return ApiResponse.file_error(e.message)
+    except Exception as e:
+        return ApiResponse.server_error(f'服务器错误: {str(e)}')
+
+
+@loan_bp.route('/financial-data', methods=['GET'])
+@token_required
+def financial_data():
+    """
+    获取财务图表数据（可缓存）
+    
+    响应体预先序列化并压缩，使用强ETag：
+    客户端携带 If-None-Match 且数据未变化时返回304，不再传输响应体。
+    
+    需要认证
+    """
+    try:
+        payload = LoanService.get_chart_payload()
+        
+        # 压缩与未压缩是两种表示，使用不同的强ETag
+        use_gzip = request.accept_encodings['gzip'] > 0
+        if use_gzip:
+            etag = f"{payload['etag']}-gzip"
+            body = payload['gzip_body']
+        else:
+            etag = payload['etag']
+            body = payload['body']
+        
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(body)
+            response.headers['Content-Type'] = 'application/json; charset=utf-8'
+            if use_gzip:
+                response.headers['Content-Encoding'] = 'gzip'
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = (
+            f"private, max-age={current_app.config.get('FINANCIAL_DATA_MAX_AGE', 300)}"
         )
+        response.headers['Vary'] = 'Accept-Encoding, Authorization'
+        return response
         
     except Exception as e:
         return ApiResponse.server_error(f'服务器错误: {str(e)}')
@@ -159,26 +166,449 @@ def confirm_loan():
     """
     确认并保存贷款申请到数据库
     
+    携带 /apply 返回的 receipt 且数据和文件未变化时，不再重复校验；
+    回执缺失、过期或数据被修改时按完整流程校验。
+    
     需要认证
     """
     try:
         # 获取表单数据
-        data = request.form.to_dict()
+        with phase('form'):
+            data = request.form.to_dict()
+        receipt = data.pop('receipt', None)
         
-        # 统一的数据校验（Pydantic验证 + 业务规则验证）
-        loan_data, errors = validate_loan_data(data)
-        if errors:
-            return ApiResponse.validation_error('数据验证失败，请检查输入信息', errors)
+        # 使用分块上传的文件时，以 upload_id 换取文件路径和文件名
+        upload_id = data.pop('upload_id', None)
+        if upload_id:
+            try:
+                file_info = UploadSessionService.get_file_info(
+                    upload_id, request.current_user.get('user_id')
+                )
+            except CustomBaseException as e:
+                return ApiResponse.file_error(e.message)
+            data['prop_proof_docs'] = file_info['file_path']
+            data['prop_proof_docs_name'] = file_info['file_name']
+        
+        # 回执有效时直接使用 /apply 已校验的数据
+        with phase('receipt'):
+            loan_data = load_receipted_loan_data(receipt, data, request.current_user.get('user_id'))
+        if loan_data is None:
+            # 统一的数据校验（Pydantic验证 + 业务规则验证）
+            with phase('validate'):
+                loan_data, errors = validate_loan_data(data)
+            if errors:
+                return ApiResponse.validation_error('数据验证失败，请检查输入信息', errors)
+            # 没有回执证明时，文件必须是当前用户上传的文件
+            if not upload_id and not StorageService.is_user_upload(
+                    loan_data.prop_proof_docs, request.current_user.get('user_id')):
+                return ApiResponse.file_error('财产证明文件无效，请重新上传')
         
         # 保存到数据库
         loan_dict = loan_data.model_dump()
             
-        loan = LoanService.save_to_database(loan_dict)
+        with phase('db'):
+            loan = LoanService.save_to_database(loan_dict, request.current_user.get('user_id'))
         
+        with phase('encode'):
+            return ApiResponse.success(
+                data=loan.to_dict(),
+                msg='贷款申请提交成功'
+            )
+    
+    except FileValidationException as e:
+        return ApiResponse.file_error(e.message)
+    except Exception as e:
+        return ApiResponse.server_error(f'服务器错误: {str(e)}')
+
+
+@loan_bp.route('/validate-batch', methods=['POST'])
+@token_required
+def validate_batch():
+    """
+    批量校验贷款申请数据（不上传文件、不保存数据库）
+    
+    请求体（JSON）: 贷款申请数据数组，或 {"applications": [...]}
+    返回按数组下标列出的错误，格式与 /apply 的校验错误相同。
+    
+    需要认证
+    """
+    try:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get('applications')
+        if not isinstance(data, list):
+            return ApiResponse.validation_error('请求体必须是贷款申请数据数组')
+        
+        max_items = current_app.config.get('LOAN_VALIDATE_BATCH_MAX_ITEMS', 1000)
+        if len(data) > max_items:
+            return ApiResponse.validation_error(f'单次最多校验{max_items}条数据')
+        
+        result = validate_loan_batch(data)
         return ApiResponse.success(
-            data=loan.to_dict(),
-            msg='贷款申请提交成功'
+            data=result,
+            msg=f"校验完成，通过{result['valid']}条，未通过{result['invalid']}条"
+        )
+    
+    except Exception as e:
+        return ApiResponse.server_error(f'服务器错误: {str(e)}')
+
+
+@loan_bp.route('/import', methods=['POST'])
+@token_required
+def import_loans():
+    """
+    批量导入贷款申请
+    
+    请求体为原始的 CSV（首行为字段名）或 NDJSON（每行一个JSON对象），流式逐行处理。
+    格式由查询参数 format 或 Content-Type（text/csv、application/x-ndjson）确定，
+    batch_size 查询参数可覆盖每批插入的行数（不超过 LOAN_IMPORT_MAX_BATCH_SIZE）。
+    
+    返回逐行的错误报告，校验通过的行全部导入。
+    
+    需要认证，用户类型须在 LOAN_IMPORT_USER_TYPES 中
+    """
+    try:
+        if request.current_user.get('user_type') not in current_app.config.get('LOAN_IMPORT_USER_TYPES', set()):
+            raise ForbiddenException('无权批量导入贷款申请')
+        
+        fmt = LoanImportService.resolve_format(
+            request.args.get('format'),
+            request.content_type
+        )
+        batch_size = request.args.get('batch_size', type=int)
+        if batch_size is not None:
+            batch_size = max(1, min(batch_size, current_app.config.get('LOAN_IMPORT_MAX_BATCH_SIZE', 5000)))
+        
+        report = LoanImportService.import_stream(
+            request.stream,
+            fmt,
+            batch_size=batch_size,
+            user_id=request.current_user.get('user_id')
+        )
+        return ApiResponse.success(
+            data=report,
+            msg=f"导入完成，成功{report['imported']}条，失败{report['failed']}条"
+        )
+    
+    except ForbiddenException as e:
+        return ApiResponse.auth_error(e.message)
+    except CustomBaseException as e:
+        return ApiResponse.error(msg=e.message)
+    except Exception as e:
+        return ApiResponse.server_error(f'服务器错误: {str(e)}')
+
+
+def is_reviewer():
+    """当前用户是否可以查看所有用户的贷款申请（用户类型在 LOAN_REVIEWER_USER_TYPES 中）"""
+    reviewer_types = current_app.config.get('LOAN_REVIEWER_USER_TYPES', set())
+    return request.current_user.get('user_type') in reviewer_types
+
+
+def resolve_owner_filter(owner=None):
+    """
+    确定列表和搜索的提交用户筛选条件
+    
+    LOAN_REVIEWER_USER_TYPES 中的用户可查看所有用户的申请，其他用户只能查看自己提交的申请。
+    
+    :param owner: 查询参数 owner，me 表示当前用户，或用户ID，未传时不限
+    :return: 提交用户ID，None 表示不限
+    :raises BadRequestException: owner 格式错误
+    :raises ForbiddenException: 查看其他用户的申请
+    """
+    user_id = request.current_user.get('user_id')
+    if owner is None:
+        owner_id = None
+    elif owner == 'me':
+        owner_id = user_id
+    else:
+        try:
+            owner_id = int(owner)
+        except ValueError:
+            raise BadRequestException('owner 必须是 me 或用户ID')
+    
+    if not is_reviewer():
+        if owner_id is not None and owner_id != user_id:
+            raise ForbiddenException('无权查看其他用户的贷款申请')
+        owner_id = user_id
+    return owner_id
+
+
+@loan_bp.route('/applications', methods=['GET'])
+@token_required
+def list_applications():
+    """
+    按提交时间倒序分页获取贷款申请（游标分页）
+    
+    查询参数:
+        limit: 每页条数
+        cursor: 上一页返回的 next_cursor
+        loan_purpose: 贷款目的
+        industry_category: 所属行业
+        owner: 提交用户，me 表示当前用户，或用户ID
+    
+    需要认证
+    """
+    try:
+        page = LoanService.list_applications(
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+            user_id=resolve_owner_filter(request.args.get('owner')),
+            loan_purpose=request.args.get('loan_purpose'),
+            industry_category=request.args.get('industry_category')
+        )
+        return ApiResponse.success(data=page)
+    
+    except ForbiddenException as e:
+        return ApiResponse.auth_error(e.message)
+    except CustomBaseException as e:
+        return ApiResponse.validation_error(e.message)
+    except Exception as e:
+        return ApiResponse.server_error(f'服务器错误: {str(e)}')
+
+
+@loan_bp.route('/search', methods=['GET'])
+@token_required
+def search_applications():
+    """
+    按企业名称（部分匹配）或统一社会信用代码（精确匹配）搜索贷款申请
+    
+    查询参数:
+        q: 搜索词，18位英数字时按统一社会信用代码查找，否则按企业名称查找
+        limit: 每页条数
+        cursor: 上一页返回的 next_cursor
+        owner: 提交用户，me 表示当前用户，或用户ID
+    
+    结果按匹配程度排序，每条附带 score（0-1）。
+    
+    需要认证
+    """
+    try:
+        page = LoanService.search_applications(
+            request.args.get('q'),
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+            user_id=resolve_owner_filter(request.args.get('owner'))
+        )
+        return ApiResponse.success(data=page)
+    
+    except ForbiddenException as e:
+        return ApiResponse.auth_error(e.message)
+    except CustomBaseException as e:
+        return ApiResponse.validation_error(e.message)
+    except Exception as e:
+        return ApiResponse.server_error(f'服务器错误: {str(e)}')
+
+
+@loan_bp.route('/stats', methods=['GET'])
+@token_required
+def portfolio_stats():
+    """
+    贷款申请汇总统计（申请数、申请金额合计）
+    
+    查询参数:
+        group_by: 逗号分隔的分组维度 month、industry_category、loan_purpose，默认全部，为空时只返回总计
+        start_month: 开始月份 YYYY-MM（包含）
+        end_month: 结束月份 YYYY-MM（包含）
+    
+    只读取汇总表，响应时间与分组数成正比，与申请总数无关。
+    
+    需要认证，仅 LOAN_REVIEWER_USER_TYPES 中的用户可访问
+    """
+    try:
+        if not is_reviewer():
+            return ApiResponse.auth_error('无权查看汇总统计')
+        
+        group_by = request.args.get('group_by')
+        if group_by is not None:
+            group_by = [name.strip() for name in group_by.split(',') if name.strip()]
+        
+        stats = LoanService.get_portfolio_stats(
+            group_by,
+            start_month=request.args.get('start_month'),
+            end_month=request.args.get('end_month')
         )
+        return ApiResponse.success(data=stats)
+    
+    except CustomBaseException as e:
+        return ApiResponse.validation_error(e.message)
+    except Exception as e:
+        return ApiResponse.server_error(f'服务器错误: {str(e)}')
+
+
+@loan_bp.route('/export', methods=['GET'])
+@token_required
+def export_applications():
+    """
+    流式导出贷款申请（CSV 或 NDJSON）
+    
+    查询参数:
+        format: csv（默认）或 ndjson
+        start: 开始日期（YYYY-MM-DD，包含）
+        end: 结束日期（YYYY-MM-DD，包含）
+        owner: 提交用户，me 表示当前用户，或用户ID
+    
+    响应以分块传输边查询边输出；客户端支持 gzip 时压缩传输（gzip=false 可关闭）。
+    
+    需要认证
+    """
+    try:
+        fmt = (request.args.get('format') or 'csv').lower()
+        start, end = LoanExportService.parse_date_range(request.args.get('start'), request.args.get('end'))
+        use_gzip = request.accept_encodings['gzip'] > 0 and not is_flag_disabled(request.args.get('gzip'))
         
+        chunks = LoanExportService.stream(
+            fmt,
+            start=start,
+            end=end,
+            user_id=resolve_owner_filter(request.args.get('owner')),
+            compress=use_gzip
+        )
+        
+        # 生成器在响应发送过程中执行，需要保留请求上下文（数据库会话）
+        response = Response(stream_with_context(chunks), content_type=EXPORT_CONTENT_TYPES[fmt])
+        response.headers['Content-Disposition'] = f'attachment; filename="loan-applications.{fmt}"'
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding, Authorization'
+        return response
+    
+    except ForbiddenException as e:
+        return ApiResponse.auth_error(e.message)
+    except CustomBaseException as e:
+        return ApiResponse.validation_error(e.message)
     except Exception as e:
         return ApiResponse.server_error(f'服务器错误: {str(e)}')
+
+
+def upload_session_response(meta):
+    """
+    上传会话的响应数据
+    
+    :param meta: 会话元数据
+    :return: 返回给客户端的会话信息
+    """
+    return {
+        'upload_id': meta['upload_id'],
+        'file_name': meta['file_name'],
+        'file_size': meta['file_size'],
+        'offset': meta['offset'],
+        'finalized': meta['file_info'] is not None,
+        'chunk_size': current_app.config.get('UPLOAD_SESSION_CHUNK_SIZE', 1024 * 1024)
+    }
+
+
+def upload_session_error(e, upload_id=None):
+    """
+    上传会话异常转换为统一响应
+    
+    偏移量冲突时附带服务端记录的当前偏移量，客户端据此续传。
+    """
+    if isinstance(e, NotFoundException):
+        return ApiResponse.not_found_error(e.message)
+    if isinstance(e, TooManyRequestsException):
+        return ApiResponse.rate_limit_error(e.message)
+    
+    if isinstance(e, ConflictException) and upload_id:
+        try:
+            meta = UploadSessionService.get_session(upload_id, request.current_user.get('user_id'))
+            return ApiResponse.error(msg=e.message, data={'offset': meta['offset']})
+        except CustomBaseException:
+            pass
+    
+    return ApiResponse.file_error(e.message)
+
+
+@loan_bp.route('/uploads', methods=['POST'])
+@token_required
+def create_upload_session():
+    """
+    创建分块上传会话
+    
+    请求体（JSON）: file_name 文件名, file_size 文件总大小（字节）, content_type 文件类型（可选）
+    
+    需要认证
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        meta = UploadSessionService.create_session(
+            request.current_user.get('user_id'),
+            data.get('file_name'),
+            data.get('file_size'),
+            data.get('content_type')
+        )
+        return ApiResponse.success(data=upload_session_response(meta), msg='上传会话已创建')
+    
+    except CustomBaseException as e:
+        return upload_session_error(e)
+    except Exception as e:
+        return ApiResponse.server_error(f'服务器错误: {str(e)}')
+
+
+@loan_bp.route('/uploads/<upload_id>', methods=['GET'])
+@token_required
+def get_upload_session(upload_id):
+    """
+    查询分块上传会话（断点续传时获取已确认的偏移量）
+    
+    需要认证
+    """
+    try:
+        meta = UploadSessionService.get_session(upload_id, request.current_user.get('user_id'))
+        return ApiResponse.success(data=upload_session_response(meta))
+    
+    except CustomBaseException as e:
+        return upload_session_error(e)
+    except Exception as e:
+        return ApiResponse.server_error(f'服务器错误: {str(e)}')
+
+
+@loan_bp.route('/uploads/<upload_id>', methods=['PUT'])
+@token_required
+def upload_chunk(upload_id):
+    """
+    上传一个分块
+    
+    请求体为分块的原始字节，偏移量通过查询参数 offset 或请求头 Upload-Offset 传递。
+    
+    需要认证
+    """
+    try:
+        offset = request.args.get('offset', request.headers.get('Upload-Offset'))
+        try:
+            offset = int(offset)
+        except (TypeError, ValueError):
+            return ApiResponse.file_error('缺少有效的偏移量')
+        
+        meta = UploadSessionService.write_chunk(
+            upload_id,
+            request.current_user.get('user_id'),
+            offset,
+            request.stream,
+            request.content_length
+        )
+        return ApiResponse.success(data=upload_session_response(meta), msg='分块上传成功')
+    
+    except CustomBaseException as e:
+        return upload_session_error(e, upload_id)
+    except Exception as e:
+        return ApiResponse.server_error(f'服务器错误: {str(e)}')
+
+
+@loan_bp.route('/uploads/<upload_id>/finalize', methods=['POST'])
+@token_required
+def finalize_upload(upload_id):
+    """
+    完成分块上传，返回的文件信息与 /apply 上传文件时相同
+    之后在 /apply 或 /confirm 中以 upload_id 代替表单文件
+    
+    需要认证
+    """
+    try:
+        file_info = UploadSessionService.finalize(upload_id, request.current_user.get('user_id'))
+        return ApiResponse.success(data={'file_info': file_info}, msg='文件上传完成')
+    
+    except CustomBaseException as e:
+        return upload_session_error(e, upload_id)
+    except Exception as e:
+        return ApiResponse.server_error(f'服务器错误: {str(e)}')
+
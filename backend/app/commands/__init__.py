@@ -0,0 +1,16 @@
+"""
+Flask 命令行命令
+"""
+
+
+def register_commands(app):
+    """注册所有命令行命令"""
+    from app.commands.auth_commands import auth_cli
+    from app.commands.loan_commands import loans_cli
+    from app.commands.schema_commands import schema_cli
+    from app.commands.upload_commands import uploads_cli
+
+    app.cli.add_command(auth_cli)
+    app.cli.add_command(loans_cli)
+    app.cli.add_command(uploads_cli)
+    app.cli.add_command(schema_cli)
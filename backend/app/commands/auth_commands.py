@@ -0,0 +1,56 @@
+"""
+认证相关的命令行命令
+
+用法:
+    flask auth calibrate-bcrypt --target-ms 250
+    flask auth set-user-type admin ADMIN
+"""
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.crud.user_crud import UserCrud
+from app.utils.password_utils import calibrate_bcrypt_rounds, get_bcrypt_rounds
+
+auth_cli = AppGroup('auth', help='认证相关命令')
+
+# 可分配的用户类型；ADMIN 只能通过命令行分配
+USER_TYPES = ('INDIVIDUAL', 'ENTERPRISE', 'ADMIN')
+
+
+@auth_cli.command('calibrate-bcrypt')
+@click.option('--target-ms', type=int, default=None, help='目标单次校验耗时（毫秒），默认读取 BCRYPT_TARGET_MS')
+def calibrate_bcrypt(target_ms):
+    """按目标耗时测算本机合适的 bcrypt 工作因子"""
+    if target_ms is None:
+        target_ms = current_app.config.get('BCRYPT_TARGET_MS', 250)
+
+    rounds, estimated_ms = calibrate_bcrypt_rounds(
+        target_ms,
+        min_rounds=current_app.config.get('BCRYPT_MIN_ROUNDS', 10),
+        max_rounds=current_app.config.get('BCRYPT_MAX_ROUNDS', 15)
+    )
+
+    click.echo(f"当前工作因子: {get_bcrypt_rounds()}")
+    click.echo(f"推荐工作因子: {rounds}（预计单次校验 {estimated_ms:.1f}ms，目标 {target_ms}ms）")
+    click.echo(f"在环境变量中设置 BCRYPT_ROUNDS={rounds}，或设置 BCRYPT_ROUNDS=auto 在启动时自动校准")
+
+
+@auth_cli.command('set-user-type')
+@click.argument('user_name')
+@click.argument('user_type', type=click.Choice(USER_TYPES, case_sensitive=False))
+def set_user_type(user_name, user_type):
+    """
+    设置用户类型（如分配管理员）
+
+    LOAN_IMPORT_USER_TYPES 和 LOAN_REVIEWER_USER_TYPES 默认只允许 ADMIN 批量导入和查看所有用户的申请。
+    用户类型写在访问令牌中，修改后需重新登录才生效。
+    """
+    user = UserCrud.get_user_by_username(user_name)
+    if user is None:
+        raise click.ClickException(f"用户不存在: {user_name}")
+
+    user_type = user_type.upper()
+    previous = user.user_type
+    UserCrud.update_user_type(user, user_type)
+    click.echo(f"用户 {user_name} 的类型已从 {previous} 改为 {user_type}，重新登录后生效")
@@ -0,0 +1,138 @@
+"""
+贷款申请相关的命令行命令
+
+用法:
+    flask loans import applications.csv [--format csv|ndjson] [--batch-size 500] [--user-id 1]
+    flask loans reindex [--batch-size 1000]
+    flask loans rebuild-stats [--batch-size 1000]
+    flask loans export applications.csv.gz [--format csv|ndjson] [--start 2024-01-01] [--end 2024-01-31]
+    flask loans seed --count 1000000 [--users 100] [--seed 42] [--days 365] [--end 2024-12-31] [--file-size-kb 512]
+"""
+import json
+
+import click
+from flask.cli import AppGroup
+
+from app.services.loan_export_service import LoanExportService
+from app.services.loan_import_service import LoanImportService
+from app.services.loan_service import LoanService
+from app.services.seed_service import SEED_PASSWORD, SEED_USER_PREFIX, SeedService
+from app.utils.exceptions import BadRequestException
+
+loans_cli = AppGroup('loans', help='贷款申请管理命令')
+
+
+@loans_cli.command('import')
+@click.argument('source', type=click.File('rb'))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None,
+              help='导入格式，默认按文件扩展名判断')
+@click.option('--batch-size', type=int, default=None, help='每批插入的行数，默认读取 LOAN_IMPORT_BATCH_SIZE')
+@click.option('--report', type=click.File('w', encoding='utf-8'), default=None, help='将逐行错误报告写入JSON文件')
+@click.option('--user-id', type=int, default=None, help='记为导入申请的提交用户ID')
+def import_loans(source, fmt, batch_size, report, user_id):
+    """从 CSV 或 NDJSON 文件批量导入贷款申请（SOURCE 为 - 时读取标准输入）"""
+    try:
+        fmt = LoanImportService.resolve_format(fmt, file_name=source.name)
+    except BadRequestException as e:
+        raise click.BadParameter(e.message, param_hint='--format')
+
+    result = LoanImportService.import_stream(source, fmt, batch_size=batch_size, user_id=user_id)
+
+    click.echo(
+        f"共 {result['total']} 行，成功 {result['imported']} 行，失败 {result['failed']} 行，"
+        f"耗时 {result['elapsed_ms']}ms（{result['rows_per_second']} 行/秒）"
+    )
+    for row_error in result['errors'][:20]:
+        messages = '；'.join(error['msg'] for error in row_error['errors'])
+        click.echo(f"  第 {row_error['row']} 行: {messages}")
+    if len(result['errors']) > 20:
+        click.echo(f"  ……其余 {result['failed'] - 20} 行错误见 --report")
+
+    if report is not None:
+        json.dump(result, report, ensure_ascii=False, indent=2)
+
+
+@loans_cli.command('reindex')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help='每批读取的贷款申请数')
+def reindex(batch_size):
+    """重建企业名称搜索索引"""
+    indexed = LoanService.rebuild_search_index(batch_size)
+    click.echo(f"已重建 {indexed} 条贷款申请的名称索引")
+
+
+@loans_cli.command('rebuild-stats')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help='每次从数据库读取的行数')
+def rebuild_stats(batch_size):
+    """从申请明细重新计算汇总统计表"""
+    groups = LoanService.rebuild_portfolio_stats(batch_size)
+    click.echo(f"已重建汇总统计，共 {groups} 个分组")
+
+
+@loans_cli.command('export')
+@click.argument('output', type=click.File('wb'))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None,
+              help='导出格式，默认按文件扩展名判断（无法判断时为 csv）')
+@click.option('--start', default=None, help='开始日期 YYYY-MM-DD（包含）')
+@click.option('--end', default=None, help='结束日期 YYYY-MM-DD（包含）')
+@click.option('--gzip/--no-gzip', 'compress', default=None, help='是否 gzip 压缩，默认按 .gz 扩展名判断')
+@click.option('--user-id', type=int, default=None, help='只导出该用户提交的申请')
+def export_loans(output, fmt, start, end, compress, user_id):
+    """流式导出贷款申请到文件（OUTPUT 为 - 时写入标准输出）"""
+    name = output.name if isinstance(output.name, str) else ''
+    if compress is None:
+        compress = name.endswith('.gz')
+    if fmt is None:
+        fmt = 'ndjson' if name.removesuffix('.gz').endswith(('.ndjson', '.jsonl')) else 'csv'
+
+    try:
+        start_at, end_at = LoanExportService.parse_date_range(start, end)
+    except BadRequestException as e:
+        raise click.BadParameter(e.message)
+
+    stats = {}
+    for chunk in LoanExportService.stream(fmt, start_at, end_at, user_id, compress=compress, stats=stats):
+        output.write(chunk)
+    output.flush()
+
+    click.echo(f"已导出 {stats['rows']} 条，耗时 {stats['elapsed_ms']}ms", err=True)
+
+
+@loans_cli.command('seed')
+@click.option('--count', type=int, required=True, help='生成的贷款申请数')
+@click.option('--users', type=int, default=10, show_default=True, help='申请分布到的用户数')
+@click.option('--seed', 'seed_value', type=int, default=0, show_default=True, help='随机种子，相同参数生成相同数据')
+@click.option('--days', type=int, default=365, show_default=True, help='提交时间分布在结束日期之前的天数')
+@click.option('--end', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='提交时间的结束日期 YYYY-MM-DD（不包含），默认今天；需要跨天复现时指定')
+@click.option('--batch-size', type=int, default=None, help='每批插入的行数，默认读取 LOAN_IMPORT_BATCH_SIZE')
+@click.option('--file-size-kb', type=int, default=None,
+              help='为每条申请创建该大小的稀疏财产证明文件（KB），默认不创建文件')
+def seed_loans(count, users, seed_value, days, end, batch_size, file_size_kb):
+    """生成可复现的合成用户和贷款申请（负载与规模测试）"""
+    if count < 0 or users < 1 or days < 1:
+        raise click.BadParameter('count 不能为负数，users 和 days 至少为 1')
+
+    report_every = max(count // 20, 1)
+    next_report = [report_every]
+
+    def progress(inserted):
+        if inserted >= next_report[0] or inserted == count:
+            click.echo(f"  已写入 {inserted}/{count}")
+            next_report[0] = inserted + report_every
+
+    result = SeedService.seed(
+        count,
+        users=users,
+        seed=seed_value,
+        days=days,
+        end=end,
+        batch_size=batch_size,
+        file_size=file_size_kb * 1024 if file_size_kb is not None else None,
+        progress=progress
+    )
+
+    click.echo(
+        f"已生成 {result['applications']} 条申请、{result['files']} 个文件，"
+        f"耗时 {result['elapsed_ms']}ms（{result['rows_per_second']} 行/秒）"
+    )
+    click.echo(f"用户 {SEED_USER_PREFIX}000001 ~ {SEED_USER_PREFIX}{users:06d}，密码 {SEED_PASSWORD}")
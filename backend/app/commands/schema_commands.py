@@ -0,0 +1,96 @@
+"""
+数据库结构相关的命令行命令
+
+用法:
+    flask schema upgrade
+"""
+import click
+from flask.cli import AppGroup
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import AddConstraint, CreateColumn
+
+from app import db
+
+schema_cli = AppGroup('schema', help='数据库结构管理命令')
+
+
+def _missing_columns():
+    """找出已存在的表上尚未添加的列"""
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        missing.extend(column for column in table.columns if column.name not in existing)
+    return missing
+
+
+def _add_column(column):
+    """
+    ALTER TABLE ... ADD COLUMN，列定义由当前数据库方言生成
+
+    列上的外键一并添加：SQLite 不支持 ADD CONSTRAINT，外键写在列定义中；
+    其他数据库添加列后再 ADD CONSTRAINT ... FOREIGN KEY。
+    """
+    dialect = db.engine.dialect
+    preparer = dialect.identifier_preparer
+    definition = str(CreateColumn(column).compile(dialect=dialect))
+    if dialect.name == 'sqlite':
+        for foreign_key in column.foreign_keys:
+            definition += (
+                f' REFERENCES {preparer.format_table(foreign_key.column.table)}'
+                f' ({preparer.quote(foreign_key.column.name)})'
+            )
+    with db.engine.begin() as connection:
+        connection.execute(text(
+            f'ALTER TABLE {preparer.format_table(column.table)} ADD COLUMN {definition}'
+        ))
+        if dialect.name != 'sqlite':
+            for foreign_key in column.foreign_keys:
+                connection.execute(AddConstraint(foreign_key.constraint))
+
+
+def _missing_indexes():
+    """找出已存在的表上尚未创建的索引"""
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in table.indexes if index.name not in existing)
+    return missing
+
+
+@schema_cli.command('upgrade')
+def upgrade():
+    """创建缺少的表、列和索引（只新增，不修改或删除已有结构）"""
+    missing_tables = [
+        table.name for table in db.metadata.sorted_tables
+        if not inspect(db.engine).has_table(table.name)
+    ]
+    missing_columns = _missing_columns()
+
+    # create_all 只创建不存在的表（含其索引）
+    db.create_all()
+    for column in missing_columns:
+        # 已有数据的表无法直接添加没有默认值的非空列，需要人工迁移
+        if not column.nullable and column.server_default is None:
+            click.echo(f"跳过非空且无默认值的列: {column.table.name}.{column.name}", err=True)
+            continue
+        _add_column(column)
+        click.echo(f"已添加列: {column.table.name}.{column.name}")
+
+    # 新增列上的索引在列添加之后创建
+    missing_indexes = _missing_indexes()
+    for index in missing_indexes:
+        index.create(db.engine)
+        click.echo(f"已创建索引: {index.table.name}.{index.name}")
+    for table_name in missing_tables:
+        click.echo(f"已创建表: {table_name}")
+
+    if not missing_tables and not missing_columns and not missing_indexes:
+        click.echo("数据库结构已是最新")
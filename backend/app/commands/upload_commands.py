@@ -0,0 +1,120 @@
+"""
+上传文件相关的命令行命令
+
+用法:
+    flask uploads migrate-layout [--dry-run] [--batch-size 500]
+    flask uploads gc [--ttl 86400] [--batch-size 500] [--max-batches N] [--dry-run]
+"""
+import os
+import re
+from datetime import datetime
+
+import click
+from flask.cli import AppGroup
+
+from app.crud.loan_crud import bulk_update_proof_doc_paths
+from app.services.storage_service import StorageService
+
+uploads_cli = AppGroup('uploads', help='上传文件管理命令')
+
+# 旧版平铺文件名：<14位时间戳>_<原始文件名>
+LEGACY_FILENAME_PATTERN = re.compile(r'^(\d{14})_(.+)$')
+
+
+def _iter_legacy_files(upload_folder):
+    """遍历上传根目录下旧版平铺保存的文件"""
+    with os.scandir(upload_folder) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False) and not entry.name.startswith('.'):
+                yield entry
+
+
+def _parse_legacy_name(entry):
+    """从旧版文件名中解析上传时间和原始文件名，无时间戳前缀时使用文件修改时间"""
+    match = LEGACY_FILENAME_PATTERN.match(entry.name)
+    if match:
+        try:
+            return datetime.strptime(match.group(1), '%Y%m%d%H%M%S'), match.group(2)
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(entry.stat().st_mtime), entry.name
+
+
+def _flush(batch):
+    """
+    提交一批迁移：先批量更新数据库路径，提交成功后再删除旧文件
+
+    中途失败时旧文件仍在，重新执行迁移即可（新目录下可能留下未被引用的逻辑文件）。
+    """
+    updated = bulk_update_proof_doc_paths([(old, new) for old, new, _ in batch])
+    for _, _, source_path in batch:
+        os.unlink(source_path)
+    return updated
+
+
+@uploads_cli.command('migrate-layout')
+@click.option('--dry-run', is_flag=True, help='只列出将要迁移的文件，不做修改')
+@click.option('--batch-size', type=int, default=500, show_default=True, help='每批迁移的文件数')
+def migrate_layout(dry_run, batch_size):
+    """将旧版平铺上传文件迁移到去重存储与分片目录，并批量更新 prop_proof_docs"""
+    upload_folder = StorageService.get_upload_folder()
+    if not os.path.isdir(upload_folder):
+        click.echo(f"上传目录不存在: {upload_folder}")
+        return
+
+    migrated = 0
+    deduplicated = 0
+    updated_rows = 0
+    batch = []
+
+    for entry in _iter_legacy_files(upload_folder):
+        created_at, file_name = _parse_legacy_name(entry)
+        old_path = entry.path.replace('\\', '/')
+
+        if dry_run:
+            click.echo(f"{old_path} -> files/{created_at:%Y/%m/%d}/.../{file_name}")
+            migrated += 1
+            continue
+
+        file_info = StorageService.adopt_existing_file(entry.path, file_name, created_at, upload_folder)
+        batch.append((old_path, file_info['file_path'], entry.path))
+        migrated += 1
+        deduplicated += 1 if file_info['deduplicated'] else 0
+
+        if len(batch) >= batch_size:
+            updated_rows += _flush(batch)
+            batch = []
+
+    if batch:
+        updated_rows += _flush(batch)
+
+    if dry_run:
+        click.echo(f"共 {migrated} 个文件待迁移（未做修改）")
+    else:
+        click.echo(f"已迁移 {migrated} 个文件（其中重复内容 {deduplicated} 个），更新申请记录 {updated_rows} 条")
+
+
+@uploads_cli.command('gc')
+@click.option('--ttl', type=int, default=None, help='保留时间（秒），默认读取 UPLOAD_ORPHAN_TTL')
+@click.option('--batch-size', type=int, default=500, show_default=True, help='每批处理的记录数')
+@click.option('--max-batches', type=int, default=None, help='最多处理的批数，默认处理完为止')
+@click.option('--dry-run', is_flag=True, help='只统计将要删除的文件，不做修改')
+def collect_garbage(ttl, batch_size, max_batches, dry_run):
+    """删除超过保留期仍未被贷款申请引用的上传文件（可由 cron 定期执行）"""
+    stats = StorageService.collect_orphaned_uploads(
+        ttl_seconds=ttl,
+        batch_size=batch_size,
+        max_batches=max_batches,
+        dry_run=dry_run
+    )
+
+    if dry_run:
+        click.echo(f"扫描 {stats['scanned']} 条过期记录，其中已被引用 {stats['claimed']} 条，"
+                   f"过期临时文件 {stats['stale_files']} 个（未做修改）")
+        return
+    click.echo(
+        f"扫描 {stats['scanned']} 条过期记录（{stats['batches']} 批），已被引用 {stats['claimed']} 条，"
+        f"删除逻辑文件 {stats['deleted_files']} 个、blob {stats['deleted_blobs']} 个、"
+        f"过期临时文件 {stats['stale_files']} 个，释放 {stats['freed_bytes']} 字节，"
+        f"失败 {stats['errors']} 个，耗时 {stats['elapsed_ms']}ms"
+    )
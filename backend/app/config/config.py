@@ -25,11 +25,45 @@ class Config:
         'max_overflow': 20
     }
 
+    # JSON序列化：auto（安装了 orjson 时使用 orjson）、orjson 或 stdlib
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto')
+
     # JWT 配置
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     # JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=1)
     JWT_ALGORITHM = 'HS256'
+    # 已验证Token缓存：过期前重复请求跳过签名校验
+    TOKEN_CACHE_ENABLED = os.getenv('TOKEN_CACHE_ENABLED', 'True') == 'True'
+    TOKEN_CACHE_MAX_SIZE = int(os.getenv('TOKEN_CACHE_MAX_SIZE', '10000'))
+
+    # bcrypt 工作因子：数字或 auto（启动时按 BCRYPT_TARGET_MS 校准）
+    # 登录成功时，工作因子低于配置的旧哈希会自动重新哈希
+    BCRYPT_ROUNDS = os.getenv('BCRYPT_ROUNDS', '12')
+    BCRYPT_TARGET_MS = int(os.getenv('BCRYPT_TARGET_MS', '250'))
+    BCRYPT_MIN_ROUNDS = 10
+    BCRYPT_MAX_ROUNDS = 15
+
+    # 密码校验线程池：并发上限（默认CPU核数）与排队上限，排队已满时登录请求立即被拒绝
+    BCRYPT_MAX_WORKERS = int(os.getenv('BCRYPT_MAX_WORKERS', '0')) or None
+    BCRYPT_MAX_QUEUE = int(os.getenv('BCRYPT_MAX_QUEUE', '32'))
+
+    # 登录失败限流（令牌桶）：按用户名和IP分别计数，登录成功不消耗额度
+    # LOGIN_THROTTLE_BACKEND 为共享存储类的导入路径，未配置时使用进程内存储
+    LOGIN_THROTTLE_ENABLED = os.getenv('LOGIN_THROTTLE_ENABLED', 'True') == 'True'
+    LOGIN_THROTTLE_BACKEND = os.getenv('LOGIN_THROTTLE_BACKEND') or None
+    LOGIN_THROTTLE_USER_CAPACITY = int(os.getenv('LOGIN_THROTTLE_USER_CAPACITY', '5'))
+    LOGIN_THROTTLE_USER_REFILL_SECONDS = int(os.getenv('LOGIN_THROTTLE_USER_REFILL_SECONDS', '60'))
+    LOGIN_THROTTLE_IP_CAPACITY = int(os.getenv('LOGIN_THROTTLE_IP_CAPACITY', '30'))
+    LOGIN_THROTTLE_IP_REFILL_SECONDS = int(os.getenv('LOGIN_THROTTLE_IP_REFILL_SECONDS', '2'))
+    # 应用前的可信反向代理层数：大于0时按 X-Forwarded-For / X-Forwarded-Proto 确定客户端IP和协议
+    # （限流按客户端IP计数），直接对外提供服务时必须为0，否则客户端可以伪造IP
+    TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', '0'))
+
+    # 用户信息缓存：按ID和用户名缓存用户行，用户信息更新时主动失效
+    USER_CACHE_ENABLED = os.getenv('USER_CACHE_ENABLED', 'True') == 'True'
+    USER_CACHE_MAX_SIZE = int(os.getenv('USER_CACHE_MAX_SIZE', '10000'))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', '60'))
 
     # 应用配置
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-app-secret-key')
@@ -45,6 +79,60 @@ class Config:
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads/loan_docs')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 最大上传文件大小: 16MB
     ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'doc', 'docx', 'xls', 'xlsx'}
+    # 按扩展名限制上传文件大小（字节），未配置的扩展名使用 MAX_CONTENT_LENGTH
+    UPLOAD_MAX_SIZE_BY_TYPE = {
+        'png': 5 * 1024 * 1024,
+        'jpg': 5 * 1024 * 1024,
+        'jpeg': 5 * 1024 * 1024,
+    }
+    UPLOAD_CHUNK_SIZE = 64 * 1024  # 上传文件分块写入大小: 64KB
+    # 分块上传（断点续传）：建议的客户端分块大小与会话有效期
+    UPLOAD_SESSION_CHUNK_SIZE = 1024 * 1024  # 1MB
+    UPLOAD_SESSION_TTL = int(os.getenv('UPLOAD_SESSION_TTL', str(24 * 3600)))
+    # 每个用户同时未完成的分块上传会话数上限（会话创建时按声明大小预分配磁盘空间），0 表示不限制
+    UPLOAD_SESSION_MAX_ACTIVE_PER_USER = int(os.getenv('UPLOAD_SESSION_MAX_ACTIVE_PER_USER', '5'))
+    # /apply 上传后未被 /confirm 引用的文件保留时间（秒），超期由 flask uploads gc 清理
+    UPLOAD_ORPHAN_TTL = int(os.getenv('UPLOAD_ORPHAN_TTL', str(24 * 3600)))
+
+    # 批量导入：每批插入的行数与报告中保留的最多错误行数
+    LOAN_IMPORT_BATCH_SIZE = int(os.getenv('LOAN_IMPORT_BATCH_SIZE', '500'))
+    LOAN_IMPORT_MAX_ERRORS = int(os.getenv('LOAN_IMPORT_MAX_ERRORS', '1000'))
+    # /api/loan/import：batch_size 查询参数的上限，以及可以调用导入接口的用户类型（逗号分隔）
+    LOAN_IMPORT_MAX_BATCH_SIZE = int(os.getenv('LOAN_IMPORT_MAX_BATCH_SIZE', '5000'))
+    LOAN_IMPORT_USER_TYPES = set(filter(None, os.getenv('LOAN_IMPORT_USER_TYPES', 'ADMIN').split(',')))
+    # 业务规则文件（JSON，修改后自动重新加载），默认 data/loan-rules.json
+    LOAN_RULES_FILE = os.getenv('LOAN_RULES_FILE')
+    # 规则文件不存在时使用的规则定义（格式同规则文件），None 表示使用内置默认规则
+    LOAN_RULES = None
+
+    # /apply 返回的校验回执有效期（秒），期内 /confirm 提交相同数据可跳过重复校验
+    LOAN_RECEIPT_TTL = int(os.getenv('LOAN_RECEIPT_TTL', '3600'))
+    # 批量校验接口单次最多校验的条数
+    LOAN_VALIDATE_BATCH_MAX_ITEMS = int(os.getenv('LOAN_VALIDATE_BATCH_MAX_ITEMS', '1000'))
+    # 贷款申请列表：默认与最大每页条数
+    LOAN_LIST_PAGE_SIZE = int(os.getenv('LOAN_LIST_PAGE_SIZE', '20'))
+    LOAN_LIST_MAX_PAGE_SIZE = int(os.getenv('LOAN_LIST_MAX_PAGE_SIZE', '100'))
+    # 流式导出：每次从数据库读取的行数（服务端游标）
+    LOAN_EXPORT_BATCH_SIZE = int(os.getenv('LOAN_EXPORT_BATCH_SIZE', '1000'))
+    # 名称搜索：查询词至少命中的 gram 比例（0-1），1 表示名称必须包含查询词的所有 gram
+    LOAN_SEARCH_MIN_MATCH_RATIO = float(os.getenv('LOAN_SEARCH_MIN_MATCH_RATIO', '0.5'))
+    # 可以查看所有用户贷款申请的用户类型（逗号分隔），其他用户只能查看自己提交的申请
+    LOAN_REVIEWER_USER_TYPES = set(filter(None, os.getenv('LOAN_REVIEWER_USER_TYPES', 'ADMIN').split(',')))
+
+    # 图表数据接口的浏览器缓存时间（秒），过期后通过 ETag 协商
+    FINANCIAL_DATA_MAX_AGE = int(os.getenv('FINANCIAL_DATA_MAX_AGE', '300'))
+
+    # 请求阶段计时：响应附加 Server-Timing 头，并为耗时不低于 REQUEST_TIMING_LOG_MIN_MS 的请求输出结构化日志
+    REQUEST_TIMING_ENABLED = os.getenv('REQUEST_TIMING_ENABLED', 'True') == 'True'
+    SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'True') == 'True'
+    REQUEST_TIMING_LOG_MIN_MS = float(os.getenv('REQUEST_TIMING_LOG_MIN_MS', '0'))
+    # 采样性能分析：按比例（0-1，0 表示关闭）采样请求，每个进程保留最慢的 PROFILE_KEEP 个请求的分析结果
+    # PROFILER 为 cprofile（.prof，可用 snakeviz 查看）或 pyinstrument（.html，需要安装 pyinstrument）
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', '10'))
+    PROFILER = os.getenv('PROFILER', 'cprofile')
+    # 分析结果目录，相对路径相对于项目根目录
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
 
 
 class DevelopmentConfig(Config):
@@ -56,10 +144,21 @@ class ProductionConfig(Config):
     """生产环境配置"""
     DEBUG = False
     SQLALCHEMY_ECHO = False
+    # Server-Timing 头会向客户端暴露内部各阶段耗时，生产环境默认关闭（结构化日志不受影响）
+    SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'False') == 'True'
+
+
+class TestingConfig(Config):
+    """测试与基准测试配置（默认使用内存SQLite，可通过 DATABASE_URL 指定）"""
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///:memory:')
+    SQLALCHEMY_ECHO = False
+    SQLALCHEMY_ENGINE_OPTIONS = {}
 
 
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
@@ -1,8 +1,31 @@
 """
 贷款申请相关的CRUD操作
 """
+import os
+from datetime import datetime
+
+from sqlalchemy import and_, bindparam, func, insert, or_, select, update
+
 from app import db
+from app.crud.rollup_crud import add_to_rollups
+from app.crud.search_crud import index_loan_names
+from app.crud.upload_crud import claim_uploads
 from app.models.user import EnterpriseLoanInfo
+from app.utils.file_cache import JsonFileCache, load_json_file
+
+# 图表数据JSON文件路径
+FINANCIAL_DATA_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'chart-data.json'
+)
+
+
+def _load_financial_data(file_path: str) -> list:
+    """读取图表数据文件中的 financial_data 列表"""
+    return load_json_file(file_path).get('financial_data', [])
+
+
+# 进程级图表数据缓存：文件变化时自动重新加载，无需重启服务
+financial_data_cache = JsonFileCache(FINANCIAL_DATA_FILE, loader=_load_financial_data)
 
 
 def create_loan_application(loan_data: dict) -> EnterpriseLoanInfo:
@@ -10,40 +33,185 @@ def create_loan_application(loan_data: dict) -> EnterpriseLoanInfo:
     创建贷款申请
     
     Args:
-        loan_ 贷款申请数据字典
+        loan_data: 贷款申请数据字典（含提交用户 user_id）
         
     Returns:
         EnterpriseLoanInfo: 创建的贷款申请对象
     """
     loan = EnterpriseLoanInfo(**loan_data)
     db.session.add(loan)
+    db.session.flush()
+    # 上传文件在同一事务中标记为已引用，避免被孤儿文件清理删除
+    claim_uploads([loan.prop_proof_docs])
+    # 名称搜索索引和汇总统计与申请在同一事务中写入
+    index_loan_names([(loan.id, loan.ent_name)])
+    add_to_rollups([(loan.created_at, loan.industry_category, loan.loan_purpose, loan.loan_amount)])
     db.session.commit()
     db.session.refresh(loan)
     return loan
 
 
-def get_financial_data() -> list:
+def bulk_insert_loan_applications(rows: list) -> int:
     """
-    获取财务数据（从JSON文件读取）
-    用于确认页面的图表展示
+    批量插入贷款申请（executemany，一次提交，不创建ORM对象）
+    
+    名称搜索索引和汇总统计在同一事务中写入。支持 executemany RETURNING 的数据库（SQLite、PostgreSQL、MariaDB）
+    一次取回所有新ID；MySQL 不支持，插入前记录最大ID，插入后按ID范围一次查出新行再写索引。
+    ID范围内可能包含其他事务已提交的申请，这些申请已有索引，写入时跳过已存在的索引行。
     
+    Args:
+        rows: 已校验的贷款申请数据字典列表（未指定 created_at 的行会补上当前时间）
+        
     Returns:
-        list: 财务数据列表
+        int: 插入的行数
     """
-    import json
-    import os
+    if not rows:
+        return 0
     
-    # 获取JSON文件路径
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    json_file_path = os.path.join(current_dir, '..', '..', 'data', 'chart-data.json')
+    # 汇总统计按提交月份累加，提交时间在插入前确定
+    now = datetime.now()
+    for row in rows:
+        if row.get('created_at') is None:
+            row['created_at'] = now
     
+    table = EnterpriseLoanInfo.__table__
     try:
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get('financial_data', [])
-    except FileNotFoundError:
-        # 如果文件不存在，返回空列表
-        return []
-    except json.JSONDecodeError:
-        # 如果JSON格式错误，返回空列表
-        return []
+        if db.engine.dialect.insert_executemany_returning_sort_by_parameter_order:
+            result = db.session.execute(
+                insert(table).returning(table.c.id, sort_by_parameter_order=True),
+                rows
+            )
+            loan_ids = result.scalars().all()
+            index_loan_names(zip(loan_ids, (row['ent_name'] for row in rows)))
+        else:
+            max_id = db.session.execute(select(func.max(table.c.id))).scalar() or 0
+            db.session.execute(insert(table), rows)
+            index_loan_names(
+                db.session.execute(
+                    select(table.c.id, table.c.ent_name).where(table.c.id > max_id).order_by(table.c.id)
+                ).all(),
+                skip_existing=True
+            )
+        add_to_rollups(
+            (row['created_at'], row.get('industry_category'), row['loan_purpose'], row['loan_amount'])
+            for row in rows
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows)
+
+
+def list_loan_applications(limit: int, after: tuple = None, user_id=None,
+                           loan_purpose: str = None, industry_category: str = None) -> list:
+    """
+    按提交时间倒序获取贷款申请（keyset分页）
+    
+    排序键为 (created_at, id)，每种筛选条件都有以筛选字段开头的复合索引，
+    任何一页都是一次索引定位加顺序读取 limit 行，与页码无关。
+    
+    Args:
+        limit: 最多返回条数
+        after: 上一页最后一条记录的 (created_at, id)，从其之后继续
+        user_id: 只返回该用户提交的申请
+        loan_purpose: 贷款目的
+        industry_category: 所属行业
+        
+    Returns:
+        list: EnterpriseLoanInfo 列表
+    """
+    query = EnterpriseLoanInfo.query
+    if user_id is not None:
+        query = query.filter(EnterpriseLoanInfo.user_id == user_id)
+    if loan_purpose:
+        query = query.filter(EnterpriseLoanInfo.loan_purpose == loan_purpose)
+    if industry_category:
+        query = query.filter(EnterpriseLoanInfo.industry_category == industry_category)
+    if after is not None:
+        created_at, loan_id = after
+        query = query.filter(or_(
+            EnterpriseLoanInfo.created_at < created_at,
+            and_(EnterpriseLoanInfo.created_at == created_at, EnterpriseLoanInfo.id < loan_id)
+        ))
+    return (
+        query
+        .order_by(EnterpriseLoanInfo.created_at.desc(), EnterpriseLoanInfo.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def iter_loan_rows(columns: list, start=None, end=None, user_id=None, batch_size: int = 1000):
+    """
+    按提交时间顺序流式读取贷款申请（服务端游标，不创建ORM对象）
+    
+    数据库驱动每次只取 batch_size 行，内存占用与表大小无关。
+    迭代结束前连接一直被占用，调用方需要尽快消费完。
+    
+    Args:
+        columns: 读取的列名
+        start: 提交时间下限（包含）
+        end: 提交时间上限（不包含）
+        user_id: 只读取该用户提交的申请
+        batch_size: 每次从数据库读取的行数
+        
+    Yields:
+        Row: 按 columns 顺序的列值
+    """
+    table = EnterpriseLoanInfo.__table__
+    stmt = select(*(table.c[name] for name in columns))
+    if start is not None:
+        stmt = stmt.where(table.c.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(table.c.created_at < end)
+    if user_id is not None:
+        stmt = stmt.where(table.c.user_id == user_id)
+    stmt = (
+        stmt.order_by(table.c.created_at, table.c.id)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    yield from db.session.execute(stmt)
+
+
+def bulk_update_proof_doc_paths(path_mapping: list) -> int:
+    """
+    批量替换贷款申请中的财产证明文件路径（executemany，一次提交）
+    
+    Args:
+        path_mapping: [(旧路径, 新路径), ...]
+        
+    Returns:
+        int: 更新的行数
+    """
+    if not path_mapping:
+        return 0
+    
+    table = EnterpriseLoanInfo.__table__
+    stmt = (
+        update(table)
+        .where(table.c.prop_proof_docs == bindparam('old_path'))
+        .values(prop_proof_docs=bindparam('new_path'))
+    )
+    result = db.session.execute(
+        stmt,
+        [{'old_path': old, 'new_path': new} for old, new in path_mapping]
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def get_financial_data() -> list:
+    """
+    获取财务数据（从JSON文件读取，进程内缓存）
+    用于确认页面的图表展示
+
+    文件被替换后下次调用自动重新加载；新文件格式错误时继续返回上一版本数据。
+    返回的列表在请求之间共享，调用方不得修改。
+
+    Returns:
+        list: 财务数据列表
+    """
+    data = financial_data_cache.get()
+    # 文件不存在且从未成功加载时返回空列表
+    return data if data is not None else []
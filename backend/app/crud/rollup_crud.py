@@ -0,0 +1,185 @@
+"""
+贷款申请汇总相关的CRUD操作
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import delete, func, insert, select, update
+
+from app import db
+from app.models.loan_rollup import LoanPortfolioRollup
+
+# 汇总维度
+ROLLUP_DIMENSIONS = ('month', 'industry_category', 'loan_purpose')
+
+
+def aggregate_loans(loans) -> dict:
+    """
+    按汇总维度累加申请数和金额
+
+    提交时间为空的申请（早期数据）无法归入月份，不计入汇总。
+
+    Args:
+        loans: [(提交时间, 所属行业, 贷款目的, 申请金额), ...]
+
+    Returns:
+        dict: (月份, 所属行业, 贷款目的) -> [申请数, 金额合计]
+    """
+    groups = {}
+    for created_at, industry_category, loan_purpose, loan_amount in loans:
+        if created_at is None:
+            continue
+        key = (created_at.strftime('%Y-%m'), industry_category or '', loan_purpose)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = [0, Decimal('0')]
+        group[0] += 1
+        group[1] += Decimal(str(loan_amount))
+    return groups
+
+
+def _rollup_rows(groups: dict, now: datetime) -> list:
+    """
+    维度组合 -> 汇总表的行（按维度排序）
+
+    并发的 upsert 按相同的顺序锁定汇总行，避免 InnoDB 因加锁顺序相反而死锁。
+    """
+    return [
+        {
+            'month': month,
+            'industry_category': industry_category,
+            'loan_purpose': loan_purpose,
+            'app_count': count,
+            'total_amount': amount,
+            'updated_at': now,
+        }
+        for (month, industry_category, loan_purpose), (count, amount) in sorted(groups.items())
+    ]
+
+
+def _upsert_statement(dialect_name: str):
+    """
+    按数据库方言生成"不存在则插入，存在则累加"的语句
+
+    Returns:
+        语句对象；数据库不支持时返回None
+    """
+    if dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+    else:
+        return None
+
+    table = LoanPortfolioRollup.__table__
+    stmt = dialect_insert(table)
+    if dialect_name in ('mysql', 'mariadb'):
+        return stmt.on_duplicate_key_update(
+            app_count=table.c.app_count + stmt.inserted.app_count,
+            total_amount=table.c.total_amount + stmt.inserted.total_amount,
+            updated_at=stmt.inserted.updated_at
+        )
+    return stmt.on_conflict_do_update(
+        index_elements=list(ROLLUP_DIMENSIONS),
+        set_={
+            'app_count': table.c.app_count + stmt.excluded.app_count,
+            'total_amount': table.c.total_amount + stmt.excluded.total_amount,
+            'updated_at': stmt.excluded.updated_at,
+        }
+    )
+
+
+def add_to_rollups(loans) -> int:
+    """
+    将新增的贷款申请累加到汇总表（不提交，随调用方的事务一起提交）
+
+    同一批申请先在内存中按维度合并，每个维度组合只执行一次 upsert。
+
+    Args:
+        loans: [(提交时间, 所属行业, 贷款目的, 申请金额), ...]
+
+    Returns:
+        int: 更新的维度组合数
+    """
+    groups = aggregate_loans(loans)
+    if not groups:
+        return 0
+
+    now = datetime.now()
+    rows = _rollup_rows(groups, now)
+
+    stmt = _upsert_statement(db.engine.dialect.name)
+    if stmt is not None:
+        db.session.execute(stmt, rows)
+        return len(rows)
+
+    # 不支持 upsert 的数据库：先更新，不存在时插入
+    table = LoanPortfolioRollup.__table__
+    for row in rows:
+        result = db.session.execute(
+            update(table)
+            .where(table.c.month == row['month'])
+            .where(table.c.industry_category == row['industry_category'])
+            .where(table.c.loan_purpose == row['loan_purpose'])
+            .values(
+                app_count=table.c.app_count + row['app_count'],
+                total_amount=table.c.total_amount + row['total_amount'],
+                updated_at=now
+            )
+        )
+        if result.rowcount == 0:
+            db.session.execute(insert(table), row)
+    return len(rows)
+
+
+def get_rollup_stats(group_by: list, start_month: str = None, end_month: str = None) -> list:
+    """
+    从汇总表读取统计（只读汇总表，代价与维度组合数成正比）
+
+    Args:
+        group_by: 分组维度（ROLLUP_DIMENSIONS 的子集），为空时返回总计
+        start_month: 开始月份 YYYY-MM（包含）
+        end_month: 结束月份 YYYY-MM（包含）
+
+    Returns:
+        list: [(维度值..., 申请数, 金额合计), ...]
+    """
+    table = LoanPortfolioRollup.__table__
+    dimensions = [table.c[name] for name in group_by]
+    stmt = select(
+        *dimensions,
+        func.sum(table.c.app_count),
+        func.sum(table.c.total_amount)
+    )
+    if start_month:
+        stmt = stmt.where(table.c.month >= start_month)
+    if end_month:
+        stmt = stmt.where(table.c.month <= end_month)
+    if dimensions:
+        stmt = stmt.group_by(*dimensions).order_by(*dimensions)
+    return db.session.execute(stmt).all()
+
+
+def replace_rollups(groups: dict) -> int:
+    """
+    用重新计算的结果替换汇总表（删除和插入在同一事务中提交）
+
+    Args:
+        groups: aggregate_loans 的返回值
+
+    Returns:
+        int: 写入的维度组合数
+    """
+    now = datetime.now()
+    rows = _rollup_rows(groups, now)
+    try:
+        db.session.execute(delete(LoanPortfolioRollup.__table__))
+        if rows:
+            db.session.execute(insert(LoanPortfolioRollup.__table__), rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows)
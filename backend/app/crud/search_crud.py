@@ -0,0 +1,170 @@
+"""
+贷款申请搜索索引相关的CRUD操作
+"""
+from sqlalchemy import and_, delete, exists, func, insert, or_, select
+
+from app import db
+from app.models.loan_name_gram import LoanNameGram
+from app.models.user import EnterpriseLoanInfo
+from app.utils.ngram import text_grams
+
+
+def _insert_ignore_statement(dialect_name: str):
+    """
+    按数据库方言生成"已存在则跳过"的 gram 插入语句
+
+    Returns:
+        语句对象；数据库不支持时返回None
+    """
+    table = LoanNameGram.__table__
+    if dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name in ('mysql', 'mariadb'):
+        return insert(table).prefix_with('IGNORE')
+    else:
+        return None
+    return dialect_insert(table).on_conflict_do_nothing(index_elements=['gram', 'loan_id'])
+
+
+def index_loan_names(loans, skip_existing: bool = False) -> int:
+    """
+    写入企业名称 gram 索引（不提交，随调用方的事务一起提交）
+    
+    Args:
+        loans: [(贷款申请ID, 企业名称), ...]
+        skip_existing: 跳过已存在的索引行（申请可能已被其他事务索引时使用）
+        
+    Returns:
+        int: 写入的索引行数（含跳过的行）
+    """
+    loans = list(loans)
+    rows = [
+        {'gram': gram, 'loan_id': loan_id}
+        for loan_id, ent_name in loans
+        for gram in text_grams(ent_name)
+    ]
+    if not rows:
+        return 0
+    if not skip_existing:
+        db.session.execute(insert(LoanNameGram.__table__), rows)
+        return len(rows)
+    
+    stmt = _insert_ignore_statement(db.engine.dialect.name)
+    if stmt is None:
+        # 不支持跳过重复行的数据库：先删除这些申请的索引行再插入
+        db.session.execute(
+            delete(LoanNameGram.__table__)
+            .where(LoanNameGram.loan_id.in_([loan_id for loan_id, _ in loans]))
+        )
+        stmt = insert(LoanNameGram.__table__)
+    db.session.execute(stmt, rows)
+    return len(rows)
+
+
+def search_by_name_grams(grams: list, min_match: int, limit: int, after: tuple = None, user_id=None) -> list:
+    """
+    按命中的 gram 数倒序查找贷款申请
+    
+    只读取查询 gram 的索引行，代价与命中的索引行数成正比，与表大小无关。
+    
+    Args:
+        grams: 查询词的 gram 列表
+        min_match: 至少命中的 gram 数
+        limit: 最多返回条数
+        after: 上一页最后一条的 (命中数, 贷款申请ID)，从其之后继续
+        user_id: 只返回该用户提交的申请
+        
+    Returns:
+        list: [(贷款申请ID, 命中数), ...]
+    """
+    matched = func.count(LoanNameGram.gram)
+    query = (
+        db.session.query(LoanNameGram.loan_id, matched.label('matched'))
+        .filter(LoanNameGram.gram.in_(grams))
+    )
+    if user_id is not None:
+        query = (
+            query.join(EnterpriseLoanInfo, EnterpriseLoanInfo.id == LoanNameGram.loan_id)
+            .filter(EnterpriseLoanInfo.user_id == user_id)
+        )
+    query = query.group_by(LoanNameGram.loan_id).having(matched >= min_match)
+    if after is not None:
+        after_matched, loan_id = after
+        query = query.having(or_(
+            matched < after_matched,
+            and_(matched == after_matched, LoanNameGram.loan_id < loan_id)
+        ))
+    rows = (
+        query
+        .order_by(matched.desc(), LoanNameGram.loan_id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [(row.loan_id, row.matched) for row in rows]
+
+
+def search_by_uscc(uscc: str, limit: int, after_id: int = None, user_id=None) -> list:
+    """
+    按统一社会信用代码精确查找贷款申请（按ID倒序）
+    
+    Args:
+        uscc: 统一社会信用代码
+        limit: 最多返回条数
+        after_id: 上一页最后一条的ID，从其之后继续
+        user_id: 只返回该用户提交的申请
+    """
+    query = EnterpriseLoanInfo.query.filter(EnterpriseLoanInfo.uscc.in_(list({uscc, uscc.upper()})))
+    if user_id is not None:
+        query = query.filter(EnterpriseLoanInfo.user_id == user_id)
+    if after_id is not None:
+        query = query.filter(EnterpriseLoanInfo.id < after_id)
+    return query.order_by(EnterpriseLoanInfo.id.desc()).limit(limit).all()
+
+
+def get_loans_by_ids(loan_ids: list) -> dict:
+    """批量获取贷款申请，返回 ID -> EnterpriseLoanInfo"""
+    if not loan_ids:
+        return {}
+    loans = EnterpriseLoanInfo.query.filter(EnterpriseLoanInfo.id.in_(loan_ids)).all()
+    return {loan.id: loan for loan in loans}
+
+
+def rebuild_name_index(batch_size: int) -> int:
+    """
+    重建企业名称 gram 索引（按ID分批读取，每批提交一次）
+    
+    不先清空索引，重建期间搜索照常可用：只处理开始时已存在的申请（ID不超过开始时的最大ID），
+    已存在的索引行跳过，之后新建的申请由创建时的事务自行索引。
+    最后删除已不存在的申请遗留的索引行。
+    
+    Returns:
+        int: 索引的贷款申请数
+    """
+    max_id = db.session.query(func.max(EnterpriseLoanInfo.id)).scalar() or 0
+    db.session.commit()
+    
+    indexed = 0
+    last_id = 0
+    while last_id < max_id:
+        rows = (
+            db.session.query(EnterpriseLoanInfo.id, EnterpriseLoanInfo.ent_name)
+            .filter(EnterpriseLoanInfo.id > last_id, EnterpriseLoanInfo.id <= max_id)
+            .order_by(EnterpriseLoanInfo.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        index_loan_names(rows, skip_existing=True)
+        db.session.commit()
+        indexed += len(rows)
+        last_id = rows[-1][0]
+    
+    db.session.execute(
+        delete(LoanNameGram.__table__)
+        .where(~exists(select(EnterpriseLoanInfo.id).where(EnterpriseLoanInfo.id == LoanNameGram.loan_id)))
+    )
+    db.session.commit()
+    return indexed
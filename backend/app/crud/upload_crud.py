@@ -0,0 +1,123 @@
+"""
+上传文件记录相关的CRUD操作
+"""
+from datetime import datetime
+
+from sqlalchemy import and_, or_, update
+
+from app import db
+from app.models.uploaded_file import UploadedFile
+from app.models.user import EnterpriseLoanInfo
+
+
+def record_pending_upload(file_info: dict, user_id=None) -> UploadedFile:
+    """
+    记录待确认的上传文件（同一路径只记录一次）
+    
+    Args:
+        file_info: 上传文件信息
+        user_id: 上传用户ID
+        
+    Returns:
+        UploadedFile: 上传文件记录
+    """
+    record = UploadedFile.query.filter_by(file_path=file_info['file_path']).first()
+    if record is not None:
+        return record
+    
+    record = UploadedFile(
+        file_path=file_info['file_path'],
+        file_hash=file_info.get('file_hash'),
+        file_size=file_info.get('file_size'),
+        user_id=user_id,
+        status=UploadedFile.STATUS_PENDING
+    )
+    db.session.add(record)
+    db.session.commit()
+    return record
+
+
+def claim_uploads(file_paths: list) -> int:
+    """
+    将上传文件标记为已被贷款申请引用（不提交，随调用方的事务一起提交）
+    
+    Args:
+        file_paths: 文件路径列表
+        
+    Returns:
+        int: 更新的记录数
+    """
+    file_paths = [path for path in file_paths if path]
+    if not file_paths:
+        return 0
+    
+    result = db.session.execute(
+        update(UploadedFile)
+        .where(UploadedFile.file_path.in_(file_paths))
+        .where(UploadedFile.status == UploadedFile.STATUS_PENDING)
+        .values(status=UploadedFile.STATUS_CLAIMED, claimed_at=datetime.now())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def get_expired_pending_uploads(before: datetime, limit: int, after: tuple = None) -> list:
+    """
+    获取上传时间早于指定时间、仍未被引用的上传文件（按上传时间升序）
+    
+    Args:
+        before: 截止时间
+        limit: 最多返回条数
+        after: 上一批最后一条记录的 (created_at, id)，从其之后继续
+    """
+    query = (
+        UploadedFile.query
+        .filter(UploadedFile.status == UploadedFile.STATUS_PENDING)
+        .filter(UploadedFile.created_at < before)
+    )
+    if after is not None:
+        created_at, record_id = after
+        query = query.filter(or_(
+            UploadedFile.created_at > created_at,
+            and_(UploadedFile.created_at == created_at, UploadedFile.id > record_id)
+        ))
+    return (
+        query
+        .order_by(UploadedFile.created_at, UploadedFile.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def is_uploaded_by(file_path: str, user_id) -> bool:
+    """文件是否由该用户通过本系统上传（有该用户的上传记录）"""
+    if not file_path:
+        return False
+    return db.session.query(
+        UploadedFile.query.filter_by(file_path=file_path, user_id=user_id).exists()
+    ).scalar()
+
+
+def get_referenced_paths(file_paths: list) -> set:
+    """获取被贷款申请引用的文件路径"""
+    if not file_paths:
+        return set()
+    rows = (
+        db.session.query(EnterpriseLoanInfo.prop_proof_docs)
+        .filter(EnterpriseLoanInfo.prop_proof_docs.in_(file_paths))
+        .all()
+    )
+    return {row[0] for row in rows}
+
+
+def delete_upload_records(record_ids: list) -> int:
+    """批量删除上传文件记录，并提交当前事务（包括之前未提交的 claim_uploads）"""
+    deleted = 0
+    if record_ids:
+        deleted = (
+            UploadedFile.query
+            .filter(UploadedFile.id.in_(record_ids))
+            .delete(synchronize_session=False)
+        )
+    db.session.commit()
+    return deleted
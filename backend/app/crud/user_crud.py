@@ -1,22 +1,198 @@
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, insert, select
+from sqlalchemy.orm import make_transient_to_detached
+
+from app import db
 from app.models.user import User
+from app.utils.cache import LRUCache
+from app.utils.password_utils import verify_password, simulate_password_check
+
+
+def _get_user_cache():
+    """
+    获取当前应用的用户缓存（首次使用时创建），未启用时返回None
+
+    缓存的是脱离会话的用户副本，按ID和用户名两个键保存同一副本。
+    """
+    if not current_app.config.get('USER_CACHE_ENABLED', True):
+        return None
+
+    cache = current_app.extensions.get('user_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            'user_cache',
+            LRUCache(
+                max_size=current_app.config.get('USER_CACHE_MAX_SIZE', 10000),
+                ttl=current_app.config.get('USER_CACHE_TTL', 60)
+            )
+        )
+    return cache
+
+
+# 不放入缓存的列：密码哈希在各进程间无法同步失效，登录校验总是读取数据库
+UNCACHED_COLUMNS = frozenset({'password'})
+
+
+def _detached_copy(user):
+    """
+    复制用户的列数据（不含密码哈希），生成不属于任何会话的副本
+
+    未复制的列处于未加载状态，合并到会话后访问时从数据库读取。
+    """
+    copy = User(**{
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(User).column_attrs
+        if attr.key not in UNCACHED_COLUMNS
+    })
+    make_transient_to_detached(copy)
+    return copy
+
 
 class UserCrud:
     """用户数据访问层"""
 
+    @staticmethod
+    def _get_cached(key):
+        """从缓存获取用户并合并到当前会话（不查询数据库）"""
+        cache = _get_user_cache()
+        if cache is None:
+            return None
+        cached = cache.get(key)
+        if cached is None:
+            return None
+        return db.session.merge(cached, load=False)
+
+    @staticmethod
+    def _cache_user(user):
+        """缓存用户（按ID和用户名）"""
+        cache = _get_user_cache()
+        if cache is None or user is None:
+            return
+        copy = _detached_copy(user)
+        cache.set(('id', user.id), copy)
+        cache.set(('name', user.user_name), copy)
+
+    @staticmethod
+    def invalidate_user_cache(user_id=None, user_name=None):
+        """
+        移除用户缓存，用户信息更新后必须调用
+
+        :param user_id: 用户ID
+        :param user_name: 用户名
+        """
+        cache = _get_user_cache()
+        if cache is None:
+            return
+        if user_id is not None:
+            cached = cache.get(('id', user_id))
+            cache.delete(('id', user_id))
+            # 同时移除旧用户名对应的条目
+            if cached is not None:
+                cache.delete(('name', cached.user_name))
+        if user_name is not None:
+            cache.delete(('name', user_name))
+
     @staticmethod
     def get_user_by_username(user_name):
         """通过用户名获取用户"""
-        return User.query.filter_by(user_name=user_name).first()
+        user = UserCrud._get_cached(('name', user_name))
+        if user is None:
+            user = User.query.filter_by(user_name=user_name).first()
+            UserCrud._cache_user(user)
+        return user
 
     @staticmethod
     def get_user_by_id(user_id):
         """通过 ID 获取用户"""
-        return User.query.get(user_id)
+        user = UserCrud._get_cached(('id', user_id))
+        if user is None:
+            user = User.query.get(user_id)
+            UserCrud._cache_user(user)
+        return user
 
     @staticmethod
     def authenticate_user(user_name, password):
-        """验证用户登录"""
-        user = UserCrud.get_user_by_username(user_name)
-        if user and user.check_password(password):
+        """
+        验证用户登录（bcrypt 校验在密码线程池中执行）
+
+        不使用用户缓存：缓存只在本进程内失效，其他进程修改密码或删除用户后，
+        缓存的副本不能再用于登录。
+        """
+        user = User.query.filter_by(user_name=user_name).first()
+        if not user:
+            # 用户不存在时等时返回，避免通过响应时间探测用户名
+            simulate_password_check()
+            return None
+        if verify_password(password, user.password):
             return user
-        return None
\ No newline at end of file
+        return None
+
+    @staticmethod
+    def get_user_ids_by_names(user_names):
+        """
+        按用户名批量获取用户ID
+
+        :return: 用户名 -> 用户ID
+        """
+        if not user_names:
+            return {}
+        rows = db.session.execute(
+            select(User.user_name, User.id).where(User.user_name.in_(user_names))
+        )
+        return dict(rows.all())
+
+    @staticmethod
+    def bulk_create_users(rows):
+        """
+        批量创建用户（executemany，一次提交，不创建ORM对象）
+
+        :param rows: 用户数据字典列表，password 为已加密的哈希
+        :return: 创建的用户数
+        """
+        if not rows:
+            return 0
+        now = datetime.now()
+        for row in rows:
+            row.setdefault('created_at', now)
+            row.setdefault('updated_at', now)
+        try:
+            db.session.execute(insert(User), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(rows)
+
+    @staticmethod
+    def update_password_hash(user, password_hash):
+        """更新用户密码哈希"""
+        user.password = password_hash
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        UserCrud.invalidate_user_cache(user_id=user.id, user_name=user.user_name)
+        return user
+
+    @staticmethod
+    def update_user_type(user, user_type):
+        """更新用户类型"""
+        user.user_type = user_type
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        UserCrud.invalidate_user_cache(user_id=user.id, user_name=user.user_name)
+        return user
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_user_cache_on_change(mapper, connection, target):
+    """用户行被更新或删除时移除缓存（兜底，不经过 UserCrud 的修改同样生效）"""
+    if has_app_context():
+        UserCrud.invalidate_user_cache(user_id=target.id, user_name=target.user_name)
@@ -0,0 +1,19 @@
+"""
+企业名称 n-gram 倒排索引模型
+"""
+from app import db
+
+
+class LoanNameGram(db.Model):
+    """企业名称 gram -> 贷款申请ID 的倒排索引 - 对应 loan_name_gram 表
+
+    由 create_loan_application / bulk_insert_loan_applications 在插入申请的同一事务中写入，
+    已有数据通过 `flask loans reindex` 重建。
+    """
+    __tablename__ = 'loan_name_gram'
+
+    gram = db.Column(db.String(16), primary_key=True, comment='名称gram')
+    loan_id = db.Column(db.BigInteger, primary_key=True, comment='贷款申请ID')
+
+    def __repr__(self):
+        return f'<LoanNameGram {self.gram} {self.loan_id}>'
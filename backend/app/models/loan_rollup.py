@@ -0,0 +1,29 @@
+"""
+贷款申请汇总模型
+"""
+from datetime import datetime
+from app import db
+
+
+class LoanPortfolioRollup(db.Model):
+    """按月份、所属行业、贷款目的汇总的申请数和申请金额 - 对应 loan_portfolio_rollup 表
+
+    由 create_loan_application / bulk_insert_loan_applications 在插入申请的同一事务中累加，
+    可通过 `flask loans rebuild-stats` 从明细重新计算。
+    """
+    __tablename__ = 'loan_portfolio_rollup'
+
+    month = db.Column(db.String(7), primary_key=True, comment='提交月份 YYYY-MM')
+    industry_category = db.Column(db.String(100), primary_key=True, comment='所属行业（未填写为空字符串）')
+    loan_purpose = db.Column(db.String(50), primary_key=True, comment='贷款目的')
+    app_count = db.Column(db.BigInteger, nullable=False, default=0, comment='申请数')
+    total_amount = db.Column(db.Numeric(20, 2), nullable=False, default=0, comment='申请金额合计')
+    updated_at = db.Column(
+        db.DateTime,
+        default=datetime.now,
+        onupdate=datetime.now,
+        comment='更新时间'
+    )
+
+    def __repr__(self):
+        return f'<LoanPortfolioRollup {self.month} {self.industry_category} {self.loan_purpose}>'
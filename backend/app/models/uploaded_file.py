@@ -0,0 +1,33 @@
+"""
+上传文件记录模型
+"""
+from datetime import datetime
+from app import db
+
+
+class UploadedFile(db.Model):
+    """上传文件记录 - 对应 uploaded_file 表
+
+    /apply 上传文件时记为 pending，/confirm 保存引用该文件的贷款申请时改为 claimed；
+    超过保留期仍为 pending 的文件由清理命令删除。
+    """
+    __tablename__ = 'uploaded_file'
+
+    STATUS_PENDING = 'pending'
+    STATUS_CLAIMED = 'claimed'
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True, comment='主键ID')
+    file_path = db.Column(db.String(500), nullable=False, unique=True, comment='逻辑文件路径')
+    file_hash = db.Column(db.String(64), comment='文件内容SHA-256')
+    file_size = db.Column(db.BigInteger, comment='文件大小（字节）')
+    user_id = db.Column(db.BigInteger, comment='上传用户ID')
+    status = db.Column(db.String(20), nullable=False, default=STATUS_PENDING, comment='状态: pending 或 claimed')
+    created_at = db.Column(db.DateTime, default=datetime.now, comment='上传时间')
+    claimed_at = db.Column(db.DateTime, comment='被贷款申请引用的时间')
+
+    __table_args__ = (
+        db.Index('ix_uploaded_file_status_created_at', 'status', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f'<UploadedFile {self.file_path} {self.status}>'
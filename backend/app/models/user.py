@@ -1,6 +1,6 @@
 from datetime import datetime
 from app import db
-import bcrypt
+from app.utils.password_utils import hash_password, check_password_hash
 
 
 class User(db.Model):
@@ -10,7 +10,7 @@ class User(db.Model):
     id = db.Column(db.BigInteger, primary_key=True, autoincrement=True, comment='用户ID')
     user_name = db.Column(db.String(50), unique=True, nullable=False, index=True, comment='用户名')
     password = db.Column(db.String(100), nullable=False, comment='密码(加密后)')
-    user_type = db.Column(db.String(20), nullable=False, comment='用户类型: INDIVIDUAL(个人) 或 ENTERPRISE(法人)')
+    user_type = db.Column(db.String(20), nullable=False, comment='用户类型: INDIVIDUAL(个人)、ENTERPRISE(法人) 或 ADMIN(管理员)')
     created_at = db.Column(db.DateTime, default=datetime.now, comment='创建时间')
     updated_at = db.Column(
         db.DateTime,
@@ -20,16 +20,12 @@ class User(db.Model):
     )
 
     def set_password(self, password_text):
-        """设置密码 - 使用 bcrypt 加密"""
-        password_bytes = password_text.encode('utf-8')
-        salt = bcrypt.gensalt()
-        self.password = bcrypt.hashpw(password_bytes, salt).decode('utf-8')
+        """设置密码 - 使用 bcrypt 加密（工作因子见 BCRYPT_ROUNDS）"""
+        self.password = hash_password(password_text)
 
     def check_password(self, password_text):
         """验证密码"""
-        password_bytes = password_text.encode('utf-8')
-        password_hash_bytes = self.password.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, password_hash_bytes)
+        return check_password_hash(password_text, self.password)
 
     def to_dict(self):
         """转换为字典"""
@@ -51,7 +47,7 @@ class EnterpriseLoanInfo(db.Model):
 
     id = db.Column(db.BigInteger, primary_key=True, autoincrement=True, comment='主键ID')
     ent_name = db.Column(db.String(200), nullable=False, comment='企业名称')
-    uscc = db.Column(db.String(18), nullable=False, comment='统一社会信用代码')
+    uscc = db.Column(db.String(18), nullable=False, index=True, comment='统一社会信用代码')
     company_email = db.Column(db.String(200), nullable=False, comment='企业邮箱')
     company_address = db.Column(db.String(500), nullable=False, comment='企业地址')
     repay_account_bank = db.Column(db.String(50), nullable=False, comment='还款账户银行')
@@ -60,9 +56,14 @@ class EnterpriseLoanInfo(db.Model):
     loan_term = db.Column(db.String(20), nullable=False, comment='贷款期限')
     loan_purpose = db.Column(db.String(50), nullable=False, comment='贷款目的')
     prop_proof_type = db.Column(db.String(50), nullable=False, comment='财产证明类型')
-    prop_proof_docs = db.Column(db.String(500), comment='财产证明文件路径')
+    prop_proof_docs = db.Column(db.String(500), index=True, comment='财产证明文件路径')
     prop_proof_docs_name = db.Column(db.String(128), comment='财产证明文件名称')
     industry_category = db.Column(db.String(100), comment='所属行业')
+    user_id = db.Column(
+        db.BigInteger,
+        db.ForeignKey('user.id', name='fk_enterprise_loan_info_user_id'),
+        comment='提交用户ID'
+    )
     created_at = db.Column(db.DateTime, default=datetime.now, comment='创建时间')
     updated_at = db.Column(
         db.DateTime,
@@ -71,10 +72,19 @@ class EnterpriseLoanInfo(db.Model):
         comment='更新时间'
     )
 
+    # 列表按 (created_at, id) 倒序分页，每种筛选条件一个以筛选字段开头的复合索引
+    __table_args__ = (
+        db.Index('ix_enterprise_loan_info_created_at_id', 'created_at', 'id'),
+        db.Index('ix_enterprise_loan_info_user_created_at_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_enterprise_loan_info_purpose_created_at_id', 'loan_purpose', 'created_at', 'id'),
+        db.Index('ix_enterprise_loan_info_industry_created_at_id', 'industry_category', 'created_at', 'id'),
+    )
+
     def to_dict(self):
         """转换为字典"""
         return {
             'id': self.id,
+            'user_id': self.user_id,
             'ent_name': self.ent_name,
             'uscc': self.uscc,
             'company_email': self.company_email,
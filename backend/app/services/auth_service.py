@@ -1,37 +1,87 @@
+import logging
 from app.crud.user_crud import UserCrud
 from app.utils.jwt_utils import create_access_token
+from app.utils.password_utils import (
+    get_bcrypt_rounds,
+    get_password_executor,
+    hash_password,
+    needs_rehash
+)
+from app.utils.rate_limiter import get_login_throttle
+from app.utils.timing import phase
 from app.utils.exceptions import (
     UnauthorizedException,
     
 )
 
+logger = logging.getLogger(__name__)
+
 
 class AuthService:
     """认证服务层"""
 
     @staticmethod
-    def login_user(login_data):
+    def login_user(login_data, client_ip=None):
         """用户登录"""
-        user = UserCrud.authenticate_user(
-            login_data.user_name,
-            login_data.password,
-        )
+        # 失败次数限流：在查询用户和 bcrypt 校验之前执行
+        throttle = get_login_throttle()
+        if throttle:
+            with phase('throttle'):
+                throttle.acquire(login_data.user_name, client_ip)
+
+        try:
+            with phase('password'):
+                user = UserCrud.authenticate_user(
+                    login_data.user_name,
+                    login_data.password,
+                )
+        except Exception:
+            # 密码线程池拒绝或数据库出错不是登录失败，退还本次扣除的额度
+            if throttle:
+                throttle.release(login_data.user_name, client_ip)
+            raise
 
         if not user:
             raise UnauthorizedException('用户名或密码错误')
 
+        if throttle:
+            throttle.release(login_data.user_name, client_ip)
+
+        # 工作因子低于当前配置的旧哈希，借本次登录的明文密码重新哈希
+        if needs_rehash(user.password):
+            with phase('rehash'):
+                AuthService.rehash_password(user, login_data.password)
+
         # 生成 JWT token
-        access_token = create_access_token(
-            user_id=user.id,
-            username=user.user_name,
-            user_type=user.user_type
-        )
+        with phase('token'):
+            access_token = create_access_token(
+                user_id=user.id,
+                username=user.user_name,
+                user_type=user.user_type
+            )
 
         return {
             'access_token': access_token,
             'user': user
         }
 
+    @staticmethod
+    def rehash_password(user, password_text):
+        """
+        按当前工作因子重新哈希用户密码
+
+        重新哈希失败不影响本次登录，下次登录时再次尝试。
+        """
+        try:
+            rounds = get_bcrypt_rounds()
+            password_hash = get_password_executor().submit(
+                hash_password, password_text, rounds
+            ).result()
+            UserCrud.update_password_hash(user, password_hash)
+            logger.info(f"用户密码已按新工作因子重新哈希: user_id={user.id}, rounds={rounds}")
+        except Exception as e:
+            logger.warning(f"用户密码重新哈希失败: user_id={user.id}, {str(e)}")
+
     @staticmethod
     def get_current_user_info(user_id):
         """获取当前用户信息"""
@@ -0,0 +1,190 @@
+"""
+贷款申请流式导出服务
+
+按提交时间顺序以服务端游标逐批读取，边读边序列化为 CSV 或 NDJSON，
+按块输出到 HTTP 分块响应或文件，可选 gzip 压缩；内存占用与导出行数无关。
+"""
+import csv
+import io
+import json
+import logging
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask import current_app
+
+from app.crud.loan_crud import iter_loan_rows
+from app.utils.exceptions import BadRequestException
+
+logger = logging.getLogger(__name__)
+
+# 支持的导出格式
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+# 格式 -> Content-Type
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+# 导出的列（CSV 表头顺序）
+EXPORT_FIELDS = (
+    'id', 'user_id', 'ent_name', 'uscc', 'company_email', 'company_address',
+    'repay_account_bank', 'repay_account_no', 'loan_amount', 'loan_term', 'loan_purpose',
+    'prop_proof_type', 'prop_proof_docs', 'prop_proof_docs_name', 'industry_category',
+    'created_at', 'updated_at',
+)
+
+# 序列化结果累积到该大小后输出一块
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _json_default(value):
+    """NDJSON 中的金额与时间（与 to_dict 一致）"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'无法序列化 {type(value).__name__}')
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class LoanExportService:
+    """贷款申请导出服务类"""
+
+    @staticmethod
+    def parse_date_range(start: str = None, end: str = None) -> tuple:
+        """
+        解析提交时间范围
+
+        Args:
+            start: 开始日期（YYYY-MM-DD）或时间（ISO 8601），包含
+            end: 结束日期（包含当天）或时间（不包含）
+
+        Returns:
+            tuple: (开始时间, 结束时间)，未指定的一端为None
+
+        Raises:
+            BadRequestException: 日期格式错误或开始晚于结束
+        """
+        def parse(value, is_end):
+            if not value:
+                return None
+            try:
+                if len(value) == 10:
+                    day = datetime.fromisoformat(value)
+                    return day + timedelta(days=1) if is_end else day
+                return datetime.fromisoformat(value)
+            except ValueError:
+                raise BadRequestException(f'日期格式错误: {value}，应为 YYYY-MM-DD 或 ISO 8601 时间')
+
+        start_at, end_at = parse(start, False), parse(end, True)
+        if start_at and end_at and start_at >= end_at:
+            raise BadRequestException('开始日期不能晚于结束日期')
+        return start_at, end_at
+
+    @staticmethod
+    def iter_csv(rows):
+        """
+        序列化为 CSV（UTF-8 带 BOM，便于 Excel 打开；批量导入接口可直接读取）
+
+        Yields:
+            bytes: 约 EXPORT_CHUNK_SIZE 大小的数据块
+        """
+        buffer = io.StringIO()
+        buffer.write('\ufeff')
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            writer.writerow([_csv_value(value) for value in row])
+            if buffer.tell() >= EXPORT_CHUNK_SIZE:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode('utf-8')
+
+    @staticmethod
+    def iter_ndjson(rows):
+        """
+        序列化为 NDJSON（每行一个JSON对象）
+
+        Yields:
+            bytes: 约 EXPORT_CHUNK_SIZE 大小的数据块
+        """
+        lines = []
+        size = 0
+        for row in rows:
+            line = json.dumps(
+                dict(zip(EXPORT_FIELDS, row)),
+                ensure_ascii=False,
+                separators=(',', ':'),
+                default=_json_default
+            )
+            lines.append(line)
+            size += len(line)
+            if size >= EXPORT_CHUNK_SIZE:
+                yield ('\n'.join(lines) + '\n').encode('utf-8')
+                lines = []
+                size = 0
+        if lines:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+    @staticmethod
+    def gzip_chunks(chunks, level: int = 6):
+        """将数据块流式压缩为 gzip 格式"""
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    @staticmethod
+    def stream(fmt: str, start=None, end=None, user_id=None, compress: bool = False, stats: dict = None):
+        """
+        导出贷款申请
+
+        Args:
+            fmt: csv 或 ndjson
+            start: 提交时间下限（包含）
+            end: 提交时间上限（不包含）
+            user_id: 只导出该用户提交的申请
+            compress: 是否 gzip 压缩
+            stats: 传入时在导出结束后写入导出行数和耗时
+
+        Returns:
+            数据块（bytes）迭代器，迭代时才读取数据库
+
+        Raises:
+            BadRequestException: 不支持的格式
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise BadRequestException('不支持的导出格式，仅支持 csv 或 ndjson')
+
+        batch_size = current_app.config.get('LOAN_EXPORT_BATCH_SIZE', 1000)
+
+        def rows():
+            count = 0
+            started = time.perf_counter()
+            for row in iter_loan_rows(EXPORT_FIELDS, start, end, user_id, batch_size):
+                count += 1
+                yield row
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            logger.info(f"导出完成: 共{count}行，耗时{elapsed_ms}ms")
+            if stats is not None:
+                stats.update(rows=count, elapsed_ms=elapsed_ms)
+
+        serialize = LoanExportService.iter_csv if fmt == 'csv' else LoanExportService.iter_ndjson
+        chunks = serialize(rows())
+        if compress:
+            chunks = LoanExportService.gzip_chunks(chunks)
+        return chunks
@@ -0,0 +1,208 @@
+"""
+贷款申请批量导入服务
+
+支持 CSV（首行为字段名）和 NDJSON（每行一个JSON对象）两种格式，逐行流式读取：
+每行经过与 /apply 相同的 Pydantic 验证和业务规则验证，
+通过的行按批次以 executemany 批量插入，未通过的行记录行号和错误信息。
+
+导入的申请不含财产证明文件，行中的 prop_proof_docs / prop_proof_docs_name 会被忽略，
+文件只能通过上传接口提交。
+"""
+import csv
+import io
+import json
+import logging
+import time
+
+from flask import current_app
+
+from app.crud.loan_crud import bulk_insert_loan_applications
+from app.services.validation_service import FILE_PLACEHOLDERS, validate_loan_data, with_file_placeholders
+from app.utils.exceptions import BadRequestException
+
+logger = logging.getLogger(__name__)
+
+# 支持的导入格式
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# Content-Type -> 导入格式
+CONTENT_TYPE_FORMATS = {
+    'text/csv': 'csv',
+    'application/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+
+
+class LoanImportService:
+    """贷款申请批量导入服务类"""
+
+    @staticmethod
+    def resolve_format(fmt: str = None, content_type: str = None, file_name: str = None) -> str:
+        """
+        确定导入格式：显式指定 > Content-Type > 文件扩展名
+
+        Raises:
+            BadRequestException: 无法确定或不支持的格式
+        """
+        if fmt:
+            fmt = fmt.lower()
+        elif content_type:
+            fmt = CONTENT_TYPE_FORMATS.get(content_type.split(';', 1)[0].strip().lower())
+        if not fmt and file_name:
+            extension = file_name.rsplit('.', 1)[-1].lower()
+            fmt = 'ndjson' if extension in ('ndjson', 'jsonl') else extension
+
+        if fmt not in IMPORT_FORMATS:
+            raise BadRequestException('不支持的导入格式，仅支持 csv 或 ndjson')
+        return fmt
+
+    @staticmethod
+    def iter_records(stream, fmt: str):
+        """
+        逐行读取导入数据
+
+        Args:
+            stream: 二进制流（请求体或文件）
+            fmt: csv 或 ndjson
+
+        Yields:
+            tuple: (行号, 数据字典, 解析错误)，解析失败时数据字典为None
+        """
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+        if fmt == 'csv':
+            reader = csv.DictReader(text)
+            for row_number, row in enumerate(reader, start=1):
+                # 去掉空列名（行尾多余逗号）和多余的列
+                yield row_number, {k.strip(): v for k, v in row.items() if k and k.strip()}, None
+            return
+
+        row_number = 0
+        for line in text:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield row_number, None, 'JSON格式错误'
+                continue
+            if not isinstance(record, dict):
+                yield row_number, None, '每行必须是JSON对象'
+                continue
+            yield row_number, record, None
+
+    @staticmethod
+    def _insert_batch(batch: list, report: dict, max_errors: int):
+        """
+        插入一批数据；整批失败时逐行重试，定位出错的行
+        """
+        try:
+            report['imported'] += bulk_insert_loan_applications([row for _, row in batch])
+            return
+        except Exception as e:
+            # 只记录数据库错误本身，不记录行数据
+            logger.warning(f"批量插入失败，逐行重试: {str(getattr(e, 'orig', e))}")
+
+        for row_number, row in batch:
+            try:
+                report['imported'] += bulk_insert_loan_applications([row])
+            except Exception as e:
+                LoanImportService._add_error(report, max_errors, row_number, [{
+                    'field': None,
+                    'msg': f"保存失败: {str(getattr(e, 'orig', e))}",
+                    'type': 'database'
+                }])
+
+    @staticmethod
+    def _add_error(report: dict, max_errors: int, row_number: int, errors: list):
+        """记录行错误，超过上限后只计数"""
+        report['failed'] += 1
+        if len(report['errors']) < max_errors:
+            report['errors'].append({'row': row_number, 'errors': errors})
+        else:
+            report['errors_truncated'] = True
+
+    @staticmethod
+    def import_records(records, batch_size: int = None, user_id=None) -> dict:
+        """
+        校验并批量插入贷款申请
+
+        Args:
+            records: iter_records 产生的 (行号, 数据字典, 解析错误)
+            batch_size: 每批插入的行数，默认读取 LOAN_IMPORT_BATCH_SIZE
+            user_id: 导入用户ID，记为每条申请的提交用户
+
+        Returns:
+            dict: 导入报告（总行数、成功数、失败数、逐行错误、耗时、每秒行数）
+        """
+        batch_size = batch_size or current_app.config.get('LOAN_IMPORT_BATCH_SIZE', 500)
+        max_errors = current_app.config.get('LOAN_IMPORT_MAX_ERRORS', 1000)
+        report = {
+            'total': 0,
+            'imported': 0,
+            'failed': 0,
+            'errors': [],
+            'errors_truncated': False
+        }
+        started = time.perf_counter()
+        batch = []
+
+        for row_number, record, parse_error in records:
+            report['total'] += 1
+            if parse_error:
+                LoanImportService._add_error(report, max_errors, row_number, [{
+                    'field': None,
+                    'msg': parse_error,
+                    'type': 'parse_error'
+                }])
+                continue
+
+            loan_data, errors = validate_loan_data(with_file_placeholders(record))
+            if errors:
+                LoanImportService._add_error(report, max_errors, row_number, errors)
+                continue
+
+            row = loan_data.model_dump()
+            for field in FILE_PLACEHOLDERS:
+                row[field] = None
+            row['user_id'] = user_id
+            batch.append((row_number, row))
+
+            if len(batch) >= batch_size:
+                LoanImportService._insert_batch(batch, report, max_errors)
+                batch = []
+
+        if batch:
+            LoanImportService._insert_batch(batch, report, max_errors)
+
+        elapsed = time.perf_counter() - started
+        report['elapsed_ms'] = round(elapsed * 1000, 1)
+        report['rows_per_second'] = round(report['total'] / elapsed) if elapsed > 0 else None
+        logger.info(
+            f"批量导入完成: 共{report['total']}行，成功{report['imported']}行，"
+            f"失败{report['failed']}行，耗时{report['elapsed_ms']}ms"
+        )
+        return report
+
+    @staticmethod
+    def import_stream(stream, fmt: str, batch_size: int = None, user_id=None) -> dict:
+        """
+        从CSV或NDJSON流导入贷款申请
+
+        Args:
+            stream: 二进制流
+            fmt: csv 或 ndjson
+            batch_size: 每批插入的行数
+            user_id: 导入用户ID
+
+        Returns:
+            dict: 导入报告
+        """
+        return LoanImportService.import_records(
+            LoanImportService.iter_records(stream, fmt),
+            batch_size=batch_size,
+            user_id=user_id
+        )
@@ -3,13 +3,42 @@
 """
 from app.crud.loan_crud import (
     create_loan_application,
-    get_financial_data
+    get_financial_data,
+    financial_data_cache,
+    iter_loan_rows,
+    list_loan_applications
+)
+from app.crud.rollup_crud import (
+    ROLLUP_DIMENSIONS,
+    aggregate_loans,
+    get_rollup_stats,
+    replace_rollups
+)
+from app.crud.search_crud import (
+    get_loans_by_ids,
+    rebuild_name_index,
+    search_by_name_grams,
+    search_by_uscc
 )
 from app.models.user import EnterpriseLoanInfo
-from werkzeug.datastructures import FileStorage
+from app.services.storage_service import StorageService
+from app.utils.exceptions import BadRequestException
+from app.utils.ngram import query_grams
+from app.utils.pagination import decode_cursor, encode_cursor
 from flask import current_app
-import os
+from werkzeug.datastructures import FileStorage
 from datetime import datetime
+import gzip
+import hashlib
+import json
+import math
+import re
+
+# 统一社会信用代码格式：搜索词符合时按信用代码精确查找
+USCC_PATTERN = re.compile(r'^[0-9A-Za-z]{18}$')
+
+# 统计月份格式
+MONTH_PATTERN = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
 
 
 class LoanService:
@@ -23,67 +52,251 @@ class LoanService:
         Returns:
             str: 上传文件夹的绝对路径
         """
-        upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads/loan_docs')
-        
-        # 判断是否为绝对路径
-        if os.path.isabs(upload_folder):
-            # 绝对路径，直接使用
-            return upload_folder
-        else:
-            # 相对路径，相对于项目根目录
-            # 获取项目根目录（backend目录的上一级）
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            return os.path.join(project_root, upload_folder)
+        return StorageService.get_upload_folder()
     
     @staticmethod
-    def upload_file_only(file: FileStorage = None) -> dict:
+    def upload_file_only(file: FileStorage = None, user_id=None) -> dict:
         """
         只上传文件，不保存到数据库
         支持通过配置文件指定任意上传路径（绝对路径或相对路径）
         
+        文件内容按SHA-256去重保存（见 StorageService），
+        返回的 file_path 是指向内容的逻辑文件路径。
+        文件记为待确认，超过保留期仍未被贷款申请引用的由 `flask uploads gc` 清理。
+        
         Args:
             file: 上传的文件
+            user_id: 上传用户ID
             
         Returns:
-            dict: 文件信息
+            dict: 文件信息（路径、文件名、大小、SHA-256、检测出的文件类型、是否重复内容）
         """
         if not file or not file.filename:
             return {'file_path': None, 'file_name': None}
         
-        # 获取配置的上传目录
-        upload_folder = LoanService.get_upload_folder()
+        file_info = StorageService.store_file(file)
+        StorageService.record_pending_upload(file_info, user_id)
+        return file_info
+    
+    @staticmethod
+    def save_to_database(loan_data: dict, user_id=None) -> EnterpriseLoanInfo:
+        """
+        保存贷款申请到数据库
+        
+        Args:
+            loan_data: 贷款申请数据
+            user_id: 提交用户ID
+            
+        Returns:
+            EnterpriseLoanInfo: 创建的贷款申请对象
+        """
+        return create_loan_application(dict(loan_data, user_id=user_id))
+    
+    @staticmethod
+    def _page_size(limit: int = None) -> int:
+        """每页条数，默认 LOAN_LIST_PAGE_SIZE，限制在 1 到 LOAN_LIST_MAX_PAGE_SIZE 之间"""
+        max_limit = current_app.config.get('LOAN_LIST_MAX_PAGE_SIZE', 100)
+        return min(max(limit or current_app.config.get('LOAN_LIST_PAGE_SIZE', 20), 1), max_limit)
+    
+    @staticmethod
+    def list_applications(limit: int = None, cursor: str = None, user_id=None,
+                          loan_purpose: str = None, industry_category: str = None) -> dict:
+        """
+        按提交时间倒序分页获取贷款申请
         
-        # 创建上传目录（如果不存在）
-        os.makedirs(upload_folder, exist_ok=True)
+        Args:
+            limit: 每页条数，默认 LOAN_LIST_PAGE_SIZE，最大 LOAN_LIST_MAX_PAGE_SIZE
+            cursor: 上一页返回的 next_cursor，为空时获取第一页
+            user_id: 只返回该用户提交的申请
+            loan_purpose: 贷款目的
+            industry_category: 所属行业
+            
+        Returns:
+            dict: items 申请列表, next_cursor 下一页游标（没有下一页时为None）, has_more 是否还有下一页
+            
+        Raises:
+            BadRequestException: 游标无效
+        """
+        limit = LoanService._page_size(limit)
         
-        # 生成唯一文件名
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        filename = f"{timestamp}_{file.filename}"
-        filepath = os.path.join(upload_folder, filename)
+        after = None
+        if cursor:
+            created_at, loan_id = decode_cursor(cursor, 2)
+            try:
+                after = (datetime.fromisoformat(created_at), int(loan_id))
+            except (TypeError, ValueError):
+                raise BadRequestException('无效的分页游标')
         
-        # 保存文件
-        file.save(filepath)
+        # 多取一条判断是否还有下一页
+        loans = list_loan_applications(
+            limit + 1,
+            after=after,
+            user_id=user_id,
+            loan_purpose=loan_purpose,
+            industry_category=industry_category
+        )
+        has_more = len(loans) > limit
+        loans = loans[:limit]
         
-        # 统一使用正斜线，避免Windows系统的反斜线问题
-        filepath_normalized = filepath.replace('\\', '/')
+        next_cursor = None
+        if has_more:
+            last = loans[-1]
+            next_cursor = encode_cursor([last.created_at.isoformat(), last.id])
         
         return {
-            'file_path': filepath_normalized,
-            'file_name': file.filename
+            'items': [loan.to_dict() for loan in loans],
+            'next_cursor': next_cursor,
+            'has_more': has_more
         }
     
     @staticmethod
-    def save_to_database(loan_data: dict) -> EnterpriseLoanInfo:
+    def search_applications(query: str, limit: int = None, cursor: str = None, user_id=None) -> dict:
         """
-        保存贷款申请到数据库
+        按企业名称或统一社会信用代码搜索贷款申请
+        
+        - 搜索词是18位英数字时按统一社会信用代码精确查找，按提交先后倒序
+        - 否则按企业名称 bigram 索引查找，至少命中 LOAN_SEARCH_MIN_MATCH_RATIO 比例的 gram，
+          按命中数倒序（相同时新申请在前），score 为命中比例
         
         Args:
-            loan_ 贷款申请数据
+            query: 搜索词
+            limit: 每页条数
+            cursor: 上一页返回的 next_cursor
+            user_id: 只返回该用户提交的申请
             
         Returns:
-            EnterpriseLoanInfo: 创建的贷款申请对象
+            dict: items 申请列表（含 score）, next_cursor 下一页游标, has_more 是否还有下一页
+            
+        Raises:
+            BadRequestException: 搜索词过短或游标无效
         """
-        return create_loan_application(loan_data)
+        query = (query or '').strip()
+        limit = LoanService._page_size(limit)
+        
+        if USCC_PATTERN.match(query):
+            after_id = None
+            if cursor:
+                after_id, = decode_cursor(cursor, 1)
+                if not isinstance(after_id, int):
+                    raise BadRequestException('无效的分页游标')
+            loans = search_by_uscc(query, limit + 1, after_id=after_id, user_id=user_id)
+            has_more = len(loans) > limit
+            loans = loans[:limit]
+            return {
+                'items': [dict(loan.to_dict(), score=1.0) for loan in loans],
+                'next_cursor': encode_cursor([loans[-1].id]) if has_more else None,
+                'has_more': has_more
+            }
+        
+        grams = query_grams(query)
+        if not grams or len(grams[0]) < 2:
+            raise BadRequestException('搜索词至少包含2个字符')
+        
+        after = None
+        if cursor:
+            after = tuple(decode_cursor(cursor, 2))
+            if not all(isinstance(value, int) for value in after):
+                raise BadRequestException('无效的分页游标')
+        
+        ratio = current_app.config.get('LOAN_SEARCH_MIN_MATCH_RATIO', 0.5)
+        min_match = min(max(math.ceil(len(grams) * ratio), 1), len(grams))
+        matches = search_by_name_grams(grams, min_match, limit + 1, after=after, user_id=user_id)
+        has_more = len(matches) > limit
+        matches = matches[:limit]
+        
+        next_cursor = None
+        if has_more:
+            last_id, last_matched = matches[-1]
+            next_cursor = encode_cursor([last_matched, last_id])
+        
+        loans = get_loans_by_ids([loan_id for loan_id, _ in matches])
+        items = [
+            dict(loans[loan_id].to_dict(), score=round(matched / len(grams), 3))
+            for loan_id, matched in matches
+            if loan_id in loans
+        ]
+        return {
+            'items': items,
+            'next_cursor': next_cursor,
+            'has_more': has_more
+        }
+    
+    @staticmethod
+    def rebuild_search_index(batch_size: int = 1000) -> int:
+        """
+        重建企业名称搜索索引（用于索引上线前已有的数据）
+        
+        Args:
+            batch_size: 每批读取的贷款申请数
+            
+        Returns:
+            int: 索引的贷款申请数
+        """
+        return rebuild_name_index(batch_size)
+    
+    @staticmethod
+    def get_portfolio_stats(group_by: list = None, start_month: str = None, end_month: str = None) -> dict:
+        """
+        获取贷款申请汇总统计（只读汇总表，不扫描申请明细）
+        
+        Args:
+            group_by: 分组维度，month / industry_category / loan_purpose 的子集，默认全部
+            start_month: 开始月份 YYYY-MM（包含）
+            end_month: 结束月份 YYYY-MM（包含）
+            
+        Returns:
+            dict: groups 各分组的申请数和金额合计, total 总计
+            
+        Raises:
+            BadRequestException: 分组维度或月份格式错误
+        """
+        group_by = list(ROLLUP_DIMENSIONS) if group_by is None else group_by
+        unknown = [name for name in group_by if name not in ROLLUP_DIMENSIONS]
+        if unknown:
+            raise BadRequestException(
+                f"不支持的分组维度: {', '.join(unknown)}，可选: {', '.join(ROLLUP_DIMENSIONS)}"
+            )
+        for month in (start_month, end_month):
+            if month and not MONTH_PATTERN.match(month):
+                raise BadRequestException(f'月份格式错误: {month}，应为 YYYY-MM')
+        
+        groups = []
+        total_count = 0
+        total_amount = 0.0
+        for row in get_rollup_stats(group_by, start_month, end_month):
+            group = dict(zip(group_by, row))
+            if 'industry_category' in group:
+                group['industry_category'] = group['industry_category'] or None
+            count, amount = int(row[-2] or 0), float(row[-1] or 0)
+            group.update(count=count, total_amount=amount)
+            groups.append(group)
+            total_count += count
+            total_amount += amount
+        
+        return {
+            'group_by': group_by,
+            'groups': groups,
+            'total': {'count': total_count, 'total_amount': round(total_amount, 2)}
+        }
+    
+    @staticmethod
+    def rebuild_portfolio_stats(batch_size: int = 1000) -> int:
+        """
+        从申请明细重新计算汇总表（流式读取明细，内存占用与维度组合数成正比）
+        
+        重建期间新提交的申请可能被重复或遗漏计入，应在提交较少时执行。
+        
+        Args:
+            batch_size: 每次从数据库读取的行数
+            
+        Returns:
+            int: 汇总表的维度组合数
+        """
+        groups = aggregate_loans(iter_loan_rows(
+            ['created_at', 'industry_category', 'loan_purpose', 'loan_amount'],
+            batch_size=batch_size
+        ))
+        return replace_rollups(groups)
     
     @staticmethod
     def create_application(data: dict, file: FileStorage = None) -> EnterpriseLoanInfo:
@@ -114,3 +327,44 @@ class LoanService:
             list: 财务数据列表
         """
         return get_financial_data()
+    
+    @staticmethod
+    def _build_chart_payload(financial_data) -> dict:
+        """
+        预序列化、预压缩图表数据响应体
+
+        响应体只由数据决定（不含时间戳），保证同一份数据在所有进程中
+        生成完全相同的字节和 ETag。
+        
+        Args:
+            financial_data: 财务数据列表
+            
+        Returns:
+            dict: body（JSON字节）、gzip_body（gzip压缩字节）、etag（强ETag，不含引号）
+        """
+        body = json.dumps(
+            {
+                'code': 0,
+                'msg': '成功',
+                'data': {'financial_data': financial_data or []}
+            },
+            ensure_ascii=False,
+            separators=(',', ':')
+        ).encode('utf-8')
+        
+        return {
+            'body': body,
+            # mtime=0 保证压缩结果稳定
+            'gzip_body': gzip.compress(body, compresslevel=9, mtime=0),
+            'etag': hashlib.sha256(body).hexdigest()[:32]
+        }
+    
+    @staticmethod
+    def get_chart_payload() -> dict:
+        """
+        获取预序列化的图表数据响应体，数据文件变化后自动重建
+        
+        Returns:
+            dict: body、gzip_body、etag
+        """
+        return financial_data_cache.get_derived('http_payload', LoanService._build_chart_payload)
@@ -0,0 +1,265 @@
+"""
+合成数据生成服务（负载与规模测试）
+
+按随机种子生成可复现的用户和贷款申请：相同的种子、数量和时间范围总是生成相同的数据。
+生成的申请满足 LoanApplicationCreate 的校验（带校验位的18位统一社会信用代码、19位还款账号）
+和当前的业务规则（贷款期限按贷款目的重新抽取，直到通过规则），
+通过 bulk_insert_loan_applications 分批写入，同时维护名称搜索索引和汇总统计。
+
+可选为每条申请创建稀疏的财产证明文件：文件只写入PDF文件头，其余部分不占用磁盘空间。
+"""
+import logging
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.crud.loan_crud import bulk_insert_loan_applications
+from app.crud.user_crud import UserCrud
+from app.services.storage_service import FILES_DIR, StorageService
+from app.services.validation_service import get_loan_rules
+from app.utils.password_utils import hash_password
+from app.utils.upload_utils import generate_ulid
+
+logger = logging.getLogger(__name__)
+
+# 生成用户的用户名前缀和登录密码
+SEED_USER_PREFIX = 'seed_user_'
+SEED_PASSWORD = 'Seed1234'
+
+# 与前端表单选项一致（frontend/src/constants/formOptions.js）
+BANKS = ('chinaBank', 'industryBank', 'businessBank')
+LOAN_TERMS = ('0.5', '1', '2', '3', '5', '10', '20', '30')
+INDUSTRY_CATEGORIES = ('01', '02', '03')
+PROOF_TYPES = {
+    'credit': ('businessLicense', 'financialStatements', 'enterpriseCreditReport', 'taxCertification', 'bankStatement'),
+    'mortgage': ('estateCertificate', 'landUseCertificate', 'vehicleRegistrationCertificate', 'equipmentCertificate'),
+    'tax': ('taxReport', 'taxPaymentCertificate'),
+}
+LOAN_PURPOSES = tuple(PROOF_TYPES)
+
+# 城市与行政区划代码（统一社会信用代码第3-8位）
+REGIONS = (
+    ('北京', '110105'), ('上海', '310115'), ('深圳', '440300'), ('广州', '440106'),
+    ('杭州', '330106'), ('南京', '320102'), ('成都', '510107'), ('武汉', '420106'),
+)
+NAME_WORDS = (
+    '华信', '恒达', '金源', '瑞丰', '鼎盛', '宏图', '新元', '安泰',
+    '长城', '远航', '中科', '博雅', '天成', '汇通', '隆基', '永兴',
+)
+INDUSTRY_WORDS = {
+    '01': ('农业', '渔业', '林业', '牧业'),
+    '02': ('化工', '材料', '新能源', '塑胶'),
+    '03': ('投资', '资产管理', '商业保理', '融资租赁'),
+}
+COMPANY_SUFFIXES = ('有限公司', '股份有限公司', '科技有限公司')
+ROADS = ('人民', '建设', '解放', '中山', '科技', '创业', '长江', '滨江')
+EMAIL_DOMAINS = ('example.com', 'example.cn', 'example.net')
+
+# 贷款金额范围（对数均匀分布，按万元取整）
+MIN_LOAN_AMOUNT = 100000
+MAX_LOAN_AMOUNT = 50000000
+
+# 财产证明文件的文件头
+PROOF_FILE_HEAD = b'%PDF-1.4\n'
+
+# 统一社会信用代码字符集（不含 I、O、S、V、Z）与各位权重（GB 32100-2015）
+USCC_CHARSET = '0123456789ABCDEFGHJKLMNPQRTUWXY'
+USCC_WEIGHTS = (1, 3, 9, 27, 19, 26, 16, 17, 20, 29, 25, 13, 8, 24, 10, 30, 28)
+
+# 组织机构代码本体字符集与各位权重（GB 11714-1997）
+ORG_CODE_CHARSET = '0123456789ABCDEFGHJKLMNPQRTUWXY'
+ORG_CODE_WEIGHTS = (3, 7, 9, 10, 5, 8, 4, 2)
+
+
+def uscc_check_char(code: str) -> str:
+    """
+    计算统一社会信用代码的校验位
+
+    :param code: 前17位
+    :return: 第18位校验字符
+    """
+    total = sum(USCC_CHARSET.index(char) * weight for char, weight in zip(code, USCC_WEIGHTS))
+    return USCC_CHARSET[(31 - total % 31) % 31]
+
+
+def _org_code(rng: random.Random) -> str:
+    """生成带校验位的9位组织机构代码"""
+    body = ''.join(rng.choice(ORG_CODE_CHARSET) for _ in range(8))
+    # 字母按 A=10 ... Z=35 计值
+    total = sum(int(char, 36) * weight for char, weight in zip(body, ORG_CODE_WEIGHTS))
+    check = 11 - total % 11
+    return body + ('X' if check == 10 else '0' if check == 11 else str(check))
+
+
+def generate_uscc(rng: random.Random, region_code: str) -> str:
+    """生成统一社会信用代码：9(工商) + 1(企业) + 行政区划代码 + 组织机构代码 + 校验位"""
+    code = f'91{region_code}{_org_code(rng)}'
+    return code + uscc_check_char(code)
+
+
+class SeedService:
+    """合成数据生成服务类"""
+
+    @staticmethod
+    def ensure_users(count: int) -> list:
+        """
+        创建生成数据使用的用户（已存在的直接复用）
+
+        所有用户使用相同的登录密码 SEED_PASSWORD，密码只加密一次。
+
+        Args:
+            count: 用户数
+
+        Returns:
+            list: 用户ID列表（按用户名排序）
+        """
+        user_names = [f'{SEED_USER_PREFIX}{index:06d}' for index in range(1, count + 1)]
+        existing = UserCrud.get_user_ids_by_names(user_names)
+        missing = [name for name in user_names if name not in existing]
+        if missing:
+            password = hash_password(SEED_PASSWORD)
+            UserCrud.bulk_create_users([
+                {'user_name': name, 'password': password, 'user_type': 'ENTERPRISE'}
+                for name in missing
+            ])
+            existing = UserCrud.get_user_ids_by_names(user_names)
+        return [existing[name] for name in user_names]
+
+    @staticmethod
+    def generate_application(rng: random.Random, rules, created_at: datetime) -> dict:
+        """
+        生成一条贷款申请（不含财产证明文件）
+
+        贷款期限不满足业务规则时重新抽取；所有期限都不满足时使用最短期限。
+
+        Args:
+            rng: 随机数生成器
+            rules: 编译后的业务规则（CompiledRuleSet）
+            created_at: 提交时间
+        """
+        city, region_code = rng.choice(REGIONS)
+        industry = rng.choice(INDUSTRY_CATEGORIES)
+        purpose = rng.choice(LOAN_PURPOSES)
+        amount = math.exp(rng.uniform(math.log(MIN_LOAN_AMOUNT), math.log(MAX_LOAN_AMOUNT)))
+
+        row = {
+            'ent_name': (
+                f'{city}{rng.choice(NAME_WORDS)}{rng.choice(NAME_WORDS)}'
+                f'{rng.choice(INDUSTRY_WORDS[industry])}{rng.choice(COMPANY_SUFFIXES)}'
+            ),
+            'uscc': generate_uscc(rng, region_code),
+            'company_email': f'finance{rng.randrange(10 ** 6):06d}@{rng.choice(EMAIL_DOMAINS)}',
+            'company_address': f'{city}市{rng.choice(ROADS)}路{rng.randint(1, 999)}号',
+            'repay_account_bank': rng.choice(BANKS),
+            'repay_account_no': f'62{rng.randrange(10 ** 17):017d}',
+            'loan_amount': float(round(amount, -4)),
+            'loan_term': rng.choice(LOAN_TERMS),
+            'loan_purpose': purpose,
+            'prop_proof_type': rng.choice(PROOF_TYPES[purpose]),
+            'industry_category': industry,
+            'created_at': created_at,
+        }
+
+        terms = list(LOAN_TERMS)
+        while not rules.passes(row) and len(terms) > 1:
+            terms.remove(row['loan_term'])
+            row['loan_term'] = rng.choice(terms)
+        if not rules.passes(row):
+            row['loan_term'] = LOAN_TERMS[0]
+        return row
+
+    @staticmethod
+    def _proof_file_path(upload_folder: str, created_at: datetime, file_id: str) -> str:
+        """与上传文件相同的目录结构：files/YYYY/MM/DD/<ID末两位>/<ID>_proof.pdf"""
+        return os.path.join(
+            upload_folder,
+            FILES_DIR,
+            created_at.strftime('%Y'),
+            created_at.strftime('%m'),
+            created_at.strftime('%d'),
+            file_id[-2:].lower(),
+            f'{file_id}_proof.pdf'
+        )
+
+    @staticmethod
+    def write_sparse_file(path: str, size: int):
+        """创建稀疏文件：写入PDF文件头后扩展到指定大小，扩展部分不占用磁盘空间"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(PROOF_FILE_HEAD)
+            f.truncate(max(size, len(PROOF_FILE_HEAD)))
+
+    @staticmethod
+    def seed(count: int, users: int = 10, seed: int = 0, days: int = 365, end: datetime = None,
+             batch_size: int = None, file_size: int = None, progress=None) -> dict:
+        """
+        生成并批量写入贷款申请
+
+        提交时间均匀分布在结束时间之前的 days 天内，每条申请属于随机的一个生成用户。
+        随机数的使用与批次大小和是否创建文件无关，相同参数总是生成相同的数据。
+
+        Args:
+            count: 申请数
+            users: 用户数
+            seed: 随机种子
+            days: 提交时间分布的天数
+            end: 提交时间的结束时间（不包含），默认当天零点
+            batch_size: 每批插入的行数，默认读取 LOAN_IMPORT_BATCH_SIZE
+            file_size: 为每条申请创建的稀疏财产证明文件大小（字节），None 表示不创建文件
+            progress: 每批插入后的回调 progress(已插入行数)
+
+        Returns:
+            dict: 生成报告（用户数、申请数、文件数、耗时、每秒行数）
+        """
+        batch_size = batch_size or current_app.config.get('LOAN_IMPORT_BATCH_SIZE', 500)
+        if end is None:
+            end = datetime.combine(datetime.now().date(), datetime.min.time())
+        start = end - timedelta(days=days)
+        span_seconds = int((end - start).total_seconds())
+
+        started = time.perf_counter()
+        user_ids = SeedService.ensure_users(users)
+        rules = get_loan_rules()
+        upload_folder = StorageService.get_upload_folder() if file_size is not None else None
+        rng = random.Random(seed)
+
+        report = {'users': len(user_ids), 'applications': 0, 'files': 0}
+        batch = []
+        for _ in range(count):
+            created_at = start + timedelta(seconds=rng.randrange(span_seconds))
+            row = SeedService.generate_application(rng, rules, created_at)
+            row['user_id'] = rng.choice(user_ids)
+
+            # 无论是否创建文件都抽取文件ID，保证生成的申请数据相同
+            file_id = generate_ulid(created_at.timestamp(), rng.getrandbits(80))
+            if upload_folder is not None:
+                path = SeedService._proof_file_path(upload_folder, created_at, file_id)
+                SeedService.write_sparse_file(path, file_size)
+                row['prop_proof_docs'] = path.replace('\\', '/')
+                row['prop_proof_docs_name'] = 'proof.pdf'
+                report['files'] += 1
+            batch.append(row)
+
+            if len(batch) >= batch_size:
+                report['applications'] += bulk_insert_loan_applications(batch)
+                batch = []
+                if progress is not None:
+                    progress(report['applications'])
+
+        if batch:
+            report['applications'] += bulk_insert_loan_applications(batch)
+            if progress is not None:
+                progress(report['applications'])
+
+        elapsed = time.perf_counter() - started
+        report['elapsed_ms'] = round(elapsed * 1000, 1)
+        report['rows_per_second'] = round(report['applications'] / elapsed) if elapsed > 0 else None
+        logger.info(
+            f"生成测试数据完成: 用户{report['users']}个，申请{report['applications']}条，"
+            f"文件{report['files']}个，耗时{report['elapsed_ms']}ms"
+        )
+        return report
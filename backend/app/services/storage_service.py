@@ -0,0 +1,416 @@
+"""
+上传文件存储服务
+
+目录结构（位于 UPLOAD_FOLDER 下）:
+    blobs/ab/cd/<sha256>                       文件内容，按SHA-256去重保存
+    files/YYYY/MM/DD/<xx>/<ulid>_<文件名>       每次上传的逻辑文件，硬链接指向blob
+
+相同内容重复上传只增加一个目录项，不占用额外磁盘空间；
+逻辑文件以按时间排序的唯一ID命名，按日期和ID末两位分片，单个目录的条目数保持有限。
+"""
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from werkzeug.datastructures import FileStorage
+
+from app.crud.upload_crud import (
+    record_pending_upload,
+    get_expired_pending_uploads,
+    get_referenced_paths,
+    claim_uploads,
+    delete_upload_records,
+    is_uploaded_by
+)
+from app.utils.upload_utils import (
+    write_temp_file,
+    commit_temp_file,
+    discard_temp_file,
+    generate_ulid,
+    hash_file,
+    safe_filename
+)
+from app.utils.upload_validation import get_upload_validator
+
+logger = logging.getLogger(__name__)
+
+# blob 存储子目录
+BLOB_DIR = 'blobs'
+
+# 逻辑文件子目录
+FILES_DIR = 'files'
+
+# 分块上传会话子目录
+SESSION_DIR = '.sessions'
+
+
+class StorageService:
+    """上传文件存储服务类"""
+
+    @staticmethod
+    def get_upload_folder() -> str:
+        """
+        获取上传文件夹路径，支持绝对路径和相对路径
+
+        Returns:
+            str: 上传文件夹的绝对路径
+        """
+        upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads/loan_docs')
+
+        # 判断是否为绝对路径
+        if os.path.isabs(upload_folder):
+            # 绝对路径，直接使用
+            return upload_folder
+        else:
+            # 相对路径，相对于项目根目录
+            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            return os.path.join(project_root, upload_folder)
+
+    @staticmethod
+    def get_blob_path(sha256: str, upload_folder: str = None) -> str:
+        """
+        获取blob路径，按哈希前两级分片：blobs/ab/cd/<sha256>
+
+        Args:
+            sha256: 文件内容的SHA-256
+            upload_folder: 上传根目录，默认读取配置
+        """
+        upload_folder = upload_folder or StorageService.get_upload_folder()
+        return os.path.join(upload_folder, BLOB_DIR, sha256[:2], sha256[2:4], sha256)
+
+    @staticmethod
+    def _store_blob(written: dict, upload_folder: str) -> tuple:
+        """
+        将临时文件保存为blob，内容已存在时直接丢弃临时文件
+
+        Returns:
+            tuple: (blob路径, 是否重复内容)
+        """
+        blob_path = StorageService.get_blob_path(written['sha256'], upload_folder)
+        if os.path.exists(blob_path):
+            # 重复内容：临时文件未 fsync 即删除，不产生持久写入
+            discard_temp_file(written['temp_path'])
+            return blob_path, True
+
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        commit_temp_file(written['temp_path'], blob_path)
+        return blob_path, False
+
+    @staticmethod
+    def _link_logical(blob_path: str, logical_path: str) -> str:
+        """
+        创建指向blob的逻辑文件（硬链接）
+
+        文件系统不支持硬链接时，直接以blob路径作为文件引用。
+
+        Returns:
+            str: 文件引用路径
+        """
+        temp_link = f"{logical_path}.{os.getpid()}.link"
+        try:
+            os.link(blob_path, temp_link)
+            os.replace(temp_link, logical_path)
+        except FileNotFoundError:
+            # blob 恰好被孤儿文件清理删除，本次上传失败，由客户端重新上传
+            raise
+        except OSError as e:
+            logger.warning(f"无法创建硬链接，直接引用blob: {blob_path}, {str(e)}")
+            try:
+                os.unlink(temp_link)
+            except OSError:
+                pass
+            return blob_path
+        return logical_path
+
+    @staticmethod
+    def _logical_path(file_name: str, upload_folder: str, created_at: datetime = None) -> tuple:
+        """
+        生成逻辑文件路径：files/YYYY/MM/DD/<ID末两位>/<ulid>_<文件名>
+
+        Args:
+            file_name: 原始文件名
+            upload_folder: 上传根目录
+            created_at: 上传时间，默认当前时间
+
+        Returns:
+            tuple: (文件ID, 逻辑文件路径)
+        """
+        created_at = created_at or datetime.now()
+        file_id = generate_ulid(created_at.timestamp())
+        directory = os.path.join(
+            upload_folder,
+            FILES_DIR,
+            created_at.strftime('%Y'),
+            created_at.strftime('%m'),
+            created_at.strftime('%d'),
+            file_id[-2:].lower()
+        )
+        os.makedirs(directory, exist_ok=True)
+        return file_id, os.path.join(directory, f"{file_id}_{safe_filename(file_name)}")
+
+    @staticmethod
+    def ingest_written_file(written: dict, file_name: str, upload_folder: str = None) -> dict:
+        """
+        将已写好并计算过哈希的临时文件存入blob存储，并创建逻辑文件
+
+        - 内容已存在：丢弃临时文件，逻辑文件直接链接到已有blob
+        - 内容不存在：临时文件 fsync 后原子重命名为blob
+
+        Args:
+            written: write_temp_file 的返回值（temp_path、sha256、size、detected_type）
+            file_name: 原始文件名
+            upload_folder: 上传根目录，默认读取配置
+
+        Returns:
+            dict: 文件信息（路径、文件名、大小、SHA-256、检测出的文件类型、是否重复内容）
+        """
+        upload_folder = upload_folder or StorageService.get_upload_folder()
+        blob_path, deduplicated = StorageService._store_blob(written, upload_folder)
+        file_id, logical_path = StorageService._logical_path(file_name, upload_folder)
+        file_path = StorageService._link_logical(blob_path, logical_path)
+
+        return {
+            'file_id': file_id,
+            # 统一使用正斜线，避免Windows系统的反斜线问题
+            'file_path': file_path.replace('\\', '/'),
+            'file_name': file_name,
+            'file_size': written['size'],
+            'file_hash': written['sha256'],
+            'file_type': written['detected_type'],
+            'deduplicated': deduplicated
+        }
+
+    @staticmethod
+    def store_file(file: FileStorage) -> dict:
+        """
+        保存上传文件
+
+        文件按固定大小分块写入临时文件并计算SHA-256，再存入blob存储（见 ingest_written_file）。
+        写入前校验扩展名和声明类型，写入过程中校验文件头和大小，不合规时中止并删除临时文件。
+
+        Args:
+            file: 上传的文件
+
+        Returns:
+            dict: 文件信息（路径、文件名、大小、SHA-256、检测出的文件类型、是否重复内容）
+        """
+        check = get_upload_validator().start(file.filename, file.content_type)
+        upload_folder = StorageService.get_upload_folder()
+        os.makedirs(upload_folder, exist_ok=True)
+
+        written = write_temp_file(
+            file.stream,
+            upload_folder,
+            chunk_size=current_app.config.get('UPLOAD_CHUNK_SIZE', 64 * 1024),
+            check=check
+        )
+        return StorageService.ingest_written_file(written, file.filename, upload_folder)
+
+    @staticmethod
+    def adopt_existing_file(source_path: str, file_name: str, created_at: datetime,
+                            upload_folder: str = None) -> dict:
+        """
+        将已有文件纳入blob存储并按新目录结构创建逻辑文件（用于迁移旧的平铺文件）
+
+        源文件保持不变（blob通过硬链接引用同一份数据，不复制），
+        由调用方在数据库路径更新提交后再删除源文件。
+
+        Args:
+            source_path: 已有文件路径
+            file_name: 原始文件名
+            created_at: 上传时间（决定日期目录）
+            upload_folder: 上传根目录，默认读取配置
+
+        Returns:
+            dict: 文件信息
+        """
+        upload_folder = upload_folder or StorageService.get_upload_folder()
+        written = hash_file(source_path)
+        blob_path = StorageService.get_blob_path(written['sha256'], upload_folder)
+        deduplicated = os.path.exists(blob_path)
+
+        if not deduplicated:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            try:
+                os.link(source_path, blob_path)
+            except OSError:
+                shutil.copy2(source_path, blob_path)
+
+        file_id, logical_path = StorageService._logical_path(file_name, upload_folder, created_at)
+        file_path = StorageService._link_logical(blob_path, logical_path)
+
+        return {
+            'file_id': file_id,
+            'file_path': file_path.replace('\\', '/'),
+            'file_name': file_name,
+            'file_size': written['size'],
+            'file_hash': written['sha256'],
+            'file_type': written['detected_type'],
+            'deduplicated': deduplicated
+        }
+
+    @staticmethod
+    def record_pending_upload(file_info: dict, user_id=None):
+        """
+        记录待确认的上传文件，/confirm 引用后标记为已引用，超期未引用的由清理命令删除
+
+        Args:
+            file_info: 上传文件信息
+            user_id: 上传用户ID
+        """
+        if file_info and file_info.get('file_path'):
+            record_pending_upload(file_info, user_id)
+
+    @staticmethod
+    def is_user_upload(file_path: str, user_id) -> bool:
+        """
+        文件是否由该用户上传
+
+        /confirm 未携带有效回执时，客户端提交的文件路径必须是该用户上传过的文件，
+        不能引用其他用户的文件或服务器上的任意路径。
+        """
+        return is_uploaded_by(file_path, user_id)
+
+    @staticmethod
+    def _remove_upload(record, upload_folder: str, stats: dict):
+        """
+        删除未被引用的逻辑文件，blob不再被任何逻辑文件链接时一并删除
+
+        硬链接不可用时逻辑文件即blob本身，可能被其他上传共用，只删除记录不删除文件。
+        """
+        file_path = record.file_path
+        blob_root = os.path.join(upload_folder, BLOB_DIR).replace('\\', '/')
+        if file_path.startswith(blob_root + '/'):
+            return
+
+        try:
+            os.unlink(file_path)
+        except FileNotFoundError:
+            return
+        stats['deleted_files'] += 1
+
+        if not record.file_hash:
+            return
+        blob_path = StorageService.get_blob_path(record.file_hash, upload_folder)
+        try:
+            blob_stat = os.stat(blob_path)
+        except FileNotFoundError:
+            return
+        # 链接数为1说明只剩blob自身，内容已无人引用
+        if blob_stat.st_nlink == 1:
+            os.unlink(blob_path)
+            stats['deleted_blobs'] += 1
+            stats['freed_bytes'] += blob_stat.st_size
+
+    @staticmethod
+    def _sweep_stale_files(upload_folder: str, before: float, dry_run: bool, stats: dict):
+        """清理过期的分块上传会话文件和中断上传遗留的临时文件"""
+        session_root = os.path.join(upload_folder, SESSION_DIR)
+        folders = [upload_folder, session_root]
+        try:
+            # 会话文件按用户分子目录保存；会话目录顶层可能还有旧版本遗留的会话文件
+            folders.extend(
+                entry.path for entry in os.scandir(session_root)
+                if entry.is_dir(follow_symlinks=False)
+            )
+        except FileNotFoundError:
+            pass
+        for folder in folders:
+            try:
+                entries = list(os.scandir(folder))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                is_temp = entry.name.startswith('.upload-') and entry.name.endswith('.tmp')
+                if folder == upload_folder and not is_temp:
+                    continue
+                try:
+                    file_stat = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                if file_stat.st_mtime >= before:
+                    continue
+                stats['stale_files'] += 1
+                if dry_run:
+                    continue
+                try:
+                    os.unlink(entry.path)
+                    stats['freed_bytes'] += file_stat.st_size
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    stats['errors'] += 1
+                    logger.warning(f"删除过期临时文件失败: {entry.path}, {str(e)}")
+
+    @staticmethod
+    def collect_orphaned_uploads(ttl_seconds: int = None, batch_size: int = 500,
+                                 max_batches: int = None, dry_run: bool = False) -> dict:
+        """
+        清理超过保留期仍未被贷款申请引用的上传文件
+
+        按上传时间分批处理，每批删除前再次确认文件未被 prop_proof_docs 引用
+        （兼容记录上传之前已保存的申请），被引用的记录改为已引用。
+
+        Args:
+            ttl_seconds: 保留期（秒），默认读取 UPLOAD_ORPHAN_TTL
+            batch_size: 每批处理的记录数
+            max_batches: 最多处理的批数，None表示处理完为止
+            dry_run: 只统计不删除
+
+        Returns:
+            dict: 清理统计（扫描数、删除的逻辑文件数、blob数、释放字节数、错误数、批数、耗时）
+        """
+        if ttl_seconds is None:
+            ttl_seconds = current_app.config.get('UPLOAD_ORPHAN_TTL', 24 * 3600)
+        upload_folder = StorageService.get_upload_folder()
+        before = datetime.now() - timedelta(seconds=ttl_seconds)
+        started = time.monotonic()
+
+        stats = {
+            'scanned': 0,
+            'claimed': 0,
+            'deleted_files': 0,
+            'deleted_blobs': 0,
+            'stale_files': 0,
+            'freed_bytes': 0,
+            'errors': 0,
+            'batches': 0
+        }
+        last_seen = None
+
+        while max_batches is None or stats['batches'] < max_batches:
+            records = get_expired_pending_uploads(before, batch_size, after=last_seen)
+            if not records:
+                break
+            stats['batches'] += 1
+            stats['scanned'] += len(records)
+            last_seen = (records[-1].created_at, records[-1].id)
+
+            referenced = get_referenced_paths([record.file_path for record in records])
+            orphans = [record for record in records if record.file_path not in referenced]
+            stats['claimed'] += len(records) - len(orphans)
+            if dry_run:
+                continue
+
+            claim_uploads(list(referenced))
+            deleted_ids = []
+            for record in orphans:
+                try:
+                    StorageService._remove_upload(record, upload_folder, stats)
+                    deleted_ids.append(record.id)
+                except OSError as e:
+                    stats['errors'] += 1
+                    logger.warning(f"删除未引用的上传文件失败: {record.file_path}, {str(e)}")
+            delete_upload_records(deleted_ids)
+
+        stale_before = time.time() - current_app.config.get('UPLOAD_SESSION_TTL', 24 * 3600)
+        StorageService._sweep_stale_files(upload_folder, stale_before, dry_run, stats)
+
+        stats['elapsed_ms'] = round((time.monotonic() - started) * 1000, 1)
+        logger.info(f"孤儿上传文件清理完成: {stats}")
+        return stats
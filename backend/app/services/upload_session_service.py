@@ -0,0 +1,314 @@
+"""
+可续传的分块上传服务
+
+协议：
+1. 创建会话：声明文件名和总大小，服务端预分配同样大小的临时文件
+2. 按偏移量依次上传分块：分块直接写入临时文件的对应位置
+3. 查询偏移量：网络中断后从已确认的偏移量继续，只重传缺失部分
+4. 完成上传：校验大小、计算SHA-256并存入blob存储，返回与普通上传相同的文件信息
+
+会话元数据以JSON文件保存在上传目录下按用户划分的子目录中，不依赖进程内状态，多进程部署时任一worker都能继续同一会话。
+同一会话的写入和完成上传通过数据文件上的文件锁（fcntl.flock）串行执行。
+"""
+import json
+import os
+import re
+import secrets
+import time
+from contextlib import contextmanager
+
+from flask import current_app
+
+from app.services.storage_service import SESSION_DIR, StorageService
+from app.utils.exceptions import (
+    BadRequestException,
+    ConflictException,
+    NotFoundException,
+    TooManyRequestsException
+)
+from app.utils.upload_utils import CHUNK_SIZE, file_extension, hash_file
+from app.utils.upload_validation import UploadCheck, get_upload_validator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows 没有 fcntl，不加锁
+    fcntl = None
+
+# 会话ID格式（32位十六进制），防止路径穿越
+UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+# 用户子目录名中不允许出现的字符
+USER_DIR_UNSAFE = re.compile(r'[^0-9A-Za-z_-]')
+
+
+@contextmanager
+def _locked_part_file(part_path: str):
+    """
+    以读写方式打开会话数据文件并加排他锁
+
+    元数据文件每次保存都会被原子替换（inode 改变），所以锁加在数据文件上。
+    完成上传后数据文件已移入blob存储，此时返回None。
+    """
+    try:
+        f = open(part_path, 'r+b')
+    except FileNotFoundError:
+        yield None
+        return
+    with f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        yield f
+
+
+class UploadSessionService:
+    """分块上传会话服务类"""
+
+    @staticmethod
+    def get_session_folder(user_id) -> str:
+        """
+        获取用户的会话目录
+
+        位于上传目录下，保证完成上传时可原子重命名为blob；按用户划分子目录，
+        统计某个用户的会话时只需扫描该用户自己的会话。
+        """
+        user_dir = USER_DIR_UNSAFE.sub('_', str(user_id))
+        return os.path.join(StorageService.get_upload_folder(), SESSION_DIR, user_dir)
+
+    @staticmethod
+    def _paths(upload_id: str, user_id) -> tuple:
+        """获取会话元数据文件和数据文件路径"""
+        if not upload_id or not UPLOAD_ID_PATTERN.match(upload_id):
+            raise NotFoundException('上传会话不存在')
+        folder = UploadSessionService.get_session_folder(user_id)
+        return (
+            os.path.join(folder, f'{upload_id}.json'),
+            os.path.join(folder, f'{upload_id}.part')
+        )
+
+    @staticmethod
+    def _save_meta(meta_path: str, meta: dict):
+        """原子写入会话元数据"""
+        temp_path = f'{meta_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(temp_path, meta_path)
+
+    @staticmethod
+    def _extension(meta: dict) -> str:
+        """会话文件的扩展名"""
+        return meta.get('extension') or file_extension(meta['file_name'])
+
+    @staticmethod
+    def get_session(upload_id: str, user_id) -> dict:
+        """
+        获取上传会话
+
+        Args:
+            upload_id: 会话ID
+            user_id: 当前用户ID，只能访问自己创建的会话
+
+        Raises:
+            NotFoundException: 会话不存在、已过期或不属于当前用户
+        """
+        meta_path, _ = UploadSessionService._paths(upload_id, user_id)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            raise NotFoundException('上传会话不存在')
+
+        if meta.get('user_id') != user_id:
+            raise NotFoundException('上传会话不存在')
+
+        ttl = current_app.config.get('UPLOAD_SESSION_TTL', 24 * 3600)
+        if time.time() - meta['created_at'] > ttl:
+            raise NotFoundException('上传会话已过期，请重新上传')
+
+        return meta
+
+    @staticmethod
+    def count_active_sessions(user_id) -> int:
+        """统计用户未完成且未过期的上传会话数（只扫描该用户的会话目录）"""
+        folder = UploadSessionService.get_session_folder(user_id)
+        try:
+            entries = list(os.scandir(folder))
+        except FileNotFoundError:
+            return 0
+
+        ttl = current_app.config.get('UPLOAD_SESSION_TTL', 24 * 3600)
+        now = time.time()
+        active = 0
+        for entry in entries:
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                with open(entry.path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (FileNotFoundError, ValueError):
+                continue
+            if meta.get('user_id') == user_id and meta.get('file_info') is None \
+                    and now - meta.get('created_at', 0) <= ttl:
+                active += 1
+        return active
+
+    @staticmethod
+    def create_session(user_id, file_name: str, file_size: int, content_type: str = None) -> dict:
+        """
+        创建上传会话，并预分配临时文件
+
+        扩展名、声明类型和该类型的大小限制在创建会话时校验，不合规的文件不会开始上传。
+        每个用户同时未完成的会话数不超过 UPLOAD_SESSION_MAX_ACTIVE_PER_USER，限制预分配占用的磁盘空间。
+
+        Args:
+            user_id: 当前用户ID
+            file_name: 文件名
+            file_size: 文件总大小（字节）
+            content_type: 客户端声明的文件类型
+
+        Returns:
+            dict: 会话信息
+
+        Raises:
+            TooManyRequestsException: 用户未完成的会话过多
+        """
+        if not file_name or not file_name.strip():
+            raise BadRequestException('文件名不能为空')
+        if not isinstance(file_size, int) or file_size <= 0:
+            raise BadRequestException('文件大小必须为正整数')
+
+        validator = get_upload_validator()
+        extension = validator.check_name(file_name, content_type)
+        validator.check_size(extension, file_size)
+
+        max_active = current_app.config.get('UPLOAD_SESSION_MAX_ACTIVE_PER_USER', 5)
+        if max_active and UploadSessionService.count_active_sessions(user_id) >= max_active:
+            raise TooManyRequestsException(f'未完成的上传过多（最多{max_active}个），请先完成或等待已有上传过期')
+
+        folder = UploadSessionService.get_session_folder(user_id)
+        os.makedirs(folder, exist_ok=True)
+
+        upload_id = secrets.token_hex(16)
+        meta_path, part_path = UploadSessionService._paths(upload_id, user_id)
+
+        # 预分配磁盘空间，分块按偏移量直接写入
+        with open(part_path, 'wb') as f:
+            if hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(f.fileno(), 0, file_size)
+            else:
+                f.truncate(file_size)
+
+        meta = {
+            'upload_id': upload_id,
+            'user_id': user_id,
+            'file_name': file_name.strip(),
+            'file_size': file_size,
+            'extension': extension,
+            'offset': 0,
+            'created_at': time.time(),
+            'file_info': None
+        }
+        UploadSessionService._save_meta(meta_path, meta)
+        return meta
+
+    @staticmethod
+    def write_chunk(upload_id: str, user_id, offset: int, stream, length: int) -> dict:
+        """
+        在指定偏移量写入一个分块
+
+        分块必须从当前已确认的偏移量开始（顺序续传），重复发送已确认的分块会返回冲突及当前偏移量。
+        第一个分块在写入前校验文件头，内容与扩展名不符时拒绝，不写入任何数据。
+
+        Args:
+            upload_id: 会话ID
+            user_id: 当前用户ID
+            offset: 分块起始偏移量
+            stream: 请求体流
+            length: 分块长度（Content-Length）
+
+        Returns:
+            dict: 更新后的会话信息
+
+        Raises:
+            ConflictException: 偏移量与服务端记录不一致
+        """
+        meta_path, part_path = UploadSessionService._paths(upload_id, user_id)
+
+        # 偏移量检查、写入和保存元数据在锁内完成，同一分块并发重试时只有一个请求写入
+        with _locked_part_file(part_path) as f:
+            meta = UploadSessionService.get_session(upload_id, user_id)
+            if meta['file_info'] is not None or f is None:
+                raise ConflictException('上传已完成')
+            if offset != meta['offset']:
+                raise ConflictException(f"偏移量不一致，当前偏移量为{meta['offset']}")
+            if not length or length <= 0:
+                raise BadRequestException('分块不能为空')
+            if offset + length > meta['file_size']:
+                raise BadRequestException('分块超出文件大小')
+
+            # 第一个分块校验文件头（大小已在创建会话时按声明的总大小校验）
+            check = None
+            if offset == 0:
+                check = UploadCheck(get_upload_validator(), UploadSessionService._extension(meta))
+
+            written = 0
+            f.seek(offset)
+            while written < length:
+                chunk = stream.read(min(CHUNK_SIZE, length - written))
+                if not chunk:
+                    break
+                if check is not None:
+                    check.feed(chunk)
+                f.write(chunk)
+                written += len(chunk)
+            f.flush()
+
+            # 只确认实际收到的字节，连接中断时客户端从这里继续
+            meta['offset'] = offset + written
+            UploadSessionService._save_meta(meta_path, meta)
+
+        if written < length:
+            raise BadRequestException(f"分块数据不完整，已接收到偏移量{meta['offset']}")
+        return meta
+
+    @staticmethod
+    def finalize(upload_id: str, user_id) -> dict:
+        """
+        完成上传：计算SHA-256并存入blob存储
+
+        重复调用返回同一份文件信息。
+
+        Returns:
+            dict: 文件信息（与普通上传相同）
+        """
+        meta_path, part_path = UploadSessionService._paths(upload_id, user_id)
+
+        with _locked_part_file(part_path):
+            meta = UploadSessionService.get_session(upload_id, user_id)
+            if meta['file_info'] is not None:
+                return meta['file_info']
+            if meta['offset'] != meta['file_size']:
+                raise ConflictException(f"文件尚未上传完成，当前偏移量为{meta['offset']}")
+
+            written = hash_file(part_path)
+            get_upload_validator().check_detected_type(
+                UploadSessionService._extension(meta), written['detected_type']
+            )
+            file_info = StorageService.ingest_written_file(written, meta['file_name'])
+            file_info['upload_id'] = upload_id
+            StorageService.record_pending_upload(file_info, user_id)
+
+            meta['file_info'] = file_info
+            UploadSessionService._save_meta(meta_path, meta)
+        return file_info
+
+    @staticmethod
+    def get_file_info(upload_id: str, user_id) -> dict:
+        """
+        获取已完成上传的文件信息，供 /apply 和 /confirm 代替表单文件使用
+
+        Raises:
+            BadRequestException: 上传尚未完成
+        """
+        meta = UploadSessionService.get_session(upload_id, user_id)
+        if meta['file_info'] is None:
+            raise BadRequestException('文件尚未完成上传')
+        return meta['file_info']
@@ -0,0 +1,281 @@
+"""
+贷款申请数据校验（Pydantic验证 + 业务规则验证）
+
+单条申请（/apply、/confirm）与批量导入共用同一套校验。
+"""
+import hashlib
+import os
+
+from flask import current_app
+from pydantic import ValidationError
+
+from app.schemas.loan_schema import LoanApplicationCreate
+from app.utils.file_cache import JsonFileCache, load_json_file
+from app.utils.receipt_utils import sign_receipt, verify_receipt
+from app.utils.rule_engine import compile_rules
+
+# 校验表单数据时使用的文件占位符（文件单独上传或导入时不含文件）
+FILE_PLACEHOLDERS = {
+    'prop_proof_docs': 'temp_file_path',
+    'prop_proof_docs_name': 'temp_filename'
+}
+
+# 校验回执的用途标识
+RECEIPT_PURPOSE = 'loan-validation'
+
+# 业务规则文件（可通过 LOAN_RULES_FILE 配置）
+LOAN_RULES_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'loan-rules.json'
+)
+
+# 规则文件不存在且未配置 LOAN_RULES 时使用的默认规则
+DEFAULT_LOAN_RULES = {
+    'rules': [
+        {
+            'id': 'credit-max-term',
+            'loan_purpose': 'credit',
+            'field': 'loan_term',
+            'require': {'max': 5},
+            'msg': '信用贷款期限不能超过5年'
+        },
+        {
+            'id': 'tax-max-term',
+            'loan_purpose': 'tax',
+            'field': 'loan_term',
+            'require': {'max': 2},
+            'msg': '税贷期限不能超过2年'
+        }
+    ]
+}
+
+
+def format_validation_errors(validation_errors):
+    """
+    格式化Pydantic验证错误列表
+    
+    :param validation_errors: Pydantic ValidationError的errors()列表
+    :return: 格式化后的错误列表
+    """
+    formatted_errors = []
+    
+    for error in validation_errors:
+        field = error['loc'][-1] if error['loc'] else 'unknown'
+        error_type = error['type']
+        
+        # 自定义中文错误消息
+        if 'missing' in error_type:
+            msg = f'{field} 字段不能为空'
+        elif 'string_type' in error_type:
+            msg = f'{field} 必须是文本类型'
+        elif 'float_type' in error_type or 'int_type' in error_type:
+            msg = f'{field} 必须是数字'
+        elif 'greater_than' in error_type or 'greater_than_equal' in error_type:
+            msg = f'{field} 不能为负数'
+        elif 'string_too_short' in error_type or 'string_too_long' in error_type:
+            msg = f'{field} 长度不符合要求'
+        else:
+            msg = error['msg']
+        
+        formatted_errors.append({
+            'field': field,
+            'msg': msg,
+            'type': error_type
+        })
+    
+    return formatted_errors
+
+
+def init_loan_rules(app):
+    """
+    创建并编译业务规则缓存（应用启动时调用）
+    
+    规则从 LOAN_RULES_FILE 加载，文件变化时自动重新编译；
+    文件不存在时使用 LOAN_RULES 配置或内置的默认规则。
+    新文件格式错误时继续使用上一版本规则。
+    """
+    default_rules = compile_rules(app.config.get('LOAN_RULES') or DEFAULT_LOAN_RULES)
+    cache = JsonFileCache(
+        app.config.get('LOAN_RULES_FILE') or LOAN_RULES_FILE,
+        loader=lambda file_path: compile_rules(load_json_file(file_path)),
+        default=default_rules
+    )
+    # 启动时即完成编译，规则文件错误尽早暴露在日志中
+    cache.get()
+    app.extensions['loan_rules'] = cache
+    return cache
+
+
+def get_loan_rules():
+    """
+    获取当前应用编译后的业务规则（文件变化时自动重新编译）
+    
+    :return: CompiledRuleSet
+    """
+    cache = current_app.extensions.get('loan_rules')
+    if cache is None:
+        cache = init_loan_rules(current_app)
+    return cache.get()
+
+
+def validate_business_rules(loan_data):
+    """
+    验证业务逻辑规则（贷款目的、行业、金额区间与期限等的相关性检查）
+    
+    规则为声明式配置（见 data/loan-rules.json），按贷款目的编译为查找表，一次遍历完成检查。
+    
+    :param loan_data: LoanApplicationCreate对象
+    :return: 错误列表，如果没有错误则返回空列表
+    """
+    return get_loan_rules().evaluate(vars(loan_data))
+
+
+def validate_loan_data(data):
+    """
+    统一的数据校验方法（Pydantic验证 + 业务规则验证）
+    
+    :param data: 表单数据字典
+    :return: (loan_data, errors) - 如果验证成功返回(loan_data对象, None)，否则返回(None, 错误列表)
+    """
+    # 1. Pydantic基础验证
+    try:
+        loan_data = LoanApplicationCreate(**data)
+    except ValidationError as e:
+        # 格式化Pydantic验证错误
+        formatted_errors = format_validation_errors(e.errors())
+        return None, formatted_errors
+    
+    # 2. 业务规则验证
+    business_errors = validate_business_rules(loan_data)
+    if business_errors:
+        return None, business_errors
+    
+    # 验证通过
+    return loan_data, None
+
+
+def with_file_placeholders(data):
+    """
+    为表单数据添加文件占位符，使其在上传文件之前即可通过Pydantic验证
+    
+    :param data: 表单数据字典
+    :return: 添加占位符后的新字典
+    """
+    return {**data, **FILE_PLACEHOLDERS}
+
+
+def validate_loan_batch(items):
+    """
+    批量校验贷款申请数据（只校验，不保存、不上传文件）
+    
+    每条数据与 /apply 相同：添加文件占位符后进行Pydantic验证和业务规则验证。
+    
+    :param items: 贷款申请数据字典列表
+    :return: 校验结果，包含总数、通过数和按下标列出的错误
+    """
+    results = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results.append({
+                'index': index,
+                'errors': [{'field': None, 'msg': '每条数据必须是JSON对象', 'type': 'invalid_item'}]
+            })
+            continue
+        
+        _, errors = validate_loan_data(with_file_placeholders(item))
+        if errors:
+            results.append({'index': index, 'errors': errors})
+    
+    return {
+        'total': len(items),
+        'valid': len(items) - len(results),
+        'invalid': len(results),
+        'errors': results
+    }
+
+
+# 回执覆盖的字段：(字段名, 是否为数值字段)，按 Schema 定义顺序
+RECEIPT_FIELDS = tuple(
+    (name, field.annotation is float) for name, field in LoanApplicationCreate.model_fields.items()
+)
+
+
+def _receipt_fields(values):
+    """
+    取出回执覆盖的Schema字段（只做类型转换，不做任何校验）
+    
+    /apply 传入校验后模型的 model_dump(mode='json')，/confirm 传入表单数据：
+    表单值与校验后的值完全相同时两者结果一致。客户端附带的其他字段（如 fileName）不参与摘要。
+    
+    :return: 字段字典，数值字段无法转换时返回None
+    """
+    fields = {}
+    for name, is_float in RECEIPT_FIELDS:
+        value = values.get(name)
+        if value is not None:
+            if is_float:
+                try:
+                    value = float(value)
+                except ValueError:
+                    return None
+            elif not isinstance(value, str):
+                value = str(value)
+        fields[name] = value
+    return fields
+
+
+def receipt_digest(fields):
+    """
+    计算回执字段的摘要（按 Schema 定义顺序排列的字段值元组的 repr 的 SHA-256）
+    
+    字段值只有 str、float 和 None，repr 对字符串加引号并转义，编码无歧义。
+    
+    :param fields: _receipt_fields 的返回值
+    :return: 十六进制摘要
+    """
+    return hashlib.sha256(repr(tuple(fields.values())).encode('utf-8')).hexdigest()
+
+
+def sign_loan_receipt(loan_data, file_info, user_id):
+    """
+    为已通过校验的申请数据和本次上传的文件生成签名回执，/confirm 凭回执跳过重复校验
+    
+    摘要覆盖校验后的数据（而不是原始表单），/confirm 验证回执后可直接使用提交的数据构建模型。
+    
+    :param loan_data: 校验后的 LoanApplicationCreate 对象（文件字段可以是占位符）
+    :param file_info: 上传文件信息
+    :param user_id: 当前用户ID
+    :return: 回执字符串
+    """
+    fields = _receipt_fields({
+        **loan_data.model_dump(mode='json'),
+        'prop_proof_docs': file_info['file_path'],
+        'prop_proof_docs_name': file_info['file_name']
+    })
+    return sign_receipt(
+        RECEIPT_PURPOSE,
+        receipt_digest(fields),
+        user_id,
+        current_app.config.get('LOAN_RECEIPT_TTL', 3600)
+    )
+
+
+def load_receipted_loan_data(receipt, data, user_id):
+    """
+    回执与数据一致时直接构建申请数据（不重复Pydantic验证和业务规则验证）
+    
+    回执签名覆盖 /apply 校验后的数据，提交的数据与之完全相同时才能通过，
+    因此可以用 model_construct 构建模型，保存的数据与完整校验流程相同。
+    回执同时证明 prop_proof_docs 来自本系统的上传步骤。
+    
+    :param receipt: /apply 返回的回执
+    :param data: 表单数据字典（含 prop_proof_docs 和 prop_proof_docs_name）
+    :param user_id: 当前用户ID
+    :return: LoanApplicationCreate对象，回执无效、过期或数据与校验后的数据不同时返回None
+    """
+    if not receipt:
+        return None
+    
+    fields = _receipt_fields(data)
+    if fields is None or not verify_receipt(RECEIPT_PURPOSE, receipt, receipt_digest(fields), user_id):
+        return None
+    return LoanApplicationCreate.model_construct(**fields)
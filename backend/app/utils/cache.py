@@ -0,0 +1,118 @@
+"""
+进程内LRU缓存工具
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    线程安全的LRU缓存，支持条目过期
+
+    - 超过 max_size 时淘汰最久未使用的条目
+    - 每个条目可以指定过期时间（绝对时间）或存活时间（TTL），过期条目在读取时移除
+    - clock 决定过期时间的时间基准：默认单调时钟；需要与墙上时间比较时（如JWT的exp）传入 time.time
+    """
+
+    def __init__(self, max_size=1024, ttl=None, clock=time.monotonic):
+        """
+        :param max_size: 最大条目数
+        :param ttl: 默认存活时间（秒），None表示不过期
+        :param clock: 时钟函数
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """
+        获取缓存值，不存在或已过期时返回 default
+
+        :param key: 缓存键
+        :param default: 默认值
+        :return: 缓存值
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None, expires_at=None):
+        """
+        写入缓存
+
+        :param key: 缓存键
+        :param value: 缓存值
+        :param ttl: 存活时间（秒），未指定时使用默认TTL
+        :param expires_at: 过期时间（与clock同一时间基准），优先于ttl
+        """
+        if self.max_size <= 0:
+            return
+
+        if expires_at is None:
+            ttl = self.ttl if ttl is None else ttl
+            if ttl is not None:
+                expires_at = self._clock() + ttl
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """
+        删除缓存条目
+
+        :param key: 缓存键
+        :return: 条目存在时返回True
+        """
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """
+        获取缓存统计信息
+
+        :return: 条目数、命中、未命中、淘汰、过期次数及命中率
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
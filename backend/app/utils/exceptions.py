@@ -30,7 +30,18 @@ class BadRequestException(BaseException):
         super().__init__(message, 400)
 
 
+class FileValidationException(BadRequestException):
+    """上传文件校验失败异常（类型不允许、内容与类型不符或超过大小限制）"""
+    def __init__(self, message='File validation failed'):
+        super().__init__(message)
+
+
 class ConflictException(BaseException):
     """冲突异常"""
     def __init__(self, message='Conflict'):
-        super().__init__(message, 409)
\ No newline at end of file
+        super().__init__(message, 409)
+
+class TooManyRequestsException(BaseException):
+    """请求过多异常（限流或队列已满）"""
+    def __init__(self, message='Too many requests'):
+        super().__init__(message, 429)
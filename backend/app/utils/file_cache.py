@@ -0,0 +1,164 @@
+"""
+基于文件状态的进程内缓存工具
+"""
+import json
+import logging
+import os
+import threading
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# 一次成功加载的结果：文件状态键、解析后的数据、版本号（每次重新加载递增）
+_Snapshot = namedtuple('_Snapshot', ['key', 'data', 'version'])
+
+
+def load_json_file(file_path):
+    """读取并解析JSON文件"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class JsonFileCache:
+    """
+    JSON文件的进程内缓存
+
+    以文件的 (inode, mtime, size) 作为缓存键，每次读取只做一次 stat：
+    - 文件未变化时直接返回内存中的数据
+    - 文件变化时重新加载，并整体替换快照（读者不会看到半更新的数据）
+    - 新文件解析失败时保留上一次成功加载的数据，直到文件再次变化
+    - 文件不存在时返回 default
+
+    注意：返回的数据在多个请求之间共享，调用方不得修改。
+    """
+
+    def __init__(self, file_path, loader=None, default=None):
+        """
+        :param file_path: 文件路径
+        :param loader: 加载函数，接收文件路径返回数据，默认按JSON解析
+        :param default: 文件不存在或从未成功加载时的返回值
+        """
+        self.file_path = file_path
+        self._loader = loader or load_json_file
+        self._default = default
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._failed_key = None
+        self._derived = {}
+
+        # 统计计数（未加锁递增，为近似值）
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.errors = 0
+
+    def _stat_key(self):
+        """获取文件状态键，文件不存在时返回None"""
+        try:
+            st = os.stat(self.file_path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _last_good(self):
+        """返回上一次成功加载的数据及其版本号"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self._default, 0
+        return snapshot.data, snapshot.version
+
+    def _current(self):
+        """
+        获取当前数据及其版本号，文件变化时自动重新加载
+
+        :return: (data, version)，version 为0表示使用的是默认值
+        """
+        key = self._stat_key()
+        if key is None:
+            self.misses += 1
+            return self._default, 0
+
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.key == key:
+            self.hits += 1
+            return snapshot.data, snapshot.version
+
+        with self._lock:
+            # 双重检查：等待锁期间其他线程可能已完成加载
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.key == key:
+                self.hits += 1
+                return snapshot.data, snapshot.version
+
+            # 该版本已经解析失败过，不再重复解析
+            if key == self._failed_key:
+                self.hits += 1
+                return self._last_good()
+
+            self.misses += 1
+            try:
+                data = self._loader(self.file_path)
+            except (OSError, ValueError) as e:
+                self.errors += 1
+                self._failed_key = key
+                logger.warning(f"缓存文件加载失败，继续使用上一版本数据: {self.file_path}, {str(e)}")
+                return self._last_good()
+
+            version = 1
+            if snapshot is not None:
+                version = snapshot.version + 1
+                self.reloads += 1
+                logger.info(f"缓存文件已重新加载: {self.file_path}")
+
+            self._snapshot = _Snapshot(key, data, version)
+            self._failed_key = None
+            return data, version
+
+    def get(self):
+        """
+        获取缓存数据，文件变化时自动重新加载
+
+        :return: 解析后的数据
+        """
+        return self._current()[0]
+
+    def get_derived(self, name, builder):
+        """
+        获取由缓存数据派生的结果（如预序列化、预压缩的响应体）
+
+        派生结果按数据版本缓存，数据重新加载后第一次调用时重新构建。
+
+        :param name: 派生结果名称
+        :param builder: 构建函数，接收缓存数据返回派生结果
+        :return: 派生结果
+        """
+        data, version = self._current()
+        cached = self._derived.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        value = builder(data)
+        self._derived[name] = (version, value)
+        return value
+
+    def clear(self):
+        """清空缓存，下次读取时重新加载"""
+        with self._lock:
+            self._snapshot = None
+            self._failed_key = None
+            self._derived = {}
+
+    def stats(self):
+        """
+        获取缓存统计信息
+
+        :return: 命中、未命中、重新加载、加载失败次数及当前版本号
+        """
+        snapshot = self._snapshot
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads,
+            'errors': self.errors,
+            'version': snapshot.version if snapshot is not None else 0
+        }
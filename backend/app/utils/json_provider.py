@@ -0,0 +1,104 @@
+"""
+JSON序列化提供者
+
+安装了 orjson 时使用 orjson，否则使用标准库 json，两者输出一致：
+- datetime / date 输出 ISO 8601 字符串（与模型 to_dict 相同）
+- Decimal 输出数值
+- Pydantic 模型按 model_dump 输出
+- 异常对象（Pydantic 校验错误的 ctx）输出异常信息
+- 中文不转义，不排序键，紧凑格式
+
+通过配置 JSON_PROVIDER（auto / orjson / stdlib）选择，在 create_app 中安装为 app.json。
+"""
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 是可选依赖
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# 所有 JSON 响应的 Content-Type
+JSON_CONTENT_TYPE = 'application/json; charset=utf-8'
+
+
+def _default(value):
+    """标准库与 orjson 都不能直接序列化的类型"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Exception):
+        # Pydantic 校验错误的 ctx 中包含异常对象
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """标准库 json 实现（未安装 orjson 时使用）"""
+
+    ensure_ascii = False
+    sort_keys = False
+    mimetype = JSON_CONTENT_TYPE
+
+    def dumps(self, obj, **kwargs):
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def dumps_bytes(self, obj) -> bytes:
+        """序列化为 UTF-8 字节"""
+        return self.dumps(obj).encode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), content_type=JSON_CONTENT_TYPE)
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """orjson 实现：原生处理 datetime，直接输出字节"""
+
+    # 非字符串的字典键（如整数）与标准库一样转为字符串
+    OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+    def dumps(self, obj, **kwargs):
+        # 带参数（如 indent）调用时使用标准库，保证参数语义一致
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def dumps_bytes(self, obj) -> bytes:
+        return orjson.dumps(obj, default=_default, option=self.OPTIONS)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+def init_json_provider(app):
+    """
+    按 JSON_PROVIDER 配置安装 JSON 序列化提供者
+
+    :param app: Flask应用
+    """
+    name = (app.config.get('JSON_PROVIDER') or 'auto').lower()
+    if name not in ('auto', 'orjson', 'stdlib'):
+        raise ValueError(f'JSON_PROVIDER 必须是 auto、orjson 或 stdlib，当前为: {name}')
+    if name == 'orjson' and orjson is None:
+        raise RuntimeError('JSON_PROVIDER=orjson 但未安装 orjson')
+
+    use_orjson = orjson is not None and name != 'stdlib'
+    app.json = OrjsonProvider(app) if use_orjson else StdlibJSONProvider(app)
+    logger.info(f"JSON序列化: {'orjson' if use_orjson else '标准库 json'}")
@@ -1,8 +1,12 @@
 import jwt
+import hashlib
+import time
 from datetime import datetime, timezone
 from functools import wraps
 from flask import request, current_app
+from app.utils.cache import LRUCache
 from app.utils.exceptions import UnauthorizedException
+from app.utils.timing import phase
 
 
 def create_access_token(user_id, username, user_type):
@@ -54,6 +58,62 @@ def decode_token(token):
         raise UnauthorizedException('无效的Token')
 
 
+def get_token_cache():
+    """
+    获取当前应用的已验证Token缓存（按应用实例隔离，首次使用时创建）
+
+    缓存的过期时间直接使用Token的exp（墙上时间），与 decode_token 的过期判断一致：
+    当前时间 >= exp 时视为过期。
+    """
+    cache = current_app.extensions.get('token_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            'token_cache',
+            LRUCache(
+                max_size=current_app.config.get('TOKEN_CACHE_MAX_SIZE', 10000),
+                clock=time.time
+            )
+        )
+    return cache
+
+
+def _token_cache_key(token):
+    """Token缓存键：Token的SHA-256摘要，避免在内存中长期保存Token原文"""
+    return hashlib.sha256(token.encode('utf-8')).digest()
+
+
+def verify_token(token):
+    """
+    验证 JWT token（带缓存）
+
+    同一Token在过期前重复验证时直接返回缓存的载荷，跳过签名校验；
+    缓存未命中时调用 decode_token 完整校验后写入缓存。
+    """
+    if not current_app.config.get('TOKEN_CACHE_ENABLED', True):
+        return decode_token(token)
+
+    cache = get_token_cache()
+    key = _token_cache_key(token)
+    payload = cache.get(key)
+    if payload is None:
+        payload = decode_token(token)
+        cache.set(key, payload, expires_at=int(payload['exp']))
+
+    # 返回副本，避免调用方修改缓存中的载荷
+    return dict(payload)
+
+
+def invalidate_token(token):
+    """
+    从缓存中移除Token（退出登录时调用）
+
+    :return: Token存在于缓存中时返回True
+    """
+    if not token:
+        return False
+    return get_token_cache().delete(_token_cache_key(token))
+
+
 def token_required(f):
     """JWT 认证装饰器"""
     @wraps(f)
@@ -74,8 +134,10 @@ def token_required(f):
             return ApiResponse.auth_error('缺少Token')
 
         try:
-            payload = decode_token(token)
+            with phase('auth'):
+                payload = verify_token(token)
             request.current_user = payload
+            request.current_token = token
         except UnauthorizedException as e:
             return ApiResponse.auth_error(str(e))
 
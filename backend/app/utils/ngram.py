@@ -0,0 +1,43 @@
+"""
+企业名称 n-gram 分词
+
+中文企业名称没有空格分隔，按相邻两个字符（bigram）切分建立倒排索引：
+名称中包含查询词时，查询词的每个 bigram 都出现在名称的 bigram 中。
+"""
+import unicodedata
+
+# gram 长度
+GRAM_SIZE = 2
+
+# 企业名称常见后缀产生的 gram，几乎每条记录都包含，查询时忽略以免扫描大量索引行
+STOP_GRAMS = frozenset({
+    '有限', '限公', '公司', '股份', '份有', '限责', '责任', '任公', '集团',
+})
+
+
+def normalize_text(text: str) -> str:
+    """全角转半角、转小写，只保留字母、数字和汉字"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return ''.join(ch for ch in text if ch.isalnum())
+
+
+def text_grams(text: str) -> set:
+    """
+    切分文本为 gram 集合
+
+    :return: 规范化后的 bigram 集合；不足两个字符时为文本本身
+    """
+    text = normalize_text(text)
+    if len(text) < GRAM_SIZE:
+        return {text} if text else set()
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+def query_grams(query: str) -> list:
+    """
+    切分查询词，去掉常见后缀 gram（查询词只由常见后缀组成时保留）
+
+    :return: 排序后的 gram 列表
+    """
+    grams = text_grams(query)
+    return sorted(grams - STOP_GRAMS or grams)
@@ -0,0 +1,40 @@
+"""
+游标（keyset）分页工具
+
+游标是上一页最后一行排序键的 base64url 编码，对客户端不透明。
+下一页从该排序键之后继续查询，翻到第几页都只走一次索引定位，不随页码变慢。
+"""
+import base64
+import json
+
+from app.utils.exceptions import BadRequestException
+
+
+def encode_cursor(values) -> str:
+    """
+    将排序键编码为游标
+
+    :param values: 排序键取值列表（需可JSON序列化）
+    :return: 游标字符串
+    """
+    payload = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """
+    解码游标
+
+    :param cursor: encode_cursor 生成的游标
+    :param size: 排序键的个数
+    :return: 排序键取值列表
+    :raises BadRequestException: 游标格式错误
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise BadRequestException('无效的分页游标')
+    if not isinstance(values, list) or len(values) != size:
+        raise BadRequestException('无效的分页游标')
+    return values
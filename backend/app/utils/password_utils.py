@@ -0,0 +1,299 @@
+"""
+密码哈希工具
+
+bcrypt 的哈希与校验是CPU密集操作（单次约100ms以上），在请求线程中直接执行会长时间占用worker。
+这里提供一个有界线程池：bcrypt 在计算期间释放GIL，线程池即可并行利用多核，
+同时通过并发上限和排队上限保证登录高峰不会占满所有worker。
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from flask import current_app, has_app_context
+
+from app.utils.exceptions import TooManyRequestsException
+
+logger = logging.getLogger(__name__)
+
+# bcrypt 库的默认工作因子
+DEFAULT_BCRYPT_ROUNDS = 12
+
+# 校准时用于测速的工作因子（耗时短，按每增加1轮耗时翻倍推算）
+CALIBRATION_PROBE_ROUNDS = 8
+
+
+class BoundedExecutor:
+    """
+    有界线程池
+
+    同时最多 max_workers 个任务执行、max_queue 个任务排队；
+    超出后 submit 立即抛出 TooManyRequestsException，而不是无限排队。
+    """
+
+    def __init__(self, max_workers, max_queue, thread_name_prefix='bounded'):
+        """
+        :param max_workers: 最大并发执行数
+        :param max_queue: 最大排队数
+        :param thread_name_prefix: 线程名前缀
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=thread_name_prefix
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+
+        self.pending = 0
+        self.running = 0
+        self.peak_pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        提交任务
+
+        :return: Future
+        :raises TooManyRequestsException: 并发和排队均已满时
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise TooManyRequestsException('系统繁忙，请稍后重试')
+
+        with self._lock:
+            self.pending += 1
+            self.submitted += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+        def run():
+            with self._lock:
+                self.running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        try:
+            future = self._executor.submit(run)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        """任务结束，释放占用的名额"""
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+        self._slots.release()
+
+    def stats(self):
+        """
+        获取线程池统计信息
+
+        :return: 执行中、排队中、峰值、已完成、已拒绝数量等
+        """
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'running': self.running,
+                'queued': self.pending - self.running,
+                'peak_pending': self.peak_pending,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'rejected': self.rejected
+            }
+
+    def shutdown(self, wait=True):
+        """关闭线程池"""
+        self._executor.shutdown(wait=wait)
+
+
+_executor_lock = threading.Lock()
+
+
+def get_password_executor():
+    """获取当前应用的密码校验线程池（首次使用时创建）"""
+    executor = current_app.extensions.get('password_executor')
+    if executor is None:
+        with _executor_lock:
+            executor = current_app.extensions.get('password_executor')
+            if executor is None:
+                executor = BoundedExecutor(
+                    max_workers=current_app.config.get('BCRYPT_MAX_WORKERS') or os.cpu_count() or 2,
+                    max_queue=current_app.config.get('BCRYPT_MAX_QUEUE', 32),
+                    thread_name_prefix='bcrypt'
+                )
+                current_app.extensions['password_executor'] = executor
+    return executor
+
+
+def check_password_hash(password_text, password_hash):
+    """在当前线程中校验密码"""
+    return bcrypt.checkpw(password_text.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+class VerifyTimer:
+    """
+    记录密码校验耗时（指数移动平均），用于未知用户的等时响应
+    """
+
+    def __init__(self, alpha=0.2):
+        self.alpha = alpha
+        self._estimate = None
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        """记录一次实际校验耗时"""
+        with self._lock:
+            if self._estimate is None:
+                self._estimate = seconds
+            else:
+                self._estimate += self.alpha * (seconds - self._estimate)
+
+    def estimate(self):
+        """获取平均校验耗时，尚无记录时用缓存的假哈希实测一次"""
+        if self._estimate is None:
+            start = time.perf_counter()
+            check_password_hash('dummy-password', get_dummy_hash())
+            self.record(time.perf_counter() - start)
+        return self._estimate
+
+
+_verify_timer = VerifyTimer()
+_dummy_hashes = {}
+
+
+def get_dummy_hash():
+    """获取按当前工作因子生成的假哈希（每个工作因子只生成一次）"""
+    rounds = get_bcrypt_rounds()
+    dummy_hash = _dummy_hashes.get(rounds)
+    if dummy_hash is None:
+        dummy_hash = _dummy_hashes.setdefault(rounds, hash_password('dummy-password', rounds))
+    return dummy_hash
+
+
+def _timed_check_password_hash(password_text, password_hash):
+    """校验密码并记录耗时"""
+    start = time.perf_counter()
+    try:
+        return check_password_hash(password_text, password_hash)
+    finally:
+        _verify_timer.record(time.perf_counter() - start)
+
+
+def verify_password(password_text, password_hash):
+    """
+    在密码校验线程池中校验密码，当前线程等待结果
+
+    :raises TooManyRequestsException: 线程池排队已满时
+    """
+    future = get_password_executor().submit(_timed_check_password_hash, password_text, password_hash)
+    return future.result()
+
+
+def simulate_password_check():
+    """
+    用户不存在时模拟一次密码校验
+
+    按实际校验的平均耗时休眠，使响应时间与真实校验一致，
+    但不占用密码线程池，也不消耗 bcrypt 的CPU。
+    """
+    time.sleep(_verify_timer.estimate())
+
+
+def calibrate_bcrypt_rounds(target_ms, min_rounds=10, max_rounds=15, samples=3):
+    """
+    按目标校验耗时校准 bcrypt 工作因子
+
+    在低工作因子下测速，按每增加1轮耗时翻倍推算，选出预计耗时不超过目标的最大工作因子。
+
+    :param target_ms: 目标单次校验耗时（毫秒）
+    :param min_rounds: 工作因子下限
+    :param max_rounds: 工作因子上限
+    :param samples: 测速次数（取最快一次，排除调度抖动）
+    :return: (rounds, 预计单次耗时毫秒)
+    """
+    password = b'calibration'
+    password_hash = bcrypt.hashpw(password, bcrypt.gensalt(rounds=CALIBRATION_PROBE_ROUNDS))
+
+    probe_ms = None
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.checkpw(password, password_hash)
+        elapsed = (time.perf_counter() - start) * 1000
+        probe_ms = elapsed if probe_ms is None else min(probe_ms, elapsed)
+
+    rounds = min_rounds
+    for candidate in range(min_rounds, max_rounds + 1):
+        if probe_ms * 2 ** (candidate - CALIBRATION_PROBE_ROUNDS) <= target_ms:
+            rounds = candidate
+
+    return rounds, probe_ms * 2 ** (rounds - CALIBRATION_PROBE_ROUNDS)
+
+
+def init_password_hashing(app):
+    """
+    初始化密码哈希配置（应用启动时调用）
+
+    BCRYPT_ROUNDS 为 auto 时按 BCRYPT_TARGET_MS 校准工作因子，否则直接使用配置值。
+    """
+    rounds = app.config.get('BCRYPT_ROUNDS', DEFAULT_BCRYPT_ROUNDS)
+    if str(rounds).lower() == 'auto':
+        rounds, estimated_ms = calibrate_bcrypt_rounds(
+            app.config.get('BCRYPT_TARGET_MS', 250),
+            min_rounds=app.config.get('BCRYPT_MIN_ROUNDS', 10),
+            max_rounds=app.config.get('BCRYPT_MAX_ROUNDS', 15)
+        )
+        app.logger.info(f"bcrypt 工作因子校准完成: rounds={rounds}, 预计耗时={estimated_ms:.1f}ms")
+    app.extensions['bcrypt_rounds'] = int(rounds)
+
+
+def get_bcrypt_rounds():
+    """获取当前应用的 bcrypt 工作因子，无应用上下文时使用默认值"""
+    if not has_app_context():
+        return DEFAULT_BCRYPT_ROUNDS
+    return current_app.extensions.get('bcrypt_rounds', DEFAULT_BCRYPT_ROUNDS)
+
+
+def hash_password(password_text, rounds=None):
+    """
+    生成密码哈希
+
+    :param password_text: 明文密码
+    :param rounds: 工作因子，未指定时使用当前应用配置
+    """
+    if rounds is None:
+        rounds = get_bcrypt_rounds()
+    salt = bcrypt.gensalt(rounds=rounds)
+    return bcrypt.hashpw(password_text.encode('utf-8'), salt).decode('utf-8')
+
+
+def get_hash_rounds(password_hash):
+    """从 bcrypt 哈希（$2b$12$...）中解析工作因子，格式不正确时返回None"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(password_hash):
+    """
+    哈希的工作因子低于当前配置时需要重新哈希
+
+    只升级不降级：BCRYPT_ROUNDS=auto 时各进程校准的工作因子可能不同，
+    按"不一致"判断会让同一个用户的哈希在不同进程间来回重新哈希。
+    """
+    rounds = get_hash_rounds(password_hash)
+    return rounds is None or rounds < get_bcrypt_rounds()
+
@@ -0,0 +1,164 @@
+"""
+令牌桶限流工具
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from werkzeug.utils import import_string
+
+from app.utils.exceptions import TooManyRequestsException
+
+
+class MemoryBucketBackend:
+    """
+    进程内令牌桶存储
+
+    多进程/多实例部署时各进程独立计数；需要共享计数时，
+    通过 LOGIN_THROTTLE_BACKEND 配置实现相同接口（consume/refund/reset）的共享存储。
+    """
+
+    def __init__(self, max_keys=100000):
+        """
+        :param max_keys: 最多保存的桶数量，超出时淘汰最久未使用的桶（相当于该键恢复满额）
+        """
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _refill(self, key, capacity, refill_rate, now):
+        """按经过的时间补充令牌，返回当前令牌数"""
+        tokens, updated_at = self._buckets.get(key, (capacity, now))
+        return min(capacity, tokens + (now - updated_at) * refill_rate)
+
+    def _store(self, key, tokens, now):
+        """保存令牌数并维护LRU顺序"""
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def consume(self, key, capacity, refill_rate, cost=1):
+        """
+        尝试从桶中取出令牌
+
+        :param key: 桶的键
+        :param capacity: 桶容量
+        :param refill_rate: 每秒补充的令牌数
+        :param cost: 取出的令牌数
+        :return: (是否允许, 需等待的秒数)
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._refill(key, capacity, refill_rate, now)
+            if tokens >= cost:
+                self._store(key, tokens - cost, now)
+                return True, 0
+            self._store(key, tokens, now)
+            return False, (cost - tokens) / refill_rate if refill_rate > 0 else None
+
+    def refund(self, key, capacity, refill_rate, amount=1):
+        """退还令牌（不超过桶容量）"""
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._refill(key, capacity, refill_rate, now)
+            self._store(key, min(capacity, tokens + amount), now)
+
+    def reset(self, key):
+        """重置桶（恢复满额）"""
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class LoginThrottle:
+    """
+    登录失败限流
+
+    按用户名和客户端IP分别维护令牌桶：每次登录尝试先扣除令牌，
+    登录成功后退还，因此只有失败的尝试会持续消耗额度。
+    令牌不足时在查询用户和 bcrypt 校验之前直接拒绝。
+    """
+
+    def __init__(self, backend, user_capacity, user_refill_seconds, ip_capacity, ip_refill_seconds):
+        """
+        :param backend: 令牌桶存储
+        :param user_capacity: 单个用户名允许的连续失败次数
+        :param user_refill_seconds: 用户名每恢复1次额度所需秒数
+        :param ip_capacity: 单个IP允许的连续失败次数
+        :param ip_refill_seconds: IP每恢复1次额度所需秒数
+        """
+        self.backend = backend
+        self._limits = {
+            'user': (user_capacity, 1.0 / user_refill_seconds),
+            'ip': (ip_capacity, 1.0 / ip_refill_seconds)
+        }
+        self.rejected = 0
+
+    def _keys(self, user_name, client_ip):
+        """生成需要检查的桶"""
+        keys = [('user', f'login:user:{user_name}')]
+        if client_ip:
+            keys.append(('ip', f'login:ip:{client_ip}'))
+        return keys
+
+    def acquire(self, user_name, client_ip=None):
+        """
+        登录尝试前扣除令牌
+
+        :raises TooManyRequestsException: 用户名或IP的失败次数过多时
+        """
+        consumed = []
+        for kind, key in self._keys(user_name, client_ip):
+            capacity, refill_rate = self._limits[kind]
+            allowed, retry_after = self.backend.consume(key, capacity, refill_rate)
+            if not allowed:
+                # 已扣除的令牌退还，被拒绝的尝试不计入其他桶
+                for consumed_kind, consumed_key in consumed:
+                    self.backend.refund(consumed_key, *self._limits[consumed_kind])
+                self.rejected += 1
+                wait_seconds = int(retry_after) + 1 if retry_after else None
+                message = '登录失败次数过多，请稍后重试'
+                if wait_seconds:
+                    message = f'登录失败次数过多，请{wait_seconds}秒后重试'
+                raise TooManyRequestsException(message)
+            consumed.append((kind, key))
+
+    def release(self, user_name, client_ip=None):
+        """登录成功后退还本次扣除的令牌"""
+        for kind, key in self._keys(user_name, client_ip):
+            self.backend.refund(key, *self._limits[kind])
+
+
+_throttle_lock = threading.Lock()
+
+
+def get_login_throttle():
+    """
+    获取当前应用的登录限流器（首次使用时创建），未启用时返回None
+
+    LOGIN_THROTTLE_BACKEND 可配置为存储类的导入路径（如 'myproject.throttle.RedisBucketBackend'），
+    默认使用进程内存储。
+    """
+    if not current_app.config.get('LOGIN_THROTTLE_ENABLED', True):
+        return None
+
+    throttle = current_app.extensions.get('login_throttle')
+    if throttle is None:
+        with _throttle_lock:
+            throttle = current_app.extensions.get('login_throttle')
+            if throttle is None:
+                backend = current_app.config.get('LOGIN_THROTTLE_BACKEND')
+                if backend is None:
+                    backend = MemoryBucketBackend()
+                elif isinstance(backend, str):
+                    backend = import_string(backend)()
+                throttle = LoginThrottle(
+                    backend,
+                    user_capacity=current_app.config.get('LOGIN_THROTTLE_USER_CAPACITY', 5),
+                    user_refill_seconds=current_app.config.get('LOGIN_THROTTLE_USER_REFILL_SECONDS', 60),
+                    ip_capacity=current_app.config.get('LOGIN_THROTTLE_IP_CAPACITY', 30),
+                    ip_refill_seconds=current_app.config.get('LOGIN_THROTTLE_IP_REFILL_SECONDS', 2)
+                )
+                current_app.extensions['login_throttle'] = throttle
+    return throttle
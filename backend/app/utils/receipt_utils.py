@@ -0,0 +1,62 @@
+"""
+HMAC签名回执工具
+
+回执格式: <过期时间戳>.<签名>，签名覆盖用户ID、过期时间和数据摘要，
+摘要本身不包含在回执中，由校验方根据收到的数据重新计算。
+"""
+import base64
+import hashlib
+import hmac
+import time
+from functools import lru_cache
+
+from flask import current_app
+
+
+@lru_cache(maxsize=32)
+def _derive_key(secret: str, purpose: str) -> bytes:
+    return hmac.new(secret.encode('utf-8'), purpose.encode('utf-8'), hashlib.sha256).digest()
+
+
+def _receipt_key(purpose: str) -> bytes:
+    """由 SECRET_KEY 派生各用途独立的签名密钥（按密钥和用途缓存）"""
+    return _derive_key(current_app.config['SECRET_KEY'], purpose)
+
+
+def _signature(purpose: str, user_id, expires_at: int, digest: str) -> str:
+    message = f'{user_id}:{expires_at}:{digest}'.encode('utf-8')
+    mac = hmac.digest(_receipt_key(purpose), message, 'sha256')
+    return base64.urlsafe_b64encode(mac).rstrip(b'=').decode('ascii')
+
+
+def sign_receipt(purpose: str, digest: str, user_id, ttl: int) -> str:
+    """
+    生成回执
+
+    :param purpose: 用途，不同用途的回执不能互相使用
+    :param digest: 数据摘要
+    :param user_id: 用户ID，回执只对该用户有效
+    :param ttl: 有效期（秒）
+    :return: 回执字符串
+    """
+    expires_at = int(time.time()) + ttl
+    return f'{expires_at}.{_signature(purpose, user_id, expires_at, digest)}'
+
+
+def verify_receipt(purpose: str, receipt: str, digest: str, user_id) -> bool:
+    """
+    校验回执：签名正确、未过期且与数据摘要一致
+
+    :return: 校验通过返回True
+    """
+    if not receipt or '.' not in receipt:
+        return False
+    expires_text, signature = receipt.split('.', 1)
+    try:
+        expires_at = int(expires_text)
+    except ValueError:
+        return False
+    if expires_at < time.time():
+        return False
+    expected = _signature(purpose, user_id, expires_at, digest)
+    return hmac.compare_digest(signature, expected)
@@ -1,8 +1,14 @@
 """
 统一API响应格式工具类
+
+响应体由 app.json（见 json_provider）直接序列化为字节，不经过 jsonify。
 """
-from flask import jsonify
-from datetime import datetime
+import time
+
+import pydantic_core
+from flask import current_app
+
+from app.utils.json_provider import JSON_CONTENT_TYPE
 
 
 class ApiResponse:
@@ -18,6 +24,18 @@ class ApiResponse:
     NOT_FOUND_ERROR = 10004
     FILE_ERROR = 10005
     SERVER_ERROR = 10006
+    RATE_LIMIT_ERROR = 10007
+    
+    @staticmethod
+    def _make_response(code, msg, data):
+        """序列化统一响应结构"""
+        body = current_app.json.dumps_bytes({
+            "code": code,
+            "msg": msg,
+            "data": data or {},
+            "timestamp": int(time.time())
+        })
+        return current_app.response_class(body, content_type=JSON_CONTENT_TYPE), 200
     
     @staticmethod
     def success(data=None, msg="成功"):
@@ -27,14 +45,29 @@ class ApiResponse:
         :param msg: 响应消息
         :return: Flask响应对象
         """
-        response = jsonify({
-            "code": ApiResponse.SUCCESS_CODE,
-            "msg": msg,
-            "data": data or {},
-            "timestamp": int(datetime.now().timestamp())
-        })
-        response.headers['Content-Type'] = 'application/json; charset=utf-8'
-        return response, 200
+        return ApiResponse._make_response(ApiResponse.SUCCESS_CODE, msg, data)
+    
+    @staticmethod
+    def success_model(data, msg="成功"):
+        """
+        成功响应，data 由 pydantic-core 直接序列化为字节
+        
+        data 可以是 Pydantic 模型，或包含模型的字典/列表，不经过 model_dump 生成中间字典。
+        注意 Decimal 按 pydantic 规则输出为字符串。
+        
+        :param data: 响应数据
+        :param msg: 响应消息
+        :return: Flask响应对象
+        """
+        data_json = pydantic_core.to_json(data) if data is not None else b'{}'
+        body = b''.join((
+            b'{"code":', str(ApiResponse.SUCCESS_CODE).encode(),
+            b',"msg":', current_app.json.dumps_bytes(msg),
+            b',"data":', data_json,
+            b',"timestamp":', str(int(time.time())).encode(),
+            b'}'
+        ))
+        return current_app.response_class(body, content_type=JSON_CONTENT_TYPE), 200
     
     @staticmethod
     def error(code=ERROR_CODE, msg="失败", data=None):
@@ -42,17 +75,10 @@ class ApiResponse:
         错误响应
         :param code: 错误码
         :param msg: 错误消息
-        :param  附加数据
+        :param data: 附加数据
         :return: Flask响应对象
         """
-        response = jsonify({
-            "code": code,
-            "msg": msg,
-            "data": data or {},
-            "timestamp": int(datetime.now().timestamp())
-        })
-        response.headers['Content-Type'] = 'application/json; charset=utf-8'
-        return response, 200
+        return ApiResponse._make_response(code, msg, data)
     
     @staticmethod
     def validation_error(msg="数据验证失败", errors=None):
@@ -94,3 +120,11 @@ class ApiResponse:
             code=ApiResponse.SERVER_ERROR,
             msg=msg
         )
+    
+    @staticmethod
+    def rate_limit_error(msg="请求过于频繁，请稍后重试"):
+        """限流错误响应"""
+        return ApiResponse.error(
+            code=ApiResponse.RATE_LIMIT_ERROR,
+            msg=msg
+        )
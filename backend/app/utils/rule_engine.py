@@ -0,0 +1,217 @@
+"""
+声明式业务规则引擎
+
+规则格式（JSON）:
+    {
+      "rules": [
+        {
+          "id": "credit-max-term",
+          "loan_purpose": "credit",
+          "when": {"industry_category": ["01", "02"], "loan_amount": {"min": 1000000}},
+          "field": "loan_term",
+          "require": {"max": 5},
+          "msg": "信用贷款期限不能超过5年"
+        }
+      ]
+    }
+
+- loan_purpose: 适用的贷款目的，字符串或列表，省略或 "*" 表示所有贷款目的
+- when: 可选的适用条件，所有条件都满足时才检查该规则
+- field / require: 被检查的字段及其约束，不满足约束时返回错误 msg
+
+约束支持 min、max（数值比较，闭区间）、in、not_in（取值集合）；
+条件中的列表是 in 的简写，标量是等于的简写。
+
+规则在加载时编译为按贷款目的分组的查找表，每条申请只遍历适用于其贷款目的的规则。
+"""
+from collections import namedtuple
+
+# 编译后的规则：规则ID、适用条件、检查的字段与约束、返回的错误
+CompiledRule = namedtuple('CompiledRule', ['rule_id', 'conditions', 'field', 'predicate', 'error'])
+
+# 适用于所有贷款目的的通配符
+ANY_PURPOSE = '*'
+
+# 数值约束
+_NUMERIC_OPERATORS = {
+    'min': lambda value, bound: value >= bound,
+    'max': lambda value, bound: value <= bound,
+}
+
+
+def _to_number(value):
+    """转换为数值，无法转换时返回None"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _compile_constraint(field, constraint):
+    """
+    将约束编译为判断函数 predicate(value) -> bool
+
+    :raises ValueError: 约束格式错误
+    """
+    if isinstance(constraint, list):
+        constraint = {'in': constraint}
+    elif not isinstance(constraint, dict):
+        constraint = {'in': [constraint]}
+    if not constraint:
+        raise ValueError(f'字段 {field} 的约束不能为空')
+
+    checks = []
+    for operator, argument in constraint.items():
+        if operator in _NUMERIC_OPERATORS:
+            bound = _to_number(argument)
+            if bound is None or isinstance(argument, bool):
+                raise ValueError(f'字段 {field} 的 {operator} 必须是数字')
+            compare = _NUMERIC_OPERATORS[operator]
+
+            def check(value, compare=compare, bound=bound):
+                number = _to_number(value)
+                return number is not None and compare(number, bound)
+        elif operator in ('in', 'not_in'):
+            if not isinstance(argument, list):
+                raise ValueError(f'字段 {field} 的 {operator} 必须是列表')
+            allowed = frozenset(str(item) for item in argument)
+            expected = operator == 'in'
+
+            def check(value, allowed=allowed, expected=expected):
+                return (value is not None and str(value) in allowed) == expected
+        else:
+            raise ValueError(f'不支持的约束: {operator}')
+        checks.append(check)
+
+    if len(checks) == 1:
+        return checks[0]
+    return lambda value: all(check(value) for check in checks)
+
+
+def _compile_rule(rule):
+    """
+    编译单条规则
+
+    :return: (适用的贷款目的元组, CompiledRule)
+    :raises ValueError: 规则格式错误
+    """
+    if not isinstance(rule, dict):
+        raise ValueError('每条规则必须是JSON对象')
+    rule_id = rule.get('id')
+    field = rule.get('field')
+    if not rule_id or not field or 'require' not in rule or not rule.get('msg'):
+        raise ValueError(f'规则 {rule_id or rule} 缺少 id、field、require 或 msg')
+
+    purposes = rule.get('loan_purpose', ANY_PURPOSE)
+    if not isinstance(purposes, list):
+        purposes = [purposes]
+
+    when = rule.get('when') or {}
+    if not isinstance(when, dict):
+        raise ValueError(f'规则 {rule_id} 的 when 必须是JSON对象')
+
+    try:
+        conditions = tuple(
+            (condition_field, _compile_constraint(condition_field, constraint))
+            for condition_field, constraint in when.items()
+        )
+        predicate = _compile_constraint(field, rule['require'])
+    except ValueError as e:
+        raise ValueError(f'规则 {rule_id}: {str(e)}')
+
+    error = {'field': field, 'msg': rule['msg'], 'type': rule.get('type', 'business_rule')}
+    return tuple(str(purpose) for purpose in purposes), CompiledRule(rule_id, conditions, field, predicate, error)
+
+
+class CompiledRuleSet:
+    """
+    编译后的规则集：贷款目的 -> 规则元组
+
+    命中计数在多个线程间共享，未加锁递增，为近似值。
+    """
+
+    def __init__(self, rules_by_purpose, fallback_rules, rule_ids):
+        self._rules_by_purpose = rules_by_purpose
+        self._fallback_rules = fallback_rules
+        self.rule_ids = rule_ids
+        self.evaluations = 0
+        self.hits = dict.fromkeys(rule_ids, 0)
+
+    def rules_for(self, loan_purpose):
+        """获取适用于该贷款目的的规则（包含通配规则）"""
+        return self._rules_by_purpose.get(loan_purpose, self._fallback_rules)
+
+    def evaluate(self, values):
+        """
+        一次遍历检查所有适用的规则
+
+        :param values: 字段名 -> 值
+        :return: 错误列表，没有错误时返回空列表
+        """
+        self.evaluations += 1
+        errors = []
+        for rule in self.rules_for(values.get('loan_purpose')):
+            if all(condition(values.get(field)) for field, condition in rule.conditions) \
+                    and not rule.predicate(values.get(rule.field)):
+                self.hits[rule.rule_id] += 1
+                errors.append(dict(rule.error))
+        return errors
+
+    def passes(self, values):
+        """
+        检查是否满足所有适用的规则（不计入统计，用于生成测试数据）
+
+        :param values: 字段名 -> 值
+        :return: 全部满足时返回True
+        """
+        return not any(
+            all(condition(values.get(field)) for field, condition in rule.conditions)
+            and not rule.predicate(values.get(rule.field))
+            for rule in self.rules_for(values.get('loan_purpose'))
+        )
+
+    def stats(self):
+        """
+        获取规则统计
+
+        :return: 规则数、检查次数、每条规则的命中次数
+        """
+        return {
+            'rules': len(self.rule_ids),
+            'evaluations': self.evaluations,
+            'hits': dict(self.hits)
+        }
+
+
+def compile_rules(spec):
+    """
+    编译规则定义
+
+    :param spec: {"rules": [...]} 或规则列表
+    :return: CompiledRuleSet
+    :raises ValueError: 规则定义格式错误（调用方可继续使用上一版本）
+    """
+    rules = spec.get('rules') if isinstance(spec, dict) else spec
+    if not isinstance(rules, list):
+        raise ValueError('规则定义必须包含 rules 列表')
+
+    compiled = []
+    rule_ids = []
+    for rule in rules:
+        purposes, compiled_rule = _compile_rule(rule)
+        if compiled_rule.rule_id in rule_ids:
+            raise ValueError(f'规则ID重复: {compiled_rule.rule_id}')
+        rule_ids.append(compiled_rule.rule_id)
+        compiled.append((purposes, compiled_rule))
+
+    # 通配规则追加到每个贷款目的，未出现的贷款目的只使用通配规则
+    fallback_rules = tuple(rule for purposes, rule in compiled if ANY_PURPOSE in purposes)
+    named_purposes = {purpose for purposes, _ in compiled for purpose in purposes if purpose != ANY_PURPOSE}
+    rules_by_purpose = {
+        purpose: tuple(
+            rule for purposes, rule in compiled
+            if purpose in purposes or ANY_PURPOSE in purposes
+        )
+        for purpose in named_purposes
+    }
+    return CompiledRuleSet(rules_by_purpose, fallback_rules, tuple(rule_ids))
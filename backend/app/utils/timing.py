@@ -0,0 +1,221 @@
+"""
+请求阶段计时与采样性能分析
+
+- phase(name) 统计请求内一个阶段的耗时，同名阶段累加；请求上下文之外或未启用时不做任何事
+- 响应附加 Server-Timing 头（浏览器开发者工具的 Timing 面板可直接查看），
+  同时输出一条 key=value 格式的日志，阶段耗时也放在日志记录的 request_timing 字段中
+- 可选按比例采样请求做 cProfile / pyinstrument 性能分析，每个进程只保留最慢的 N 个请求的分析结果
+
+通过 init_request_timing(app) 注册请求钩子，配置见 REQUEST_TIMING_* 与 PROFILE_*。
+"""
+import cProfile
+import heapq
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:  # pragma: no cover - pyinstrument 是可选依赖
+    PyinstrumentProfiler = None
+
+logger = logging.getLogger(__name__)
+
+# 请求总耗时在 Server-Timing 中的名称
+TOTAL_METRIC = 'total'
+
+
+@contextmanager
+def phase(name: str):
+    """
+    统计一个阶段的耗时
+
+    :param name: 阶段名（Server-Timing 指标名，只能包含字母、数字、下划线和短横线）
+    """
+    if not has_request_context() or 'request_timings' not in g:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = g.request_timings
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+
+
+def server_timing_header(timings: dict, total: float) -> str:
+    """
+    生成 Server-Timing 头
+
+    :param timings: 阶段名 -> 耗时（秒），按记录顺序输出
+    :param total: 请求总耗时（秒）
+    """
+    metrics = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in timings.items()]
+    metrics.append(f'{TOTAL_METRIC};dur={total * 1000:.2f}')
+    return ', '.join(metrics)
+
+
+def _resolve_folder(folder: str) -> str:
+    """相对路径相对于项目根目录（与 UPLOAD_FOLDER 相同）"""
+    if os.path.isabs(folder):
+        return folder
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(project_root, folder)
+
+
+class SlowestProfiles:
+    """
+    保留最慢的 N 个请求的性能分析文件
+
+    进程内的最小堆，多线程共享；多进程部署时每个进程各自保留 N 个，文件名包含进程ID。
+    """
+
+    def __init__(self, directory: str, keep: int):
+        self.directory = directory
+        self.keep = keep
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def offer(self, duration: float, name: str, save) -> str:
+        """
+        比已保留的最快请求更慢时保存分析结果，并删除被挤出的文件
+
+        :param duration: 请求耗时（秒）
+        :param name: 文件名（不含目录）
+        :param save: save(path) 写入分析结果
+        :return: 保存的文件路径，未保存时返回None
+        """
+        with self._lock:
+            if self.keep <= 0 or (len(self._heap) >= self.keep and duration <= self._heap[0][0]):
+                return None
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, name)
+            save(path)
+            heapq.heappush(self._heap, (duration, path))
+            if len(self._heap) > self.keep:
+                _, evicted = heapq.heappop(self._heap)
+                try:
+                    os.unlink(evicted)
+                except FileNotFoundError:
+                    pass
+            return path
+
+
+def _start_profiler(kind: str):
+    """启动性能分析，无法启动时返回None"""
+    if kind == 'pyinstrument' and PyinstrumentProfiler is not None:
+        profiler = PyinstrumentProfiler()
+        profiler.start()
+        return profiler
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12 起同一时间只能有一个 cProfile 在运行，其他线程正在分析时跳过
+        return None
+    return profiler
+
+
+def _stop_profiler(profiler):
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+    else:
+        profiler.stop()
+
+
+def _profile_saver(profiler):
+    """返回 (文件扩展名, save(path))"""
+    if isinstance(profiler, cProfile.Profile):
+        return 'prof', profiler.dump_stats
+
+    def save_html(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(profiler.output_html())
+    return 'html', save_html
+
+
+def _profile_name(duration: float, extension: str) -> str:
+    """文件名：耗时_方法_路径_进程ID_时间戳，按文件名排序即按耗时排序"""
+    path = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_')[:80] or 'root'
+    return (
+        f'{duration * 1000:010.1f}ms_{request.method}_{path}'
+        f'_{os.getpid()}_{int(time.time() * 1000)}.{extension}'
+    )
+
+
+def _log_request_timing(response, timings: dict, total: float):
+    fields = {
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'total_ms': round(total * 1000, 2),
+        'phases': {name: round(seconds * 1000, 2) for name, seconds in timings.items()},
+    }
+    phases = ' '.join(f'{name}_ms={ms}' for name, ms in fields['phases'].items())
+    logger.info(
+        f"request_timing method={fields['method']} path={fields['path']} status={fields['status']} "
+        f"total_ms={fields['total_ms']} {phases}".rstrip(),
+        extra={'request_timing': fields}
+    )
+
+
+def init_request_timing(app):
+    """注册请求计时与采样性能分析的请求钩子"""
+    timing_enabled = app.config.get('REQUEST_TIMING_ENABLED', True)
+    sample_rate = app.config.get('PROFILE_SAMPLE_RATE', 0)
+    if not timing_enabled and not sample_rate:
+        return
+
+    if sample_rate:
+        profiler_kind = app.config.get('PROFILER', 'cprofile')
+        if profiler_kind == 'pyinstrument' and PyinstrumentProfiler is None:
+            logger.warning("未安装 pyinstrument，性能分析使用 cProfile")
+        app.extensions['slowest_profiles'] = SlowestProfiles(
+            _resolve_folder(app.config.get('PROFILE_DIR', 'profiles')),
+            app.config.get('PROFILE_KEEP', 10)
+        )
+
+    @app.before_request
+    def start_request_timing():
+        if timing_enabled:
+            g.request_timings = {}
+        if sample_rate and random.random() < sample_rate:
+            g.request_profiler = _start_profiler(current_app.config.get('PROFILER', 'cprofile'))
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def finish_request_timing(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+
+        profiler = g.pop('request_profiler', None)
+        if profiler is not None:
+            _stop_profiler(profiler)
+            extension, save = _profile_saver(profiler)
+            saved = current_app.extensions['slowest_profiles'].offer(total, _profile_name(total, extension), save)
+            if saved:
+                logger.info(f"已保存性能分析: {saved}")
+
+        timings = g.get('request_timings')
+        if timings is not None:
+            if current_app.config.get('SERVER_TIMING_HEADER', True):
+                response.headers['Server-Timing'] = server_timing_header(timings, total)
+            if logger.isEnabledFor(logging.INFO) and \
+                    total * 1000 >= current_app.config.get('REQUEST_TIMING_LOG_MIN_MS', 0):
+                _log_request_timing(response, timings, total)
+        return response
+
+    @app.teardown_request
+    def stop_request_profiler(exc):
+        # 未处理的异常不经过 after_request，停止分析但不保存
+        profiler = g.pop('request_profiler', None)
+        if profiler is not None:
+            _stop_profiler(profiler)
@@ -0,0 +1,235 @@
+"""
+文件上传工具：分块流式写入、边写边计算哈希、原子落盘
+"""
+import hashlib
+import os
+import re
+import secrets
+import tempfile
+import time
+
+# 每次从上传流读取的字节数
+CHUNK_SIZE = 64 * 1024
+
+# 文件头魔数 -> 检测出的文件类型
+MAGIC_SIGNATURES = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    # doc/xls 等旧版 Office 文档（OLE复合文档）
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'application/x-ole-storage'),
+    # docx/xlsx 等新版 Office 文档（zip容器）
+    (b'PK\x03\x04', 'application/zip'),
+)
+
+# 识别文件类型需要的最少字节数
+MAGIC_HEAD_SIZE = max(len(signature) for signature, _ in MAGIC_SIGNATURES)
+
+# 扩展名 -> 文件头允许识别出的类型
+EXTENSION_DETECTED_TYPES = {
+    'pdf': {'application/pdf'},
+    'png': {'image/png'},
+    'jpg': {'image/jpeg'},
+    'jpeg': {'image/jpeg'},
+    'doc': {'application/x-ole-storage'},
+    'xls': {'application/x-ole-storage'},
+    'docx': {'application/zip'},
+    'xlsx': {'application/zip'},
+}
+
+# 扩展名 -> 客户端允许声明的 Content-Type
+EXTENSION_CONTENT_TYPES = {
+    'pdf': {'application/pdf', 'application/x-pdf'},
+    'png': {'image/png'},
+    'jpg': {'image/jpeg', 'image/pjpeg'},
+    'jpeg': {'image/jpeg', 'image/pjpeg'},
+    'doc': {'application/msword'},
+    'xls': {'application/vnd.ms-excel'},
+    'docx': {'application/vnd.openxmlformats-officedocument.wordprocessingml.document'},
+    'xlsx': {'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'},
+}
+
+# 不代表具体类型的 Content-Type（部分浏览器和客户端会发送），只校验扩展名和文件头
+GENERIC_CONTENT_TYPES = {'', 'application/octet-stream', 'binary/octet-stream'}
+
+
+# ULID 使用的 Crockford Base32 字符表
+_CROCKFORD_BASE32 = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+# 文件名中不允许出现的字符（控制字符和Windows保留字符）
+_UNSAFE_FILENAME_CHARS = re.compile(r'[\x00-\x1f<>:"|?*]')
+
+# 保留的文件名最大长度（不含ID前缀）
+MAX_FILENAME_LENGTH = 100
+
+
+def generate_ulid(timestamp: float = None, random_bits: int = None) -> str:
+    """
+    生成按时间排序的唯一ID（ULID格式：48位毫秒时间戳 + 80位随机数，26位Crockford Base32）
+
+    同一毫秒内生成的ID依靠80位随机数保证唯一，字典序与生成时间一致。
+
+    :param timestamp: 秒级时间戳，默认当前时间
+    :param random_bits: 80位随机数，默认使用 secrets 生成（生成可复现的测试数据时由调用方指定）
+    :return: 26位ID
+    """
+    milliseconds = int((time.time() if timestamp is None else timestamp) * 1000)
+    if random_bits is None:
+        random_bits = secrets.randbits(80)
+    value = (milliseconds << 80) | (random_bits & ((1 << 80) - 1))
+    chars = []
+    for _ in range(26):
+        chars.append(_CROCKFORD_BASE32[value & 0x1F])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+def safe_filename(file_name: str) -> str:
+    """
+    清理上传文件名：去掉路径部分和非法字符，限制长度（保留扩展名）
+
+    与 werkzeug.utils.secure_filename 不同，中文文件名会被保留。
+
+    :param file_name: 原始文件名
+    :return: 可安全用作路径最后一级的文件名
+    """
+    name = os.path.basename((file_name or '').replace('\\', '/'))
+    name = _UNSAFE_FILENAME_CHARS.sub('_', name).strip().lstrip('.')
+    if len(name) > MAX_FILENAME_LENGTH:
+        stem, ext = os.path.splitext(name)
+        name = stem[:MAX_FILENAME_LENGTH - len(ext)] + ext
+    return name or 'file'
+
+
+def detect_file_type(head: bytes):
+    """
+    根据文件头魔数识别文件类型
+
+    :param head: 文件开头的字节
+    :return: 文件类型，无法识别时返回None
+    """
+    for signature, file_type in MAGIC_SIGNATURES:
+        if head.startswith(signature):
+            return file_type
+    return None
+
+
+def file_extension(file_name: str) -> str:
+    """获取小写的文件扩展名（不含点），没有扩展名时返回空字符串"""
+    name = os.path.basename((file_name or '').replace('\\', '/'))
+    return os.path.splitext(name)[1][1:].lower()
+
+
+def write_temp_file(stream, directory: str, chunk_size: int = CHUNK_SIZE, check=None) -> dict:
+    """
+    将上传流分块写入目标目录下的临时文件，同时计算SHA-256和大小
+
+    每次只在内存中保留一个分块。临时文件与最终文件位于同一目录，
+    保证之后的重命名是同一文件系统内的原子操作。
+
+    :param stream: 可读的二进制流
+    :param directory: 目标目录
+    :param chunk_size: 分块大小
+    :param check: 可选的内容校验（feed/finish 接口，见 upload_validation.UploadCheck），
+        分块写入前调用，校验失败时删除临时文件并抛出异常
+    :return: temp_path、sha256、size、detected_type
+    """
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-', suffix='.tmp')
+    sha256 = hashlib.sha256()
+    size = 0
+    head = b''
+
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                if check is not None:
+                    check.feed(chunk)
+                if len(head) < MAGIC_HEAD_SIZE:
+                    head += chunk[:MAGIC_HEAD_SIZE - len(head)]
+                sha256.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        if check is not None:
+            check.finish()
+    except BaseException:
+        discard_temp_file(temp_path)
+        raise
+
+    return {
+        'temp_path': temp_path,
+        'sha256': sha256.hexdigest(),
+        'size': size,
+        'detected_type': detect_file_type(head)
+    }
+
+
+def hash_file(file_path: str, chunk_size: int = CHUNK_SIZE) -> dict:
+    """
+    分块读取已有文件，计算SHA-256、大小并识别文件类型
+
+    :param file_path: 文件路径
+    :param chunk_size: 分块大小
+    :return: 与 write_temp_file 相同结构的结果（temp_path 为该文件路径）
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    head = b''
+
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            if len(head) < MAGIC_HEAD_SIZE:
+                head += chunk[:MAGIC_HEAD_SIZE - len(head)]
+            sha256.update(chunk)
+            size += len(chunk)
+
+    return {
+        'temp_path': file_path,
+        'sha256': sha256.hexdigest(),
+        'size': size,
+        'detected_type': detect_file_type(head)
+    }
+
+
+def _fsync_directory(directory: str):
+    """同步目录项，保证重命名结果落盘（不支持的平台忽略）"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def commit_temp_file(temp_path: str, final_path: str):
+    """
+    将临时文件落盘并原子重命名为最终文件
+
+    :param temp_path: 临时文件路径
+    :param final_path: 最终文件路径
+    """
+    try:
+        with open(temp_path, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(temp_path, final_path)
+    except BaseException:
+        discard_temp_file(temp_path)
+        raise
+    _fsync_directory(os.path.dirname(final_path))
+
+
+def discard_temp_file(temp_path: str):
+    """删除临时文件（不存在时忽略）"""
+    try:
+        os.unlink(temp_path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,175 @@
+"""
+上传文件校验：扩展名白名单、声明类型、文件头魔数与按类型的大小限制
+
+校验在数据到达时逐块进行：
+- 扩展名和声明的 Content-Type 在收到文件第一个字节之前校验
+- 文件头在收到前几个字节后立即与扩展名比对
+- 大小在每个分块写入前累计比对
+
+表单解析阶段即可中止请求（见 UploadRequest），不合规的文件只读取几KB，不会完整落盘。
+"""
+from tempfile import SpooledTemporaryFile
+
+from flask import Request, current_app
+
+from app.utils.exceptions import FileValidationException
+from app.utils.upload_utils import (
+    EXTENSION_CONTENT_TYPES,
+    EXTENSION_DETECTED_TYPES,
+    GENERIC_CONTENT_TYPES,
+    MAGIC_HEAD_SIZE,
+    detect_file_type,
+    file_extension
+)
+
+# 表单文件在内存中保留的最大字节数，超出后转存临时文件（与 werkzeug 默认值相同）
+SPOOL_MAX_SIZE = 500 * 1024
+
+
+def _format_size(size: int) -> str:
+    """格式化大小限制，用于错误提示"""
+    if size >= 1024 * 1024:
+        return f'{size / (1024 * 1024):g}MB'
+    return f'{size / 1024:g}KB'
+
+
+class UploadValidator:
+    """上传文件校验规则"""
+
+    def __init__(self, allowed_extensions, max_size_by_type=None, max_size=None):
+        """
+        :param allowed_extensions: 允许的扩展名（小写，不含点）
+        :param max_size_by_type: 扩展名 -> 最大字节数
+        :param max_size: 未单独配置的扩展名使用的最大字节数
+        """
+        self.allowed_extensions = {ext.lower() for ext in allowed_extensions}
+        self.max_size_by_type = max_size_by_type or {}
+        self.max_size = max_size
+
+    def check_name(self, file_name: str, content_type: str = None) -> str:
+        """
+        校验扩展名和客户端声明的 Content-Type
+
+        :return: 小写扩展名
+        :raises FileValidationException: 扩展名不在白名单或声明类型与扩展名不符
+        """
+        extension = file_extension(file_name)
+        if extension not in self.allowed_extensions:
+            allowed = '、'.join(sorted(self.allowed_extensions))
+            raise FileValidationException(f'不支持的文件类型，仅支持: {allowed}')
+
+        declared = (content_type or '').split(';', 1)[0].strip().lower()
+        if declared not in GENERIC_CONTENT_TYPES and \
+                declared not in EXTENSION_CONTENT_TYPES.get(extension, {declared}):
+            raise FileValidationException(f'文件类型声明({declared})与扩展名(.{extension})不符')
+        return extension
+
+    def max_size_for(self, extension: str):
+        """获取扩展名对应的最大字节数，None表示不限制"""
+        return self.max_size_by_type.get(extension, self.max_size)
+
+    def check_size(self, extension: str, size: int):
+        """
+        :raises FileValidationException: 超过该类型的大小限制
+        """
+        max_size = self.max_size_for(extension)
+        if max_size and size > max_size:
+            raise FileValidationException(f'.{extension} 文件大小不能超过{_format_size(max_size)}')
+
+    def check_detected_type(self, extension: str, detected_type):
+        """
+        :raises FileValidationException: 文件头识别出的类型与扩展名不符
+        """
+        expected = EXTENSION_DETECTED_TYPES.get(extension)
+        if expected is not None and detected_type not in expected:
+            raise FileValidationException(f'文件内容与扩展名(.{extension})不符')
+
+    def start(self, file_name: str, content_type: str = None) -> 'UploadCheck':
+        """校验文件名和声明类型，返回用于逐块校验内容的对象"""
+        return UploadCheck(self, self.check_name(file_name, content_type))
+
+
+class UploadCheck:
+    """单个文件的逐块内容校验"""
+
+    def __init__(self, validator: UploadValidator, extension: str):
+        self.validator = validator
+        self.extension = extension
+        self.size = 0
+        self._head = b''
+        self._head_checked = False
+
+    def feed(self, chunk: bytes):
+        """
+        写入分块前调用：累计大小，收到足够的字节后立即校验文件头
+
+        :raises FileValidationException: 超过大小限制或文件头与扩展名不符
+        """
+        self.size += len(chunk)
+        self.validator.check_size(self.extension, self.size)
+        if not self._head_checked:
+            self._head += chunk[:MAGIC_HEAD_SIZE - len(self._head)]
+            if len(self._head) >= MAGIC_HEAD_SIZE:
+                self._check_head()
+
+    def finish(self):
+        """
+        文件接收完毕时调用：校验不足 MAGIC_HEAD_SIZE 字节的小文件和空文件
+
+        :raises FileValidationException: 文件为空或文件头与扩展名不符
+        """
+        if self.size == 0:
+            raise FileValidationException('文件内容为空')
+        if not self._head_checked:
+            self._check_head()
+
+    def _check_head(self):
+        self._head_checked = True
+        self.validator.check_detected_type(self.extension, detect_file_type(self._head))
+
+
+def get_upload_validator() -> UploadValidator:
+    """根据当前应用配置创建上传文件校验规则"""
+    return UploadValidator(
+        current_app.config.get('ALLOWED_EXTENSIONS', EXTENSION_DETECTED_TYPES.keys()),
+        max_size_by_type=current_app.config.get('UPLOAD_MAX_SIZE_BY_TYPE'),
+        max_size=current_app.config.get('MAX_CONTENT_LENGTH')
+    )
+
+
+class ValidatingSpooledFile(SpooledTemporaryFile):
+    """表单解析时接收文件数据的容器，每次写入前校验内容"""
+
+    def __init__(self, check: UploadCheck):
+        super().__init__(max_size=SPOOL_MAX_SIZE, mode='rb+')
+        self.check = check
+        self._finished = False
+
+    def write(self, data):
+        self.check.feed(data)
+        return super().write(data)
+
+    def seek(self, *args):
+        # 表单解析器在文件部分接收完毕后回到开头，此时完成最后的校验
+        if not self._finished:
+            self._finished = True
+            self.check.finish()
+        return super().seek(*args)
+
+
+class UploadRequest(Request):
+    """
+    上传文件边接收边校验的请求类
+
+    multipart 表单中的每个文件在开始接收时校验扩展名和声明类型，接收过程中校验文件头和大小，
+    校验失败时在访问 request.form / request.files 时抛出 FileValidationException，
+    请求体的剩余部分不再读取。
+
+    文件名为空的文件部分（浏览器表单未选择文件时提交的空文件）不校验，
+    由接口按未上传文件处理（例如改用 upload_id）。
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if not filename:
+            return SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode='rb+')
+        return ValidatingSpooledFile(get_upload_validator().start(filename, content_type))
@@ -0,0 +1,12 @@
+"""
+接口基准测试
+
+用法（在 backend 目录下）:
+    python -m benchmarks                          # 使用 Flask 测试客户端
+    python -m benchmarks --target gunicorn -w 4   # 启动本地 gunicorn，通过 HTTP 压测
+    python -m benchmarks --save-baseline          # 保存本次结果为基线
+    python -m benchmarks --scenarios login,apply_1mb --iterations 200
+
+每个场景输出 p50/p99 延迟和吞吐量；存在基线时与基线比较，
+超过 thresholds.json 中的回退阈值时以非零状态退出。
+"""
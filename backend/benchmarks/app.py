@@ -0,0 +1,45 @@
+"""
+基准测试使用的应用实例
+
+数据库和上传目录由环境变量 DATABASE_URL、UPLOAD_FOLDER 指定（见 run.py），
+gunicorn 的每个 worker 通过 create_benchmark_app() 创建同样配置的应用。
+"""
+import logging
+
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
+
+from app import create_app, db
+from app.models.user import User
+
+# 基准测试用户
+BENCH_USER = 'bench_user'
+BENCH_PASSWORD = 'Bench123'
+
+
+@compiles(BigInteger, 'sqlite')
+def _sqlite_big_integer(type_, compiler, **kw):
+    # SQLite 只有 INTEGER PRIMARY KEY 才是自增的 rowid 别名
+    return 'INTEGER'
+
+
+def create_benchmark_app():
+    """创建应用并建表，日志只输出警告以上，避免日志输出影响计时"""
+    app = create_app('testing')
+    for name in (None, 'app', 'app.api', 'app.services', 'app.crud', 'app.utils'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    app.logger.setLevel(logging.WARNING)
+
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def ensure_bench_user(app):
+    """创建基准测试用户（已存在时跳过）"""
+    with app.app_context():
+        if User.query.filter_by(user_name=BENCH_USER).first() is None:
+            user = User(user_name=BENCH_USER, user_type='ENTERPRISE')
+            user.set_password(BENCH_PASSWORD)
+            db.session.add(user)
+            db.session.commit()
@@ -0,0 +1,201 @@
+"""
+基准测试入口：运行场景、输出 p50/p99 延迟与吞吐量、与基线比较
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_THRESHOLDS = os.path.join(BENCH_DIR, 'thresholds.json')
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='接口基准测试')
+    parser.add_argument('--scenarios', help='逗号分隔的场景名，默认运行全部场景')
+    parser.add_argument('--list', action='store_true', help='列出场景后退出')
+    parser.add_argument('--iterations', type=int, default=100, help='每个场景计时的请求数（默认100）')
+    parser.add_argument('--warmup', type=int, default=5, help='每个场景不计时的预热请求数（默认5）')
+    parser.add_argument('--concurrency', type=int, default=1, help='并发线程数（默认1）')
+    parser.add_argument('--target', choices=('client', 'gunicorn'), default='client',
+                        help='client: 进程内测试客户端；gunicorn: 启动本地 gunicorn 通过HTTP调用')
+    parser.add_argument('-w', '--workers', type=int, default=2, help='gunicorn worker 数（默认2）')
+    parser.add_argument('--baseline', help='基线文件，默认 benchmarks/baselines/<target>.json')
+    parser.add_argument('--save-baseline', action='store_true', help='将本次结果写入基线文件')
+    parser.add_argument('--thresholds', default=DEFAULT_THRESHOLDS, help='回退阈值文件')
+    parser.add_argument('--output', help='将本次结果写入JSON文件')
+    return parser.parse_args(argv)
+
+
+def _prepare_environment():
+    """未指定时使用临时目录中的 SQLite 数据库和上传目录，运行结束后删除"""
+    workdir = tempfile.TemporaryDirectory(prefix='loan-bench-')
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(workdir.name, 'bench.db')}")
+    os.environ.setdefault('UPLOAD_FOLDER', os.path.join(workdir.name, 'uploads'))
+    return workdir
+
+
+def _load_json(path: str, default=None):
+    if not path or not os.path.exists(path):
+        return default
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path: str, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def run_scenario(session, scenario, iterations: int, warmup: int, concurrency: int) -> dict:
+    """
+    运行单个场景
+
+    每个线程使用独立的请求目标；请求失败计入 errors，不中止场景。
+    """
+    from benchmarks.stats import summarize
+
+    next_request = scenario.prepare(session)
+    for _ in range(warmup):
+        session.call(next_request())
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    counts = [iterations // concurrency + (1 if i < iterations % concurrency else 0) for i in range(concurrency)]
+
+    def worker(count):
+        target = session.target.clone() if concurrency > 1 else session.target
+        local_latencies = []
+        local_errors = 0
+        for _ in range(count):
+            request = next_request()
+            started = time.perf_counter()
+            try:
+                status, body = target.send(request)
+                ok = status == 200 and json.loads(body).get('code') == 0
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - started
+            if ok:
+                local_latencies.append(elapsed)
+            else:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        worker(iterations)
+    else:
+        threads = [threading.Thread(target=worker, args=(count,)) for count in counts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wall = time.perf_counter() - started
+    return summarize(latencies, wall, sum(errors))
+
+
+def _print_table(results: dict, baseline: dict):
+    header = f"{'场景':<20}{'请求':>8}{'失败':>6}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}{'基线 p50':>12}"
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        previous = baseline.get(name, {}).get('p50_ms', '-')
+        print(
+            f"{name:<20}{result['requests']:>8}{result['errors']:>6}"
+            f"{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}{result['throughput_rps']:>10.1f}{previous:>12}"
+        )
+
+
+def main(argv=None) -> int:
+    """
+    :return: 退出码，0 表示没有回退，1 表示超过回退阈值，2 表示参数错误
+    """
+    args = _parse_args(argv)
+    workdir = _prepare_environment()
+
+    # 环境变量准备好之后再导入应用
+    from benchmarks.app import create_benchmark_app, ensure_bench_user
+    from benchmarks.scenarios import BenchSession, build_scenarios
+    from benchmarks.stats import compare
+    from benchmarks.targets import ClientTarget, gunicorn_target
+
+    scenarios = build_scenarios()
+    if args.list:
+        for scenario in scenarios:
+            print(f'{scenario.name:<20}{scenario.description}')
+        return 0
+    if args.scenarios:
+        selected = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+        unknown = set(selected) - {scenario.name for scenario in scenarios}
+        if unknown:
+            print(f"未知的场景: {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 2
+        scenarios = [scenario for scenario in scenarios if scenario.name in selected]
+
+    if args.target == 'gunicorn' and importlib.util.find_spec('gunicorn') is None:
+        print('--target gunicorn 需要安装 gunicorn（pip install gunicorn）', file=sys.stderr)
+        return 2
+
+    app = create_benchmark_app()
+    ensure_bench_user(app)
+
+    baseline_path = args.baseline or os.path.join(BENCH_DIR, 'baselines', f'{args.target}.json')
+    baseline = _load_json(baseline_path, {}).get('results', {})
+    thresholds = _load_json(args.thresholds, {})
+
+    if args.target == 'gunicorn':
+        target_context = gunicorn_target(workers=args.workers)
+    else:
+        target_context = nullcontext(ClientTarget(app))
+
+    results = {}
+    try:
+        with target_context as target:
+            session = BenchSession(app, target)
+            for scenario in scenarios:
+                print(f'运行 {scenario.name} ...', file=sys.stderr)
+                results[scenario.name] = run_scenario(
+                    session, scenario, args.iterations, args.warmup, max(args.concurrency, 1)
+                )
+    finally:
+        workdir.cleanup()
+
+    _print_table(results, baseline)
+
+    report = {
+        'target': args.target,
+        'workers': args.workers if args.target == 'gunicorn' else None,
+        'iterations': args.iterations,
+        'concurrency': args.concurrency,
+        'python': sys.version.split()[0],
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    if args.output:
+        _write_json(args.output, report)
+
+    if args.save_baseline:
+        _write_json(baseline_path, report)
+        print(f'\n基线已保存: {baseline_path}')
+        return 0
+
+    if not baseline:
+        print(f'\n未找到基线 {baseline_path}，使用 --save-baseline 生成')
+    regressions = compare(results, baseline, thresholds)
+    if regressions:
+        print('\n性能回退:')
+        for regression in regressions:
+            print(f'  {regression}')
+        return 1
+    return 0
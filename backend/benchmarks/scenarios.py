@@ -0,0 +1,184 @@
+"""
+基准测试场景
+
+每个场景的 prepare(session) 完成一次性准备（登录、上传、造数据），
+返回生成请求的函数；计时只包含发送请求和接收响应。
+"""
+import json
+from collections import namedtuple
+from io import BytesIO
+
+from werkzeug.datastructures import FileStorage
+from werkzeug.test import encode_multipart
+
+from app.crud.loan_crud import bulk_insert_loan_applications
+
+from benchmarks.app import BENCH_PASSWORD, BENCH_USER
+
+# 一次请求：方法、路径、请求头、请求体
+BenchRequest = namedtuple('BenchRequest', ['method', 'path', 'headers', 'body'])
+
+# 场景：名称、说明、准备函数
+Scenario = namedtuple('Scenario', ['name', 'description', 'prepare'])
+
+# 合法的贷款申请数据
+LOAN_FORM = {
+    'ent_name': '基准测试科技有限公司',
+    'uscc': '91310115MA1K4QLX1L',
+    'company_email': 'bench@example.com',
+    'company_address': '上海市浦东新区测试路1号',
+    'repay_account_bank': 'ICBC',
+    'repay_account_no': '6222021234567890123',
+    'loan_amount': '500000',
+    'loan_term': '3',
+    'loan_purpose': 'credit',
+    'prop_proof_type': 'REAL_ESTATE',
+    'industry_category': '01',
+}
+
+# 默认的上传文件大小
+DEFAULT_UPLOAD_SIZES = {'10kb': 10 * 1024, '1mb': 1024 * 1024, '5mb': 5 * 1024 * 1024}
+
+
+class BenchSession:
+    """场景之间共享的状态：请求目标、应用、登录Token"""
+
+    def __init__(self, app, target):
+        self.app = app
+        self.target = target
+        self._token = None
+
+    def call(self, request) -> dict:
+        """
+        发送请求并解析业务响应
+
+        :raises RuntimeError: HTTP状态码或业务码表示失败
+        """
+        status, body = self.target.send(request)
+        data = json.loads(body)
+        if status != 200 or data.get('code') != 0:
+            raise RuntimeError(f'{request.method} {request.path} 失败: {status} {data.get("msg")}')
+        return data['data']
+
+    @property
+    def token(self) -> str:
+        if self._token is None:
+            self._token = self.call(login_request())['access_token']
+        return self._token
+
+    def auth_headers(self, **headers) -> dict:
+        return {'Authorization': f'Bearer {self.token}', **headers}
+
+
+def login_request() -> BenchRequest:
+    body = json.dumps({'user_name': BENCH_USER, 'password': BENCH_PASSWORD}).encode('utf-8')
+    return BenchRequest('POST', '/api/auth/login', {'Content-Type': 'application/json'}, body)
+
+
+def pdf_bytes(size: int) -> bytes:
+    """指定大小的PDF文件内容（文件头合法，其余为填充）"""
+    head = b'%PDF-1.4\n'
+    return head + b'0' * max(size - len(head), 0)
+
+
+def multipart_request(path: str, headers: dict, fields: dict, file_bytes: bytes = None) -> BenchRequest:
+    """预先编码 multipart 表单，计时不包含客户端编码"""
+    values = dict(fields)
+    if file_bytes is not None:
+        values['prop_proof_docs'] = FileStorage(
+            stream=BytesIO(file_bytes),
+            filename='proof.pdf',
+            content_type='application/pdf'
+        )
+    boundary, body = encode_multipart(values)
+    return BenchRequest(
+        'POST',
+        path,
+        {**headers, 'Content-Type': f'multipart/form-data; boundary={boundary}'},
+        body
+    )
+
+
+def prepare_login(session):
+    request = login_request()
+    return lambda: request
+
+
+def prepare_auth_test(session):
+    request = BenchRequest('GET', '/api/auth/test', session.auth_headers(), None)
+    return lambda: request
+
+
+def prepare_financial_data(session):
+    request = BenchRequest('GET', '/api/loan/financial-data', session.auth_headers(), None)
+    return lambda: request
+
+
+def prepare_list_applications(session):
+    # 列表页需要有数据：补足 200 条本用户的申请
+    with session.app.app_context():
+        user_id = session.call(BenchRequest('GET', '/api/auth/test', session.auth_headers(), None))['user_id']
+        bulk_insert_loan_applications([
+            {**LOAN_FORM, 'loan_amount': 500000, 'user_id': user_id, 'ent_name': f'基准测试企业{i}'}
+            for i in range(200)
+        ])
+    request = BenchRequest('GET', '/api/loan/applications?limit=20', session.auth_headers(), None)
+    return lambda: request
+
+
+def make_prepare_apply(size: int):
+    def prepare_apply(session):
+        request = multipart_request(
+            '/api/loan/apply',
+            session.auth_headers(),
+            {**LOAN_FORM, 'include_financial_data': 'false'},
+            pdf_bytes(size)
+        )
+        return lambda: request
+    return prepare_apply
+
+
+def _applied_form(session) -> dict:
+    """先调用一次 /apply，返回 /confirm 需要的表单（含文件路径和回执）"""
+    data = session.call(multipart_request(
+        '/api/loan/apply', session.auth_headers(), LOAN_FORM, pdf_bytes(10 * 1024)
+    ))
+    return {
+        **LOAN_FORM,
+        'prop_proof_docs': data['file_info']['file_path'],
+        'prop_proof_docs_name': data['file_info']['file_name'],
+        'receipt': data['receipt'],
+    }
+
+
+def prepare_confirm_receipt(session):
+    request = multipart_request('/api/loan/confirm', session.auth_headers(), _applied_form(session))
+    return lambda: request
+
+
+def prepare_confirm_full(session):
+    form = _applied_form(session)
+    form.pop('receipt')
+    request = multipart_request('/api/loan/confirm', session.auth_headers(), form)
+    return lambda: request
+
+
+def build_scenarios(upload_sizes: dict = None) -> list:
+    """
+    全部场景（按执行顺序）
+
+    :param upload_sizes: 名称 -> 字节数，每个大小生成一个 apply_<名称> 场景
+    """
+    scenarios = [
+        Scenario('login', '登录（bcrypt 校验 + 签发Token）', prepare_login),
+        Scenario('auth_test', '需要Token的最小接口', prepare_auth_test),
+        Scenario('financial_data', '图表数据（预序列化缓存）', prepare_financial_data),
+        Scenario('list_applications', '申请列表第一页（20条）', prepare_list_applications),
+    ]
+    for label, size in (upload_sizes or DEFAULT_UPLOAD_SIZES).items():
+        scenarios.append(Scenario(f'apply_{label}', f'/apply 校验并上传 {label} 文件', make_prepare_apply(size)))
+    scenarios.extend([
+        Scenario('confirm_receipt', '/confirm 携带有效回执（跳过重复校验）', prepare_confirm_receipt),
+        Scenario('confirm_full', '/confirm 完整校验', prepare_confirm_full),
+    ])
+    return scenarios
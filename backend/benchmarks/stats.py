@@ -0,0 +1,83 @@
+"""
+基准测试统计与基线比较
+"""
+import math
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """
+    最近秩百分位数
+
+    :param sorted_values: 升序排列的数值
+    :param q: 百分位（0-100）
+    """
+    if not sorted_values:
+        return 0.0
+    index = max(math.ceil(q / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def summarize(latencies: list, wall_seconds: float, errors: int = 0) -> dict:
+    """
+    汇总一个场景的结果
+
+    :param latencies: 每个请求的耗时（秒）
+    :param wall_seconds: 场景总耗时（秒），用于计算吞吐量
+    :param errors: 失败的请求数
+    :return: 请求数、失败数、p50/p99/平均/最大延迟（毫秒）和吞吐量（请求/秒）
+    """
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        'requests': count,
+        'errors': errors,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'mean_ms': round(sum(values) / count * 1000, 3) if count else 0.0,
+        'max_ms': round(values[-1] * 1000, 3) if count else 0.0,
+        'throughput_rps': round(count / wall_seconds, 1) if wall_seconds > 0 else 0.0,
+    }
+
+
+# 越大越差的指标；其余（吞吐量）越小越差
+LOWER_IS_BETTER = ('p50_ms', 'p99_ms', 'mean_ms', 'max_ms')
+
+
+def thresholds_for(thresholds: dict, scenario: str) -> dict:
+    """场景的回退阈值：默认阈值被场景单独配置的阈值覆盖"""
+    return {**thresholds.get('default', {}), **thresholds.get('scenarios', {}).get(scenario, {})}
+
+
+def compare(results: dict, baseline: dict, thresholds: dict) -> list:
+    """
+    与基线比较
+
+    阈值是相对变化比例：延迟超过 基线 × (1 + 阈值)，或吞吐量低于 基线 × (1 - 阈值) 视为回退。
+    有失败请求的场景总是视为回退。基线中没有的场景不比较。
+
+    :param results: 场景名 -> summarize 结果
+    :param baseline: 场景名 -> summarize 结果
+    :param thresholds: {"default": {指标: 比例}, "scenarios": {场景名: {指标: 比例}}}
+    :return: 回退说明列表，为空表示没有回退
+    """
+    regressions = []
+    for scenario, current in results.items():
+        if current.get('errors'):
+            regressions.append(f"{scenario}: {current['errors']} 个请求失败")
+        previous = baseline.get(scenario)
+        if not previous:
+            continue
+        for metric, limit in thresholds_for(thresholds, scenario).items():
+            if metric not in current or not previous.get(metric):
+                continue
+            change = current[metric] / previous[metric] - 1
+            if metric in LOWER_IS_BETTER:
+                regressed = change > limit
+            else:
+                regressed = -change > limit
+            if regressed:
+                regressions.append(
+                    f"{scenario}: {metric} {previous[metric]} -> {current[metric]} "
+                    f"({change:+.0%}，阈值 {limit:.0%})"
+                )
+    return regressions
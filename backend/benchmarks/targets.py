@@ -0,0 +1,108 @@
+"""
+基准测试的请求目标：Flask 测试客户端或本地 gunicorn
+"""
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ClientTarget:
+    """通过 Flask 测试客户端在进程内调用（不含网络和 WSGI 服务器开销）"""
+
+    name = 'client'
+
+    def __init__(self, app):
+        self.app = app
+        self.client = app.test_client()
+
+    def clone(self):
+        """每个并发线程使用独立的客户端"""
+        return ClientTarget(self.app)
+
+    def send(self, request) -> tuple:
+        """
+        :param request: BenchRequest
+        :return: (HTTP状态码, 响应体字节)
+        """
+        response = self.client.open(
+            request.path,
+            method=request.method,
+            headers=request.headers,
+            data=request.body
+        )
+        return response.status_code, response.get_data()
+
+
+class HttpTarget:
+    """通过 HTTP 长连接调用本地服务"""
+
+    name = 'gunicorn'
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.connection = http.client.HTTPConnection(host, port, timeout=60)
+
+    def clone(self):
+        return HttpTarget(self.host, self.port)
+
+    def send(self, request) -> tuple:
+        self.connection.request(request.method, request.path, body=request.body, headers=request.headers)
+        response = self.connection.getresponse()
+        return response.status, response.read()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, process, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'gunicorn 启动失败，退出码 {process.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'gunicorn 在 {timeout:g} 秒内未开始监听')
+
+
+@contextmanager
+def gunicorn_target(workers: int = 2, threads: int = 1):
+    """
+    启动本地 gunicorn（与当前进程使用相同的 DATABASE_URL、UPLOAD_FOLDER 环境变量），退出时停止
+
+    :yield: HttpTarget
+    """
+    port = _free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn',
+            '--workers', str(workers),
+            '--threads', str(threads),
+            '--bind', f'127.0.0.1:{port}',
+            '--log-level', 'warning',
+            'benchmarks.app:create_benchmark_app()',
+        ],
+        cwd=BACKEND_DIR,
+        env=os.environ.copy()
+    )
+    try:
+        _wait_for_port(port, process)
+        yield HttpTarget('127.0.0.1', port)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
@@ -4,29 +4,33 @@ Pytest配置和fixture定义
 import os
 import sys
 import pytest
-from datetime import datetime
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app import create_app, db as _db
-from app.models.user import User
-from app.models.loan_application import LoanApplication
-from app.utils.jwt_utils import generate_token
+from app.models.user import EnterpriseLoanInfo, User
+from app.utils.jwt_utils import create_access_token
+
+
+@compiles(BigInteger, 'sqlite')
+def _sqlite_big_integer(type_, compiler, **kw):
+    # SQLite 只有 INTEGER PRIMARY KEY 才是自增的 rowid 别名
+    return 'INTEGER'
 
 
 @pytest.fixture(scope='session')
-def app():
-    """创建测试用的Flask应用"""
-    app = create_app()
+def app(tmp_path_factory):
+    """创建测试用的Flask应用（testing 配置，默认使用内存SQLite，上传文件写入临时目录）"""
+    app = create_app('testing')
     app.config.update({
-        'TESTING': True,
-        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'UPLOAD_FOLDER': str(tmp_path_factory.mktemp('uploads')),
         'WTF_CSRF_ENABLED': False,
         'SECRET_KEY': 'test-secret-key',
         'JWT_SECRET_KEY': 'test-jwt-secret',
+        'LOGIN_THROTTLE_ENABLED': False,
     })
     
     with app.app_context():
@@ -63,9 +67,9 @@ def enterprise_user(db):
     """创建企业用户"""
     user = User(
         user_name='enterprise_test',
-        password='Test1234',
         user_type='ENTERPRISE'
     )
+    user.set_password('Test1234')
     db.session.add(user)
     db.session.commit()
     return user
@@ -76,9 +80,9 @@ def individual_user(db):
     """创建个人用户"""
     user = User(
         user_name='individual_test',
-        password='Test1234',
         user_type='INDIVIDUAL'
     )
+    user.set_password('Test1234')
     db.session.add(user)
     db.session.commit()
     return user
@@ -87,13 +91,13 @@ def individual_user(db):
 @pytest.fixture
 def enterprise_token(enterprise_user):
     """生成企业用户token"""
-    return generate_token(enterprise_user.id, enterprise_user.user_type)
+    return create_access_token(enterprise_user.id, enterprise_user.user_name, enterprise_user.user_type)
 
 
 @pytest.fixture
 def individual_token(individual_user):
     """生成个人用户token"""
-    return generate_token(individual_user.id, individual_user.user_type)
+    return create_access_token(individual_user.id, individual_user.user_name, individual_user.user_type)
 
 
 @pytest.fixture
@@ -129,11 +133,11 @@ def sample_loan_data():
 @pytest.fixture
 def loan_application(db, enterprise_user, sample_loan_data):
     """创建贷款申请记录"""
-    loan = LoanApplication(
+    loan = EnterpriseLoanInfo(
         user_id=enterprise_user.id,
         **sample_loan_data,
-        prop_proof_docs_path='/uploads/test.pdf',
-        status='PENDING'
+        prop_proof_docs='/uploads/test.pdf',
+        prop_proof_docs_name='test.pdf'
     )
     db.session.add(loan)
     db.session.commit()
@@ -147,7 +151,7 @@ def mock_file():
     from werkzeug.datastructures import FileStorage
     
     return FileStorage(
-        stream=BytesIO(b"test file content"),
+        stream=BytesIO(b"%PDF-1.4 test file content"),
         filename="test_document.pdf",
         content_type="application/pdf"
     )
\ No newline at end of file
@@ -32,7 +32,7 @@ class TestAuthLogin:
         """测试错误密码"""
         data = {
             'user_name': enterprise_user.user_name,
-            'password': 'WrongPassword'
+            'password': 'Wrong123'
         }
         
         response = client.post(
@@ -82,6 +82,52 @@ class TestAuthLogin:
             json_data = response.get_json()
             assert json_data['code'] != 0
 
+    def test_login_throttled_after_failures(self, app, client, db, enterprise_user):
+        """测试连续登录失败后被限流"""
+        app.config['LOGIN_THROTTLE_ENABLED'] = True
+        app.extensions.pop('login_throttle', None)
+        data = {
+            'user_name': enterprise_user.user_name,
+            'password': 'Wrong123'
+        }
+        
+        try:
+            codes = [
+                client.post(
+                    '/api/auth/login',
+                    data=json.dumps(data),
+                    content_type='application/json'
+                ).get_json()['code']
+                for _ in range(app.config['LOGIN_THROTTLE_USER_CAPACITY'] + 1)
+            ]
+        finally:
+            app.config['LOGIN_THROTTLE_ENABLED'] = False
+            app.extensions.pop('login_throttle', None)
+        
+        assert codes[-1] == 10007
+        assert 10007 not in codes[:-1]
+    
+    def test_trusted_proxy_client_ip(self, monkeypatch):
+        """测试配置可信代理层数后按 X-Forwarded-For 确定客户端IP"""
+        from flask import request
+        from app import create_app
+        from app.config.config import TestingConfig
+        
+        monkeypatch.setattr(TestingConfig, 'TRUSTED_PROXY_COUNT', 1)
+        proxied_app = create_app('testing')
+        
+        @proxied_app.route('/_client_ip')
+        def client_ip():
+            return request.remote_addr
+        
+        response = proxied_app.test_client().get(
+            '/_client_ip',
+            headers={'X-Forwarded-For': '203.0.113.9, 198.51.100.7'}
+        )
+        
+        # 只信任最近一层代理添加的地址
+        assert response.get_data(as_text=True) == '198.51.100.7'
+
 
 class TestAuthLogout:
     """测试用户退出接口"""
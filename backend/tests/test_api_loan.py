@@ -28,6 +28,21 @@ class TestLoanApply:
         assert 'file_info' in json_data['data']
         assert 'financial_data' in json_data['data']
     
+    def test_apply_server_timing(self, client, db, auth_headers_enterprise, sample_loan_data, mock_file):
+        """测试响应的 Server-Timing 头包含各阶段耗时"""
+        data = sample_loan_data.copy()
+        data['prop_proof_docs'] = mock_file
+        
+        response = client.post(
+            '/api/loan/apply',
+            data=data,
+            headers=auth_headers_enterprise,
+            content_type='multipart/form-data'
+        )
+        
+        metrics = [metric.split(';')[0] for metric in response.headers['Server-Timing'].split(', ')]
+        assert metrics == ['auth', 'form', 'validate', 'upload', 'receipt', 'chart', 'encode', 'total']
+    
     def test_apply_without_token(self, client, db, sample_loan_data, mock_file):
         """测试未登录提交申请"""
         data = sample_loan_data.copy()
@@ -111,14 +126,50 @@ class TestLoanApply:
         assert json_data['code'] != 0
 
 
+    def test_apply_rejects_disallowed_extension(self, client, db, auth_headers_enterprise, sample_loan_data):
+        """测试不在白名单内的文件类型被拒绝"""
+        from io import BytesIO
+        
+        data = sample_loan_data.copy()
+        data['prop_proof_docs'] = (BytesIO(b'MZ\x90\x00'), 'setup.exe')
+        
+        response = client.post(
+            '/api/loan/apply',
+            data=data,
+            headers=auth_headers_enterprise,
+            content_type='multipart/form-data'
+        )
+        
+        assert response.get_json()['code'] == 10005
+    
+    def test_apply_rejects_content_mismatch(self, client, db, auth_headers_enterprise, sample_loan_data):
+        """测试文件内容与扩展名不符时被拒绝"""
+        from io import BytesIO
+        
+        data = sample_loan_data.copy()
+        data['prop_proof_docs'] = (BytesIO(b'MZ\x90\x00' + b'x' * 1024), 'report.pdf')
+        
+        response = client.post(
+            '/api/loan/apply',
+            data=data,
+            headers=auth_headers_enterprise,
+            content_type='multipart/form-data'
+        )
+        
+        json_data = response.get_json()
+        assert json_data['code'] == 10005
+        assert '不符' in json_data['msg']
+
+
 class TestLoanConfirm:
     """测试贷款确认接口 /api/loan/confirm"""
     
-    def test_confirm_success(self, client, db, auth_headers_enterprise, sample_loan_data):
+    def test_confirm_success(self, client, db, auth_headers_enterprise, sample_loan_data, mock_file):
         """测试成功确认贷款申请"""
+        applied = self._apply(client, auth_headers_enterprise, sample_loan_data, mock_file)
         data = sample_loan_data.copy()
-        data['prop_proof_docs'] = '/uploads/test.pdf'
-        data['prop_proof_docs_name'] = 'test.pdf'
+        data['prop_proof_docs'] = applied['file_info']['file_path']
+        data['prop_proof_docs_name'] = applied['file_info']['file_name']
         
         response = client.post(
             '/api/loan/confirm',
@@ -130,6 +181,7 @@ class TestLoanConfirm:
         assert response.status_code == 200
         json_data = response.get_json()
         assert json_data['code'] == 0
+        assert json_data['data']['user_id'] is not None
     
     def test_confirm_without_token(self, client, db, sample_loan_data):
         """测试未登录确认申请"""
@@ -159,4 +211,657 @@ class TestLoanConfirm:
         
         assert response.status_code == 200
         json_data = response.get_json()
-        assert json_data['code'] != 0
\ No newline at end of file
+        assert json_data['code'] != 0
+    
+    def _apply(self, client, headers, sample_loan_data, mock_file):
+        data = sample_loan_data.copy()
+        data['prop_proof_docs'] = mock_file
+        return client.post(
+            '/api/loan/apply',
+            data=data,
+            headers=headers,
+            content_type='multipart/form-data'
+        ).get_json()['data']
+    
+    def test_confirm_with_receipt_skips_validation(self, client, db, auth_headers_enterprise,
+                                                   sample_loan_data, mock_file, monkeypatch):
+        """测试携带有效回执时不重复校验"""
+        import app.api.loan_controller as loan_controller
+        
+        applied = self._apply(client, auth_headers_enterprise, sample_loan_data, mock_file)
+        calls = []
+        monkeypatch.setattr(
+            loan_controller, 'validate_loan_data',
+            lambda data: calls.append(data) or (None, [{'field': 'x', 'msg': 'x', 'type': 'x'}])
+        )
+        
+        data = sample_loan_data.copy()
+        data['prop_proof_docs'] = applied['file_info']['file_path']
+        data['prop_proof_docs_name'] = applied['file_info']['file_name']
+        data['receipt'] = applied['receipt']
+        response = client.post(
+            '/api/loan/confirm',
+            data=data,
+            headers=auth_headers_enterprise,
+            content_type='multipart/form-data'
+        )
+        
+        assert response.get_json()['code'] == 0
+        assert calls == []
+    
+    def test_confirm_with_receipt_skips_pydantic(self, client, db, auth_headers_enterprise,
+                                                 sample_loan_data, mock_file, monkeypatch):
+        """测试凭回执构建申请数据时不调用 Pydantic 验证"""
+        from app.schemas.loan_schema import LoanApplicationCreate
+        
+        applied = self._apply(client, auth_headers_enterprise, sample_loan_data, mock_file)
+        validator = LoanApplicationCreate.__pydantic_validator__
+        validated = []
+        
+        class CountingValidator:
+            def __getattr__(self, name):
+                validated.append(name)
+                return getattr(validator, name)
+        
+        monkeypatch.setattr(LoanApplicationCreate, '__pydantic_validator__', CountingValidator())
+        
+        data = sample_loan_data.copy()
+        data['prop_proof_docs'] = applied['file_info']['file_path']
+        data['prop_proof_docs_name'] = applied['file_info']['file_name']
+        data['receipt'] = applied['receipt']
+        response = client.post(
+            '/api/loan/confirm',
+            data=data,
+            headers=auth_headers_enterprise,
+            content_type='multipart/form-data'
+        )
+        
+        assert response.get_json()['code'] == 0
+        assert validated == []
+        
+        # 没有回执时走完整校验流程
+        data.pop('receipt')
+        client.post(
+            '/api/loan/confirm',
+            data=data,
+            headers=auth_headers_enterprise,
+            content_type='multipart/form-data'
+        )
+        assert 'validate_python' in validated
+    
+    def test_confirm_with_modified_data_revalidates(self, client, db, auth_headers_enterprise,
+                                                    sample_loan_data, mock_file):
+        """测试回执对应的数据被修改时重新校验"""
+        applied = self._apply(client, auth_headers_enterprise, sample_loan_data, mock_file)
+        
+        data = sample_loan_data.copy()
+        data['uscc'] = 'invalid'
+        data['prop_proof_docs'] = applied['file_info']['file_path']
+        data['prop_proof_docs_name'] = applied['file_info']['file_name']
+        data['receipt'] = applied['receipt']
+        response = client.post(
+            '/api/loan/confirm',
+            data=data,
+            headers=auth_headers_enterprise,
+            content_type='multipart/form-data'
+        )
+        
+        assert response.get_json()['code'] == 10002
+    
+    def test_confirm_rejects_foreign_file_path(self, client, db, auth_headers_enterprise,
+                                               auth_headers_individual, sample_loan_data, mock_file):
+        """测试没有回执时不能引用其他用户上传的文件或任意路径"""
+        from app.models.user import EnterpriseLoanInfo
+        
+        applied = self._apply(client, auth_headers_individual, sample_loan_data, mock_file)
+        for file_path in (applied['file_info']['file_path'], '/etc/passwd'):
+            data = sample_loan_data.copy()
+            data['prop_proof_docs'] = file_path
+            data['prop_proof_docs_name'] = 'test.pdf'
+            response = client.post(
+                '/api/loan/confirm',
+                data=data,
+                headers=auth_headers_enterprise,
+                content_type='multipart/form-data'
+            )
+            
+            assert response.get_json()['code'] == 10005
+        assert EnterpriseLoanInfo.query.count() == 0
+    
+    def test_confirm_with_receipt_matches_full_validation(self, client, db, auth_headers_enterprise,
+                                                          sample_loan_data, mock_file):
+        """测试凭回执保存的数据与完整校验流程相同（不额外去除首尾空白）"""
+        data = sample_loan_data.copy()
+        data['company_address'] = data['company_address'] + ' '
+        applied = self._apply(client, auth_headers_enterprise, data, mock_file)
+        
+        data['prop_proof_docs'] = applied['file_info']['file_path']
+        data['prop_proof_docs_name'] = applied['file_info']['file_name']
+        with_receipt = client.post(
+            '/api/loan/confirm',
+            data={**data, 'receipt': applied['receipt']},
+            headers=auth_headers_enterprise,
+            content_type='multipart/form-data'
+        ).get_json()['data']
+        without_receipt = client.post(
+            '/api/loan/confirm',
+            data=data,
+            headers=auth_headers_enterprise,
+            content_type='multipart/form-data'
+        ).get_json()['data']
+        
+        for field in ('company_address', 'industry_category', 'loan_amount', 'ent_name'):
+            assert with_receipt[field] == without_receipt[field]
+
+
+class TestFinancialData:
+    """测试图表数据接口 /api/loan/financial-data"""
+    
+    def test_get_financial_data(self, client, db, auth_headers_enterprise):
+        """测试获取图表数据"""
+        response = client.get('/api/loan/financial-data', headers=auth_headers_enterprise)
+        
+        assert response.status_code == 200
+        assert response.headers.get('ETag')
+        assert 'max-age' in response.headers.get('Cache-Control')
+        json_data = json.loads(response.data)
+        assert json_data['code'] == 0
+        assert isinstance(json_data['data']['financial_data'], list)
+    
+    def test_get_financial_data_not_modified(self, client, db, auth_headers_enterprise):
+        """测试ETag未变化时返回304"""
+        first = client.get('/api/loan/financial-data', headers=auth_headers_enterprise)
+        
+        headers = dict(auth_headers_enterprise)
+        headers['If-None-Match'] = first.headers['ETag']
+        response = client.get('/api/loan/financial-data', headers=headers)
+        
+        assert response.status_code == 304
+        assert response.data == b''
+    
+    def test_get_financial_data_gzip(self, client, db, auth_headers_enterprise):
+        """测试返回预压缩的响应体"""
+        import gzip
+        
+        headers = dict(auth_headers_enterprise)
+        headers['Accept-Encoding'] = 'gzip'
+        response = client.get('/api/loan/financial-data', headers=headers)
+        
+        assert response.headers.get('Content-Encoding') == 'gzip'
+        assert json.loads(gzip.decompress(response.data))['code'] == 0
+    
+    def test_apply_without_financial_data(self, client, db, auth_headers_enterprise, sample_loan_data, mock_file):
+        """测试提交申请时省略图表数据"""
+        data = sample_loan_data.copy()
+        data['prop_proof_docs'] = mock_file
+        data['include_financial_data'] = 'false'
+        
+        response = client.post(
+            '/api/loan/apply',
+            data=data,
+            headers=auth_headers_enterprise,
+            content_type='multipart/form-data'
+        )
+        
+        json_data = response.get_json()
+        assert json_data['code'] == 0
+        assert 'financial_data' not in json_data['data']
+
+
+class TestValidateBatch:
+    """测试批量校验接口 /api/loan/validate-batch"""
+    
+    def test_validate_batch(self, client, db, auth_headers_enterprise, sample_loan_data):
+        """测试按下标返回校验错误"""
+        invalid = {**sample_loan_data, 'company_email': 'not-an-email'}
+        
+        response = client.post(
+            '/api/loan/validate-batch',
+            data=json.dumps([sample_loan_data, invalid]),
+            headers=auth_headers_enterprise,
+            content_type='application/json'
+        )
+        
+        json_data = response.get_json()
+        assert json_data['code'] == 0
+        assert json_data['data']['valid'] == 1
+        assert json_data['data']['errors'][0]['index'] == 1
+        assert json_data['data']['errors'][0]['errors'][0]['field'] == 'company_email'
+    
+    def test_validate_batch_requires_array(self, client, db, auth_headers_enterprise):
+        """测试请求体不是数组"""
+        response = client.post(
+            '/api/loan/validate-batch',
+            data=json.dumps({'ent_name': 'x'}),
+            headers=auth_headers_enterprise,
+            content_type='application/json'
+        )
+        
+        assert response.get_json()['code'] == 10002
+
+
+class TestLoanImport:
+    """测试批量导入接口 /api/loan/import"""
+    
+    @pytest.fixture(autouse=True)
+    def allow_enterprise_import(self, app, monkeypatch):
+        """允许企业用户调用导入接口"""
+        monkeypatch.setitem(app.config, 'LOAN_IMPORT_USER_TYPES', {'ENTERPRISE'})
+    
+    def test_import_forbidden_user_type(self, app, client, db, auth_headers_individual, sample_loan_data):
+        """测试不在 LOAN_IMPORT_USER_TYPES 中的用户不能导入"""
+        from app.models.user import EnterpriseLoanInfo
+        
+        response = client.post(
+            '/api/loan/import?format=ndjson',
+            data=json.dumps(sample_loan_data).encode('utf-8'),
+            headers=auth_headers_individual
+        )
+        
+        assert response.get_json()['code'] == 10003
+        assert EnterpriseLoanInfo.query.count() == 0
+    
+    def test_import_batch_size_clamped(self, app, client, db, auth_headers_enterprise, sample_loan_data,
+                                       monkeypatch):
+        """测试 batch_size 不超过 LOAN_IMPORT_MAX_BATCH_SIZE"""
+        from app.services import loan_import_service
+        
+        batch_sizes = []
+        original = loan_import_service.LoanImportService.import_records
+        
+        def import_records(records, batch_size=None, user_id=None):
+            batch_sizes.append(batch_size)
+            return original(records, batch_size=batch_size, user_id=user_id)
+        
+        monkeypatch.setattr(loan_import_service.LoanImportService, 'import_records', staticmethod(import_records))
+        monkeypatch.setitem(app.config, 'LOAN_IMPORT_MAX_BATCH_SIZE', 10)
+        
+        response = client.post(
+            '/api/loan/import?format=ndjson&batch_size=1000000',
+            data=json.dumps(sample_loan_data).encode('utf-8'),
+            headers=auth_headers_enterprise
+        )
+        
+        assert response.get_json()['data']['imported'] == 1
+        assert batch_sizes == [10]
+    
+    def test_import_csv_with_row_errors(self, client, db, auth_headers_enterprise, sample_loan_data):
+        """测试CSV导入：有效行全部入库，无效行返回行号和错误"""
+        import csv
+        import io
+        from app.models.user import EnterpriseLoanInfo
+        
+        fields = list(sample_loan_data.keys())
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        writer.writeheader()
+        for _ in range(5):
+            writer.writerow(sample_loan_data)
+        writer.writerow({**sample_loan_data, 'uscc': 'invalid'})
+        
+        response = client.post(
+            '/api/loan/import?batch_size=2',
+            data=buffer.getvalue().encode('utf-8'),
+            headers={**auth_headers_enterprise, 'Content-Type': 'text/csv'}
+        )
+        
+        json_data = response.get_json()
+        assert json_data['code'] == 0
+        assert json_data['data']['imported'] == 5
+        assert json_data['data']['failed'] == 1
+        assert json_data['data']['errors'][0]['row'] == 6
+        assert EnterpriseLoanInfo.query.count() == 5
+    
+    def test_import_ndjson_parse_error(self, client, db, auth_headers_enterprise, sample_loan_data):
+        """测试NDJSON导入时无法解析的行"""
+        body = json.dumps(sample_loan_data) + '\n{broken\n'
+        
+        response = client.post(
+            '/api/loan/import?format=ndjson',
+            data=body.encode('utf-8'),
+            headers=auth_headers_enterprise
+        )
+        
+        json_data = response.get_json()
+        assert json_data['data']['imported'] == 1
+        assert json_data['data']['errors'][0]['errors'][0]['type'] == 'parse_error'
+    
+    def test_import_unknown_format(self, client, db, auth_headers_enterprise):
+        """测试无法确定导入格式"""
+        response = client.post('/api/loan/import', data=b'x', headers=auth_headers_enterprise)
+        
+        assert response.get_json()['code'] != 0
+
+
+class TestLoanList:
+    """测试贷款申请列表接口 /api/loan/applications"""
+    
+    def _create_loans(self, user_ids, sample_loan_data):
+        from app.crud.loan_crud import bulk_insert_loan_applications
+        bulk_insert_loan_applications([
+            {**sample_loan_data, 'ent_name': f'企业{i}', 'user_id': user_id}
+            for i, user_id in enumerate(user_ids)
+        ])
+    
+    def test_list_pages_with_cursor(self, client, db, enterprise_user, auth_headers_enterprise, sample_loan_data):
+        """测试游标分页：逐页获取全部申请，按提交时间倒序且不重复"""
+        self._create_loans([enterprise_user.id] * 7, sample_loan_data)
+        
+        ids = []
+        cursor = None
+        while True:
+            params = {'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            response = client.get('/api/loan/applications', query_string=params, headers=auth_headers_enterprise)
+            page = response.get_json()['data']
+            ids.extend(item['id'] for item in page['items'])
+            cursor = page['next_cursor']
+            if not page['has_more']:
+                break
+        
+        assert len(ids) == 7
+        assert ids == sorted(ids, reverse=True)
+    
+    def test_list_only_own_applications(self, client, db, enterprise_user, individual_user,
+                                        auth_headers_enterprise, sample_loan_data):
+        """测试普通用户只能查看自己提交的申请"""
+        self._create_loans([enterprise_user.id, individual_user.id, individual_user.id], sample_loan_data)
+        
+        response = client.get('/api/loan/applications', headers=auth_headers_enterprise)
+        items = response.get_json()['data']['items']
+        assert [item['user_id'] for item in items] == [enterprise_user.id]
+        
+        response = client.get(
+            '/api/loan/applications',
+            query_string={'owner': individual_user.id},
+            headers=auth_headers_enterprise
+        )
+        assert response.get_json()['code'] != 0
+    
+    def test_list_invalid_cursor(self, client, db, auth_headers_enterprise):
+        """测试无效的分页游标"""
+        response = client.get(
+            '/api/loan/applications',
+            query_string={'cursor': 'not-a-cursor'},
+            headers=auth_headers_enterprise
+        )
+        
+        assert response.get_json()['code'] == 10002
+
+
+class TestLoanSearch:
+    """测试贷款申请搜索接口 /api/loan/search"""
+    
+    def test_search_by_name(self, client, db, enterprise_user, auth_headers_enterprise, sample_loan_data):
+        """测试按企业名称部分匹配，按匹配程度排序"""
+        from app.crud.loan_crud import bulk_insert_loan_applications, create_loan_application
+        
+        create_loan_application({**sample_loan_data, 'ent_name': '深圳市华为技术有限公司', 'user_id': enterprise_user.id})
+        bulk_insert_loan_applications([
+            {**sample_loan_data, 'ent_name': name, 'user_id': enterprise_user.id}
+            for name in ('华为贸易有限公司', '腾讯科技有限公司')
+        ])
+        
+        response = client.get('/api/loan/search', query_string={'q': '华为技'}, headers=auth_headers_enterprise)
+        items = response.get_json()['data']['items']
+        
+        assert [item['ent_name'] for item in items] == ['深圳市华为技术有限公司', '华为贸易有限公司']
+        assert items[0]['score'] == 1.0
+    
+    def test_search_by_uscc(self, client, db, enterprise_user, auth_headers_enterprise, sample_loan_data):
+        """测试按统一社会信用代码精确查找"""
+        from app.crud.loan_crud import create_loan_application
+        
+        create_loan_application({**sample_loan_data, 'user_id': enterprise_user.id})
+        create_loan_application({**sample_loan_data, 'uscc': '91440300708461136T', 'user_id': enterprise_user.id})
+        
+        response = client.get(
+            '/api/loan/search',
+            query_string={'q': sample_loan_data['uscc']},
+            headers=auth_headers_enterprise
+        )
+        items = response.get_json()['data']['items']
+        
+        assert [item['uscc'] for item in items] == [sample_loan_data['uscc']]
+    
+    def test_search_query_too_short(self, client, db, auth_headers_enterprise):
+        """测试搜索词过短"""
+        response = client.get('/api/loan/search', query_string={'q': '华'}, headers=auth_headers_enterprise)
+        
+        assert response.get_json()['code'] == 10002
+
+
+class TestPortfolioStats:
+    """测试汇总统计接口 /api/loan/stats"""
+    
+    def test_stats_follow_inserts(self, app, client, db, enterprise_user, auth_headers_enterprise, sample_loan_data):
+        """测试新增申请在同一事务中累加到汇总表，统计只读汇总表"""
+        from datetime import datetime
+        from app.crud.loan_crud import bulk_insert_loan_applications, create_loan_application
+        
+        app.config['LOAN_REVIEWER_USER_TYPES'] = {'ENTERPRISE'}
+        try:
+            bulk_insert_loan_applications([
+                {**sample_loan_data, 'loan_amount': 100, 'created_at': datetime(2024, 1, 5)},
+                {**sample_loan_data, 'loan_amount': 200, 'created_at': datetime(2024, 1, 20)},
+                {**sample_loan_data, 'loan_amount': 300, 'created_at': datetime(2024, 2, 1)},
+            ])
+            create_loan_application({**sample_loan_data, 'loan_amount': 400, 'created_at': datetime(2024, 2, 3)})
+            
+            response = client.get(
+                '/api/loan/stats',
+                query_string={'group_by': 'month'},
+                headers=auth_headers_enterprise
+            )
+        finally:
+            app.config['LOAN_REVIEWER_USER_TYPES'] = {'ADMIN'}
+        
+        data = response.get_json()['data']
+        assert data['groups'] == [
+            {'month': '2024-01', 'count': 2, 'total_amount': 300.0},
+            {'month': '2024-02', 'count': 2, 'total_amount': 700.0},
+        ]
+        assert data['total'] == {'count': 4, 'total_amount': 1000.0}
+    
+    def test_stats_requires_reviewer(self, client, db, auth_headers_enterprise):
+        """测试非审核用户无权查看汇总统计"""
+        response = client.get('/api/loan/stats', headers=auth_headers_enterprise)
+        
+        assert response.get_json()['code'] == 10003
+
+
+class TestLoanExport:
+    """测试流式导出接口 /api/loan/export"""
+    
+    def _create_loans(self, user_id, sample_loan_data):
+        from datetime import datetime
+        from app.crud.loan_crud import bulk_insert_loan_applications
+        bulk_insert_loan_applications([
+            {**sample_loan_data, 'ent_name': f'企业{day}', 'user_id': user_id,
+             'created_at': datetime(2024, 1, day, 12)}
+            for day in (1, 2, 3)
+        ])
+    
+    def test_export_csv(self, client, db, enterprise_user, auth_headers_enterprise, sample_loan_data):
+        """测试导出CSV：表头加每条申请一行，按提交时间排序"""
+        import csv
+        import io
+        
+        self._create_loans(enterprise_user.id, sample_loan_data)
+        
+        response = client.get('/api/loan/export', headers=auth_headers_enterprise)
+        
+        assert response.status_code == 200
+        assert response.headers['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(response.data.decode('utf-8-sig'))))
+        assert [row['ent_name'] for row in rows] == ['企业1', '企业2', '企业3']
+    
+    def test_export_ndjson_gzip_with_date_range(self, client, db, enterprise_user,
+                                                auth_headers_enterprise, sample_loan_data):
+        """测试按日期范围导出NDJSON，客户端支持时gzip压缩"""
+        import gzip
+        
+        self._create_loans(enterprise_user.id, sample_loan_data)
+        
+        response = client.get(
+            '/api/loan/export',
+            query_string={'format': 'ndjson', 'start': '2024-01-02', 'end': '2024-01-02'},
+            headers={**auth_headers_enterprise, 'Accept-Encoding': 'gzip'}
+        )
+        
+        assert response.headers['Content-Encoding'] == 'gzip'
+        lines = gzip.decompress(response.data).decode('utf-8').splitlines()
+        assert [json.loads(line)['ent_name'] for line in lines] == ['企业2']
+    
+    def test_export_invalid_date(self, client, db, auth_headers_enterprise):
+        """测试日期格式错误"""
+        response = client.get('/api/loan/export', query_string={'start': '2024/01/01'}, headers=auth_headers_enterprise)
+        
+        assert response.get_json()['code'] == 10002
+
+
+class TestChunkedUpload:
+    """测试分块上传接口 /api/loan/uploads"""
+    
+    def _create(self, client, headers, size):
+        response = client.post(
+            '/api/loan/uploads',
+            data=json.dumps({'file_name': 'big.pdf', 'file_size': size}),
+            headers=headers,
+            content_type='application/json'
+        )
+        return response.get_json()['data']['upload_id']
+    
+    def test_chunked_upload_and_apply(self, client, db, auth_headers_enterprise, sample_loan_data):
+        """测试分块上传完成后用 upload_id 提交申请"""
+        content = b'%PDF-1.4 ' + b'a' * 3000
+        upload_id = self._create(client, auth_headers_enterprise, len(content))
+        
+        for offset in range(0, len(content), 1024):
+            response = client.put(
+                f'/api/loan/uploads/{upload_id}?offset={offset}',
+                data=content[offset:offset + 1024],
+                headers=auth_headers_enterprise
+            )
+            assert response.get_json()['code'] == 0
+        
+        finalized = client.post(
+            f'/api/loan/uploads/{upload_id}/finalize',
+            headers=auth_headers_enterprise
+        ).get_json()
+        assert finalized['code'] == 0
+        assert finalized['data']['file_info']['file_size'] == len(content)
+        
+        data = sample_loan_data.copy()
+        data['upload_id'] = upload_id
+        response = client.post(
+            '/api/loan/apply',
+            data=data,
+            headers=auth_headers_enterprise,
+            content_type='multipart/form-data'
+        )
+        assert response.get_json()['code'] == 0
+    
+    def test_chunk_offset_conflict(self, client, db, auth_headers_enterprise):
+        """测试偏移量不一致时返回当前偏移量"""
+        upload_id = self._create(client, auth_headers_enterprise, 100)
+        client.put(
+            f'/api/loan/uploads/{upload_id}?offset=0',
+            data=b'%PDF-' + b'x' * 45,
+            headers=auth_headers_enterprise
+        )
+        
+        response = client.put(
+            f'/api/loan/uploads/{upload_id}?offset=0',
+            data=b'x' * 10,
+            headers=auth_headers_enterprise
+        )
+        json_data = response.get_json()
+        
+        assert json_data['code'] != 0
+        assert json_data['data']['offset'] == 50
+    
+    def test_finalize_incomplete(self, client, db, auth_headers_enterprise):
+        """测试未上传完成时不能完成上传"""
+        upload_id = self._create(client, auth_headers_enterprise, 100)
+        
+        response = client.post(
+            f'/api/loan/uploads/{upload_id}/finalize',
+            headers=auth_headers_enterprise
+        )
+        
+        assert response.get_json()['code'] != 0
+    
+    def test_first_chunk_content_mismatch(self, client, db, auth_headers_enterprise):
+        """测试第一个分块的文件头与扩展名不符时拒绝写入"""
+        upload_id = self._create(client, auth_headers_enterprise, 100)
+        
+        response = client.put(
+            f'/api/loan/uploads/{upload_id}?offset=0',
+            data=b'MZ' + b'x' * 48,
+            headers=auth_headers_enterprise
+        )
+        
+        assert response.get_json()['code'] == 10005
+        session = client.get(f'/api/loan/uploads/{upload_id}', headers=auth_headers_enterprise)
+        assert session.get_json()['data']['offset'] == 0
+    
+    def test_apply_with_empty_file_part(self, client, db, auth_headers_enterprise, sample_loan_data):
+        """测试表单带未选择文件的空文件部分时仍使用 upload_id"""
+        content = b'%PDF-1.4 ' + b'a' * 100
+        upload_id = self._create(client, auth_headers_enterprise, len(content))
+        client.put(
+            f'/api/loan/uploads/{upload_id}?offset=0',
+            data=content,
+            headers=auth_headers_enterprise
+        )
+        client.post(f'/api/loan/uploads/{upload_id}/finalize', headers=auth_headers_enterprise)
+        
+        data = sample_loan_data.copy()
+        data['upload_id'] = upload_id
+        data['prop_proof_docs'] = (BytesIO(b''), '', 'application/octet-stream')
+        response = client.post(
+            '/api/loan/apply',
+            data=data,
+            headers=auth_headers_enterprise,
+            content_type='multipart/form-data'
+        )
+        
+        json_data = response.get_json()
+        assert json_data['code'] == 0
+        assert json_data['data']['file_info']['file_size'] == len(content)
+    
+    def test_active_session_limit(self, app, client, db, auth_headers_enterprise, auth_headers_individual,
+                                  monkeypatch, tmp_path):
+        """测试每个用户未完成的上传会话数上限"""
+        monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+        monkeypatch.setitem(app.config, 'UPLOAD_SESSION_MAX_ACTIVE_PER_USER', 2)
+        self._create(client, auth_headers_enterprise, 100)
+        self._create(client, auth_headers_enterprise, 100)
+        
+        response = client.post(
+            '/api/loan/uploads',
+            data=json.dumps({'file_name': 'big.pdf', 'file_size': 100}),
+            headers=auth_headers_enterprise,
+            content_type='application/json'
+        )
+        
+        assert response.get_json()['code'] == 10007
+        
+        # 会话按用户分目录保存，其他用户的会话不计入上限
+        assert len(list((tmp_path / '.sessions').iterdir())) == 1
+        response = client.post(
+            '/api/loan/uploads',
+            data=json.dumps({'file_name': 'big.pdf', 'file_size': 100}),
+            headers=auth_headers_individual,
+            content_type='application/json'
+        )
+        assert response.get_json()['code'] == 0
+        assert len(list((tmp_path / '.sessions').iterdir())) == 2
+    
+    def test_session_not_found(self, client, db, auth_headers_enterprise):
+        """测试会话不存在"""
+        response = client.get('/api/loan/uploads/' + '0' * 32, headers=auth_headers_enterprise)
+        
+        assert response.get_json()['code'] == 10004
@@ -0,0 +1,349 @@
+"""
+命令行命令测试
+"""
+import json
+import os
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from app.crud.loan_crud import create_loan_application
+from app.models.uploaded_file import UploadedFile
+from app.models.user import EnterpriseLoanInfo, User
+from app.services.loan_service import LoanService
+
+
+class TestMigrateLayout:
+    """测试上传文件目录迁移命令"""
+    
+    def test_migrate_legacy_files(self, app, db, runner, sample_loan_data, tmp_path, monkeypatch):
+        """测试旧版平铺文件迁移并更新申请记录路径"""
+        monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+        legacy_path = tmp_path / '20260129175956_appLayout.pdf'
+        legacy_path.write_bytes(b'%PDF-1.4 legacy')
+        duplicate_path = tmp_path / '20260129181023_appLayout.pdf'
+        duplicate_path.write_bytes(b'%PDF-1.4 legacy')
+        
+        loan = EnterpriseLoanInfo(
+            **sample_loan_data,
+            prop_proof_docs=str(legacy_path).replace('\\', '/'),
+            prop_proof_docs_name='appLayout.pdf'
+        )
+        db.session.add(loan)
+        db.session.commit()
+        
+        result = runner.invoke(args=['uploads', 'migrate-layout'])
+        
+        assert result.exit_code == 0
+        assert not legacy_path.exists()
+        assert not duplicate_path.exists()
+        db.session.refresh(loan)
+        assert '/files/2026/01/29/' in loan.prop_proof_docs
+        assert os.path.exists(loan.prop_proof_docs)
+        assert len([p for p in (tmp_path / 'blobs').rglob('*') if p.is_file()]) == 1
+    
+    def test_migrate_dry_run(self, app, db, runner, tmp_path, monkeypatch):
+        """测试只列出待迁移文件"""
+        monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+        legacy_path = tmp_path / '20260129175956_demo.pdf'
+        legacy_path.write_bytes(b'%PDF-1.4 demo')
+        
+        result = runner.invoke(args=['uploads', 'migrate-layout', '--dry-run'])
+        
+        assert result.exit_code == 0
+        assert legacy_path.exists()
+
+
+class TestUploadGc:
+    """测试未引用上传文件清理命令"""
+    
+    def test_gc_removes_expired_unclaimed_files(self, app, db, runner, sample_loan_data, tmp_path, monkeypatch):
+        """测试超期未引用的文件被删除，已引用的文件保留"""
+        monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+        orphan = LoanService.upload_file_only(
+            FileStorage(stream=BytesIO(b'%PDF-1.4 orphan'), filename='orphan.pdf'), 1
+        )
+        claimed = LoanService.upload_file_only(
+            FileStorage(stream=BytesIO(b'%PDF-1.4 claimed'), filename='claimed.pdf'), 1
+        )
+        create_loan_application({
+            **sample_loan_data,
+            'prop_proof_docs': claimed['file_path'],
+            'prop_proof_docs_name': 'claimed.pdf'
+        })
+        UploadedFile.query.update({'created_at': datetime.now() - timedelta(days=2)})
+        db.session.commit()
+        
+        result = runner.invoke(args=['uploads', 'gc'])
+        
+        assert result.exit_code == 0
+        assert not os.path.exists(orphan['file_path'])
+        assert os.path.exists(claimed['file_path'])
+        assert not (tmp_path / 'blobs' / orphan['file_hash'][:2] / orphan['file_hash'][2:4] / orphan['file_hash']).exists()
+        assert [record.status for record in UploadedFile.query.all()] == [UploadedFile.STATUS_CLAIMED]
+    
+    def test_gc_keeps_recent_files(self, app, db, runner, tmp_path, monkeypatch):
+        """测试保留期内的文件不被删除"""
+        monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+        pending = LoanService.upload_file_only(
+            FileStorage(stream=BytesIO(b'%PDF-1.4 pending'), filename='pending.pdf'), 1
+        )
+        
+        result = runner.invoke(args=['uploads', 'gc'])
+        
+        assert result.exit_code == 0
+        assert os.path.exists(pending['file_path'])
+
+
+class TestLoanImportCommand:
+    """测试批量导入命令"""
+    
+    def test_import_ndjson_file(self, app, db, runner, sample_loan_data, tmp_path):
+        """测试从NDJSON文件导入"""
+        import json
+        
+        source = tmp_path / 'applications.ndjson'
+        source.write_text(
+            '\n'.join(json.dumps(sample_loan_data) for _ in range(3)),
+            encoding='utf-8'
+        )
+        
+        result = runner.invoke(args=['loans', 'import', str(source)])
+        
+        assert result.exit_code == 0
+        assert EnterpriseLoanInfo.query.count() == 3
+
+
+    
+    def test_reindex_search(self, app, db, runner, sample_loan_data):
+        """测试重建企业名称搜索索引"""
+        from app.models.loan_name_gram import LoanNameGram
+        
+        create_loan_application(sample_loan_data)
+        LoanNameGram.query.delete()
+        db.session.commit()
+        
+        result = runner.invoke(args=['loans', 'reindex'])
+        
+        assert result.exit_code == 0
+        assert LoanNameGram.query.count() > 0
+    
+    def test_reindex_keeps_existing_index(self, app, db, runner, sample_loan_data):
+        """测试重建索引不清空已有索引，并删除已删除申请的索引行"""
+        from app.models.loan_name_gram import LoanNameGram
+        
+        kept = create_loan_application(dict(sample_loan_data))
+        removed = create_loan_application(dict(sample_loan_data, ent_name='即将删除的企业'))
+        kept_grams = LoanNameGram.query.filter_by(loan_id=kept.id).count()
+        removed_id = removed.id
+        db.session.delete(removed)
+        db.session.commit()
+        
+        result = runner.invoke(args=['loans', 'reindex'])
+        
+        assert result.exit_code == 0
+        assert LoanNameGram.query.filter_by(loan_id=kept.id).count() == kept_grams
+        assert LoanNameGram.query.filter_by(loan_id=removed_id).count() == 0
+
+    
+    def test_export_gzip_file(self, app, db, runner, sample_loan_data, tmp_path):
+        """测试导出为gzip压缩的CSV文件"""
+        import csv
+        import gzip
+        
+        create_loan_application(sample_loan_data)
+        output = tmp_path / 'applications.csv.gz'
+        
+        result = runner.invoke(args=['loans', 'export', str(output)])
+        
+        assert result.exit_code == 0
+        with gzip.open(output, 'rt', encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 1
+        assert rows[0]['uscc'] == sample_loan_data['uscc']
+
+    
+    def test_rebuild_stats(self, app, db, runner, sample_loan_data):
+        """测试从申请明细重建汇总统计"""
+        from app.models.loan_rollup import LoanPortfolioRollup
+        
+        create_loan_application(sample_loan_data)
+        create_loan_application(sample_loan_data)
+        LoanPortfolioRollup.query.delete()
+        db.session.commit()
+        
+        result = runner.invoke(args=['loans', 'rebuild-stats'])
+        
+        assert result.exit_code == 0
+        rollup = LoanPortfolioRollup.query.one()
+        assert rollup.app_count == 2
+    
+    def test_rebuild_stats_skips_null_created_at(self, app, db, runner, sample_loan_data):
+        """测试提交时间为空的早期数据不计入汇总，不影响重建"""
+        from app.models.loan_rollup import LoanPortfolioRollup
+        
+        create_loan_application(sample_loan_data)
+        legacy = create_loan_application(sample_loan_data)
+        legacy.created_at = None
+        db.session.commit()
+        
+        result = runner.invoke(args=['loans', 'rebuild-stats'])
+        
+        assert result.exit_code == 0
+        assert LoanPortfolioRollup.query.one().app_count == 1
+
+
+
+class TestSeedCommand:
+    """测试合成数据生成命令"""
+    
+    SEED_ARGS = ['loans', 'seed', '--count', '30', '--users', '3', '--seed', '7', '--end', '2026-01-01']
+    
+    def test_seed_valid_and_reproducible(self, app, db, runner):
+        """测试生成的申请通过校验，相同种子生成相同数据并复用用户"""
+        from app.models.user import User
+        from app.services.seed_service import uscc_check_char
+        from app.services.validation_service import validate_loan_data
+        
+        assert uscc_check_char('91350100M000100Y4') == '3'
+        
+        result = runner.invoke(args=self.SEED_ARGS)
+        assert result.exit_code == 0
+        result = runner.invoke(args=self.SEED_ARGS + ['--batch-size', '7'])
+        assert result.exit_code == 0
+        
+        assert User.query.filter(User.user_name.like('seed_user_%')).count() == 3
+        loans = EnterpriseLoanInfo.query.order_by(EnterpriseLoanInfo.id).all()
+        assert len(loans) == 60
+        for loan in loans[:30]:
+            data = {column: getattr(loan, column) for column in (
+                'ent_name', 'uscc', 'company_email', 'company_address', 'repay_account_bank',
+                'repay_account_no', 'loan_term', 'loan_purpose', 'prop_proof_type', 'industry_category'
+            )}
+            _, errors = validate_loan_data(dict(
+                data,
+                loan_amount=float(loan.loan_amount),
+                prop_proof_docs='seed.pdf',
+                prop_proof_docs_name='seed.pdf'
+            ))
+            assert not errors
+            assert loan.uscc[-1] == uscc_check_char(loan.uscc[:17])
+            assert datetime(2025, 1, 1) <= loan.created_at < datetime(2026, 1, 1)
+        
+        def snapshot(loan):
+            return loan.uscc, loan.ent_name, loan.loan_term, loan.created_at, loan.user_id
+        
+        assert [snapshot(loan) for loan in loans[:30]] == [snapshot(loan) for loan in loans[30:]]
+    
+    def test_seed_sparse_files(self, app, db, runner, tmp_path, monkeypatch):
+        """测试为每条申请创建稀疏财产证明文件"""
+        monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+        
+        result = runner.invoke(args=self.SEED_ARGS + ['--file-size-kb', '256'])
+        
+        assert result.exit_code == 0
+        loans = EnterpriseLoanInfo.query.all()
+        assert len(loans) == 30
+        for loan in loans:
+            assert loan.prop_proof_docs.startswith(str(tmp_path).replace('\\', '/') + '/files/')
+            assert os.path.getsize(loan.prop_proof_docs) == 256 * 1024
+            with open(loan.prop_proof_docs, 'rb') as f:
+                assert f.read(8) == b'%PDF-1.4'
+
+
+class TestSetUserType:
+    """测试设置用户类型命令"""
+    
+    def _login(self, client, user_name):
+        response = client.post(
+            '/api/auth/login',
+            data=json.dumps({'user_name': user_name, 'password': 'Test1234'}),
+            content_type='application/json'
+        )
+        return response.get_json()['data']
+    
+    def test_set_admin_enables_import(self, app, db, client, runner, enterprise_user):
+        """测试分配 ADMIN 后重新登录即可批量导入（默认 LOAN_IMPORT_USER_TYPES）"""
+        assert app.config['LOAN_IMPORT_USER_TYPES'] == {'ADMIN'}
+        
+        result = runner.invoke(args=['auth', 'set-user-type', 'enterprise_test', 'admin'])
+        
+        assert result.exit_code == 0
+        assert db.session.get(User, enterprise_user.id).user_type == 'ADMIN'
+        
+        login = self._login(client, 'enterprise_test')
+        assert login['user']['user_type'] == 'ADMIN'
+        response = client.post(
+            '/api/loan/import?format=ndjson',
+            data=b'',
+            headers={'Authorization': f"Bearer {login['access_token']}"},
+            content_type='application/x-ndjson'
+        )
+        assert response.get_json()['code'] != 10003
+    
+    def test_set_admin_enables_review(self, app, db, client, runner, enterprise_user):
+        """测试分配 ADMIN 后重新登录即可查看汇总统计（默认 LOAN_REVIEWER_USER_TYPES）"""
+        assert app.config['LOAN_REVIEWER_USER_TYPES'] == {'ADMIN'}
+        login = self._login(client, 'enterprise_test')
+        response = client.get(
+            '/api/loan/stats',
+            headers={'Authorization': f"Bearer {login['access_token']}"}
+        )
+        assert response.get_json()['code'] == 10003
+        
+        runner.invoke(args=['auth', 'set-user-type', 'enterprise_test', 'ADMIN'])
+        login = self._login(client, 'enterprise_test')
+        response = client.get(
+            '/api/loan/stats',
+            headers={'Authorization': f"Bearer {login['access_token']}"}
+        )
+        
+        assert response.get_json()['code'] == 0
+    
+    def test_unknown_user(self, app, db, runner):
+        """测试用户不存在"""
+        result = runner.invoke(args=['auth', 'set-user-type', 'nobody', 'ADMIN'])
+        
+        assert result.exit_code != 0
+        assert '用户不存在' in result.output
+    
+    def test_invalid_type(self, app, db, runner, enterprise_user):
+        """测试不支持的用户类型"""
+        result = runner.invoke(args=['auth', 'set-user-type', 'enterprise_test', 'ROOT'])
+        
+        assert result.exit_code != 0
+        assert db.session.get(User, enterprise_user.id).user_type == 'ENTERPRISE'
+
+
+class TestSchemaUpgrade:
+    """测试数据库结构升级命令"""
+    
+    def test_upgrade_adds_missing_column_and_indexes(self, app, db, runner):
+        """测试为已有表补充新增的列（含外键）和复合索引"""
+        from sqlalchemy import inspect, text
+        
+        # 模拟旧版本的表：没有 user_id 列，也没有复合索引
+        columns = ', '.join(
+            column.name for column in EnterpriseLoanInfo.__table__.columns if column.name != 'user_id'
+        )
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                f'CREATE TABLE legacy_loan_info AS SELECT {columns} FROM enterprise_loan_info'
+            ))
+            connection.execute(text('DROP TABLE enterprise_loan_info'))
+            connection.execute(text('ALTER TABLE legacy_loan_info RENAME TO enterprise_loan_info'))
+        
+        result = runner.invoke(args=['schema', 'upgrade'])
+        
+        assert result.exit_code == 0
+        inspector = inspect(db.engine)
+        assert 'user_id' in {column['name'] for column in inspector.get_columns('enterprise_loan_info')}
+        assert 'ix_enterprise_loan_info_user_created_at_id' in {
+            index['name'] for index in inspector.get_indexes('enterprise_loan_info')
+        }
+        assert [
+            (foreign_key['constrained_columns'], foreign_key['referred_table'])
+            for foreign_key in inspector.get_foreign_keys('enterprise_loan_info')
+        ] == [(['user_id'], 'user')]
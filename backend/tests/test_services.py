@@ -31,7 +31,7 @@ class TestAuthService:
         
         login_data = UserLoginSchema(
             user_name=enterprise_user.user_name,
-            password='WrongPassword'
+            password='Wrong123'
         )
         
         with pytest.raises(UnauthorizedException):
@@ -49,6 +49,45 @@ class TestAuthService:
         with pytest.raises(UnauthorizedException):
             AuthService.login_user(login_data)
     
+    def test_login_user_rehash_outdated_password(self, app, db):
+        """测试登录成功时按新工作因子重新哈希密码"""
+        from app.schemas.user_schema import UserLoginSchema
+        from app.utils.password_utils import get_hash_rounds, hash_password
+        
+        user = User(user_name='rehash_test', user_type='ENTERPRISE')
+        user.password = hash_password('Test1234', rounds=4)
+        db.session.add(user)
+        db.session.commit()
+        app.extensions['bcrypt_rounds'] = 5
+        
+        AuthService.login_user(UserLoginSchema(user_name='rehash_test', password='Test1234'))
+        
+        assert get_hash_rounds(user.password) == 5
+    
+    def test_login_error_refunds_throttle(self, app, db, enterprise_user, monkeypatch):
+        """测试密码线程池拒绝等非认证失败的错误退还限流额度"""
+        from app.crud.user_crud import UserCrud
+        from app.schemas.user_schema import UserLoginSchema
+        from app.utils.exceptions import TooManyRequestsException
+        from app.utils.rate_limiter import get_login_throttle
+        
+        monkeypatch.setitem(app.config, 'LOGIN_THROTTLE_ENABLED', True)
+        monkeypatch.setitem(app.config, 'LOGIN_THROTTLE_USER_CAPACITY', 1)
+        monkeypatch.delitem(app.extensions, 'login_throttle', raising=False)
+        
+        def rejected(user_name, password):
+            raise TooManyRequestsException('密码校验繁忙')
+        
+        login_data = UserLoginSchema(user_name=enterprise_user.user_name, password='Test1234')
+        with monkeypatch.context() as patch:
+            patch.setattr(UserCrud, 'authenticate_user', staticmethod(rejected))
+            for _ in range(3):
+                with pytest.raises(TooManyRequestsException, match='密码校验繁忙'):
+                    AuthService.login_user(login_data, client_ip='10.0.0.1')
+        
+        assert AuthService.login_user(login_data, client_ip='10.0.0.1')['user'].id == enterprise_user.id
+        app.extensions.pop('login_throttle', None)
+    
     def test_get_current_user_info(self, db, enterprise_user):
         """测试获取当前用户信息"""
         user = AuthService.get_current_user_info(enterprise_user.id)
@@ -60,10 +99,59 @@ class TestAuthService:
             AuthService.get_current_user_info(99999)
 
 
+class TestUserCache:
+    """测试用户信息缓存"""
+    
+    def test_get_user_by_id_cached(self, app, db, enterprise_user):
+        """测试重复获取用户命中缓存"""
+        from app.crud.user_crud import UserCrud
+        
+        app.extensions.pop('user_cache', None)
+        UserCrud.get_user_by_id(enterprise_user.id)
+        user = UserCrud.get_user_by_id(enterprise_user.id)
+        
+        assert user.user_name == enterprise_user.user_name
+        assert app.extensions['user_cache'].stats()['hits'] == 1
+    
+    def test_invalidate_on_update(self, app, db, enterprise_user):
+        """测试用户信息更新后缓存失效"""
+        from app.crud.user_crud import UserCrud
+        
+        user_name = enterprise_user.user_name
+        user = UserCrud.get_user_by_username(user_name)
+        user.user_type = 'INDIVIDUAL'
+        db.session.commit()
+        db.session.expunge_all()
+        
+        assert UserCrud.get_user_by_username(user_name).user_type == 'INDIVIDUAL'
+    
+    def test_password_not_cached(self, app, db, enterprise_user):
+        """测试缓存不保存密码哈希，登录校验读取数据库中的最新密码"""
+        from app.crud.user_crud import UserCrud
+        
+        app.extensions.pop('user_cache', None)
+        user_name = enterprise_user.user_name
+        UserCrud.get_user_by_username(user_name)
+        cached = app.extensions['user_cache'].get(('name', user_name))
+        assert 'password' not in cached.__dict__
+        
+        # 模拟其他进程修改密码（不经过本进程的缓存失效）
+        from app.utils.password_utils import hash_password
+        db.session.execute(
+            User.__table__.update()
+            .where(User.__table__.c.user_name == user_name)
+            .values(password=hash_password('New12345'))
+        )
+        db.session.commit()
+        
+        assert UserCrud.authenticate_user(user_name, 'Test1234') is None
+        assert UserCrud.authenticate_user(user_name, 'New12345') is not None
+
+
 class TestLoanService:
     """测试贷款服务"""
     
-    def test_upload_file_only(self, app, mock_file):
+    def test_upload_file_only(self, app, db, mock_file):
         """测试文件上传"""
         with app.app_context():
             result = LoanService.upload_file_only(mock_file)
@@ -72,6 +160,44 @@ class TestLoanService:
             assert 'file_path' in result
             assert 'file_name' in result
     
+    def test_upload_file_hash_and_size(self, app, db):
+        """测试上传文件时计算哈希与大小"""
+        import hashlib
+        from io import BytesIO
+        from werkzeug.datastructures import FileStorage
+        
+        content = b'%PDF-1.4 ' + b'x' * (200 * 1024)
+        file = FileStorage(stream=BytesIO(content), filename='large.pdf')
+        
+        with app.app_context():
+            result = LoanService.upload_file_only(file)
+            
+            assert result['file_size'] == len(content)
+            assert result['file_hash'] == hashlib.sha256(content).hexdigest()
+            assert result['file_type'] == 'application/pdf'
+            with open(result['file_path'], 'rb') as f:
+                assert f.read() == content
+    
+    def test_upload_duplicate_content(self, app, db):
+        """测试重复内容只保存一份"""
+        import os
+        from io import BytesIO
+        from werkzeug.datastructures import FileStorage
+        
+        content = b'%PDF-1.4 duplicate content'
+        
+        with app.app_context():
+            first = LoanService.upload_file_only(
+                FileStorage(stream=BytesIO(content), filename='first.pdf')
+            )
+            second = LoanService.upload_file_only(
+                FileStorage(stream=BytesIO(content), filename='second.pdf')
+            )
+            
+            assert second['deduplicated'] is True
+            assert first['file_hash'] == second['file_hash']
+            assert os.path.samefile(first['file_path'], second['file_path'])
+    
     def test_upload_file_none(self, app):
         """测试上传空文件"""
         with app.app_context():
@@ -95,4 +221,55 @@ class TestLoanService:
         """测试获取图表数据"""
         with app.app_context():
             data = LoanService.get_chart_data()
-            assert isinstance(data, list)
\ No newline at end of file
+            assert isinstance(data, list)
+    
+    def test_bulk_insert_without_returning(self, app, db, sample_loan_data, monkeypatch):
+        """测试不支持 executemany RETURNING 的数据库（MySQL）按ID范围查出新行写索引"""
+        from app.crud.loan_crud import bulk_insert_loan_applications, create_loan_application
+        from app.crud.search_crud import search_by_name_grams
+        from app.models.loan_name_gram import LoanNameGram
+        from app.utils.ngram import text_grams
+        
+        existing = create_loan_application(dict(sample_loan_data))
+        existing_grams = LoanNameGram.query.filter_by(loan_id=existing.id).count()
+        monkeypatch.setattr(db.engine.dialect, 'insert_executemany_returning_sort_by_parameter_order', False)
+        
+        inserted = bulk_insert_loan_applications([
+            dict(sample_loan_data, ent_name=f'批量插入测试企业{index}') for index in range(3)
+        ])
+        
+        assert inserted == 3
+        assert LoanNameGram.query.filter_by(loan_id=existing.id).count() == existing_grams
+        grams = text_grams('批量插入测试企业2')
+        assert len(search_by_name_grams(grams, len(grams), 10)) == 1
+
+
+class TestLoanRules:
+    """测试业务规则加载"""
+    
+    def test_rules_reload_from_file(self, app, tmp_path, monkeypatch):
+        """测试规则文件修改后自动重新加载"""
+        import json
+        import os
+        from types import SimpleNamespace
+        from app.services.validation_service import validate_business_rules
+        
+        rules_file = tmp_path / 'loan-rules.json'
+        rules_file.write_text(json.dumps({'rules': [
+            {'id': 'tax-term', 'loan_purpose': 'tax', 'field': 'loan_term', 'require': {'max': 2}, 'msg': '税贷期限不能超过2年'}
+        ]}), encoding='utf-8')
+        monkeypatch.setitem(app.config, 'LOAN_RULES_FILE', str(rules_file))
+        monkeypatch.delitem(app.extensions, 'loan_rules', raising=False)
+        loan = SimpleNamespace(loan_purpose='tax', loan_term='3')
+        
+        with app.app_context():
+            assert len(validate_business_rules(loan)) == 1
+            
+            rules_file.write_text(json.dumps({'rules': [
+                {'id': 'tax-term', 'loan_purpose': 'tax', 'field': 'loan_term', 'require': {'max': 5}, 'msg': '税贷期限不能超过5年'}
+            ]}), encoding='utf-8')
+            stat = os.stat(rules_file)
+            os.utime(rules_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+            
+            assert validate_business_rules(loan) == []
+
@@ -4,12 +4,46 @@
 import pytest
 import jwt
 from datetime import datetime, timedelta
-from app.utils.jwt_utils import create_access_token, decode_token, generate_token
+from decimal import Decimal
+from app.utils.jwt_utils import (
+    create_access_token,
+    decode_token,
+    verify_token,
+    invalidate_token,
+    get_token_cache
+)
 from app.utils.response import ApiResponse
+from app.utils.file_cache import JsonFileCache
+from app.utils.cache import LRUCache
+from app.utils.rate_limiter import MemoryBucketBackend, LoginThrottle
+from app.utils.upload_utils import (
+    detect_file_type,
+    write_temp_file,
+    commit_temp_file,
+    generate_ulid,
+    safe_filename
+)
+from app.utils.upload_validation import UploadValidator
+from app.utils.receipt_utils import sign_receipt, verify_receipt
+from app.utils.rule_engine import compile_rules
+from app.utils.ngram import query_grams, text_grams
+from app.utils.timing import SlowestProfiles, phase, server_timing_header
+from benchmarks.stats import compare, percentile, summarize
+from app.utils.json_provider import OrjsonProvider, StdlibJSONProvider, orjson
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.exceptions import FileValidationException
+from app.utils.password_utils import (
+    BoundedExecutor,
+    calibrate_bcrypt_rounds,
+    get_hash_rounds,
+    hash_password,
+    needs_rehash
+)
 from app.utils.exceptions import (
     UnauthorizedException,
     BadRequestException,
-    ForbiddenException
+    ForbiddenException,
+    TooManyRequestsException
 )
 
 
@@ -49,59 +83,141 @@ class TestJWTUtils:
             with pytest.raises(Exception):
                 decode_token('invalid_token')
     
-    def test_generate_token(self, app):
-        """测试生成令牌"""
+    def test_verify_token_cached(self, app):
+        """测试重复验证同一Token命中缓存"""
         with app.app_context():
-            token = generate_token(1, 'ENTERPRISE')
-            assert token is not None
+            token = create_access_token(
+                user_id=1,
+                username='testuser',
+                user_type='ENTERPRISE'
+            )
+            get_token_cache().clear()
+            hits = get_token_cache().stats()['hits']
+            
+            assert verify_token(token)['user_id'] == 1
+            assert verify_token(token)['user_id'] == 1
+            assert get_token_cache().stats()['hits'] == hits + 1
+    
+    def test_invalidate_token(self, app):
+        """测试从缓存中移除Token"""
+        with app.app_context():
+            token = create_access_token(
+                user_id=1,
+                username='testuser',
+                user_type='ENTERPRISE'
+            )
+            verify_token(token)
+            
+            assert invalidate_token(token) is True
+            assert invalidate_token(token) is False
 
 
 class TestApiResponse:
     """测试API响应工具"""
     
-    def test_success_response(self):
+    def test_success_response(self, app):
         """测试成功响应"""
-        response = ApiResponse.success(data={'key': 'value'}, msg='成功')
+        with app.app_context():
+            response, status = ApiResponse.success(data={'key': 'value'}, msg='成功')
         json_data = response.get_json()
         
+        assert status == 200
         assert json_data['code'] == 0
         assert json_data['msg'] == '成功'
         assert json_data['data']['key'] == 'value'
     
-    def test_error_response(self):
+    def test_error_response(self, app):
         """测试错误响应"""
-        response = ApiResponse.error(msg='错误信息')
+        with app.app_context():
+            response, status = ApiResponse.error(msg='错误信息')
         json_data = response.get_json()
         
+        assert status == 200
         assert json_data['code'] != 0
         assert json_data['msg'] == '错误信息'
     
-    def test_validation_error(self):
+    def test_validation_error(self, app):
         """测试验证错误响应"""
         errors = [{'field': 'name', 'msg': '不能为空'}]
-        response = ApiResponse.validation_error('验证失败', errors)
+        with app.app_context():
+            response, status = ApiResponse.validation_error('验证失败', errors)
         json_data = response.get_json()
         
+        assert status == 200
         assert json_data['code'] != 0
         assert 'errors' in json_data['data']
     
-    def test_auth_error(self):
+    def test_auth_error(self, app):
         """测试认证错误响应"""
-        response = ApiResponse.auth_error('未授权')
+        with app.app_context():
+            response, status = ApiResponse.auth_error('未授权')
         json_data = response.get_json()
         
+        assert status == 200
         assert json_data['code'] != 0
         assert '未授权' in json_data['msg']
     
-    def test_server_error(self):
+    def test_server_error(self, app):
         """测试服务器错误响应"""
-        response = ApiResponse.server_error('服务器错误')
+        with app.app_context():
+            response, status = ApiResponse.server_error('服务器错误')
         json_data = response.get_json()
         
+        assert status == 200
         assert json_data['code'] != 0
         assert '服务器错误' in json_data['msg']
 
 
+class TestJsonProvider:
+    """测试JSON序列化提供者"""
+
+    PAYLOAD = {
+        'name': '测试企业',
+        'amount': Decimal('1000.50'),
+        'created_at': datetime(2024, 1, 2, 3, 4, 5),
+        1: 'int key',
+    }
+
+    def _providers(self, app):
+        providers = [StdlibJSONProvider(app)]
+        if orjson is not None:
+            providers.append(OrjsonProvider(app))
+        return providers
+
+    def test_same_output_for_all_providers(self, app):
+        """测试各实现对中文、Decimal、datetime 和整数键的输出一致"""
+        outputs = {provider.dumps_bytes(self.PAYLOAD) for provider in self._providers(app)}
+
+        assert len(outputs) == 1
+        assert outputs.pop().decode('utf-8') == (
+            '{"name":"测试企业","amount":1000.5,"created_at":"2024-01-02T03:04:05","1":"int key"}'
+        )
+
+    def test_validation_error_context(self, app):
+        """测试 Pydantic 校验错误中的异常对象输出为异常信息"""
+        errors = [{'loc': ('password',), 'ctx': {'error': ValueError('密码长度必须为8位')}}]
+        outputs = {provider.dumps_bytes(errors) for provider in self._providers(app)}
+
+        assert outputs == {'[{"loc":["password"],"ctx":{"error":"密码长度必须为8位"}}]'.encode('utf-8')}
+
+    def test_success_model(self, app):
+        """测试 Pydantic 模型直接序列化为响应体"""
+        from pydantic import BaseModel
+
+        class Item(BaseModel):
+            name: str
+            amount: float
+
+        with app.test_request_context():
+            response, status = ApiResponse.success_model({'item': Item(name='测试', amount=1.5)})
+
+        assert status == 200
+        assert response.headers['Content-Type'] == 'application/json; charset=utf-8'
+        json_data = response.get_json()
+        assert json_data['code'] == 0
+        assert json_data['data'] == {'item': {'name': '测试', 'amount': 1.5}}
+
+
 class TestExceptions:
     """测试自定义异常"""
     
@@ -124,4 +240,416 @@ class TestExceptions:
         with pytest.raises(ForbiddenException) as exc_info:
             raise ForbiddenException('禁止访问')
         
-        assert '禁止' in str(exc_info.value)
\ No newline at end of file
+        assert '禁止' in str(exc_info.value)
+
+
+class TestJsonFileCache:
+    """测试JSON文件缓存"""
+
+    def test_cache_hit(self, tmp_path):
+        """测试文件未变化时命中缓存"""
+        file_path = tmp_path / 'data.json'
+        file_path.write_text('{"a": 1}', encoding='utf-8')
+        cache = JsonFileCache(str(file_path))
+
+        assert cache.get() == {'a': 1}
+        assert cache.get() == {'a': 1}
+        stats = cache.stats()
+        assert stats['misses'] == 1
+        assert stats['hits'] == 1
+
+    def test_reload_on_change(self, tmp_path):
+        """测试文件变化后重新加载"""
+        file_path = tmp_path / 'data.json'
+        file_path.write_text('{"a": 1}', encoding='utf-8')
+        cache = JsonFileCache(str(file_path))
+        cache.get()
+
+        file_path.write_text('{"a": 22}', encoding='utf-8')
+
+        assert cache.get() == {'a': 22}
+        assert cache.stats()['reloads'] == 1
+
+    def test_keep_last_good_on_parse_error(self, tmp_path):
+        """测试新文件解析失败时保留上一版本数据"""
+        file_path = tmp_path / 'data.json'
+        file_path.write_text('{"a": 1}', encoding='utf-8')
+        cache = JsonFileCache(str(file_path))
+        cache.get()
+
+        file_path.write_text('{broken json', encoding='utf-8')
+
+        assert cache.get() == {'a': 1}
+        assert cache.stats()['errors'] == 1
+
+    def test_missing_file(self, tmp_path):
+        """测试文件不存在时返回默认值"""
+        cache = JsonFileCache(str(tmp_path / 'missing.json'), default=[])
+        assert cache.get() == []
+
+
+
+class TestLRUCache:
+    """测试LRU缓存"""
+
+    def test_evict_least_recently_used(self):
+        """测试超过容量时淘汰最久未使用的条目"""
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.stats()['evictions'] == 1
+
+    def test_expire_entry(self):
+        """测试条目到期后移除"""
+        now = [100.0]
+        cache = LRUCache(max_size=10, clock=lambda: now[0])
+        cache.set('a', 1, expires_at=101)
+
+        assert cache.get('a') == 1
+        now[0] = 101.0
+        assert cache.get('a') is None
+        assert cache.stats()['expirations'] == 1
+
+
+
+class TestBoundedExecutor:
+    """测试有界线程池"""
+
+    def test_submit(self):
+        """测试提交任务"""
+        executor = BoundedExecutor(max_workers=1, max_queue=1)
+        assert executor.submit(lambda x: x + 1, 1).result() == 2
+        executor.shutdown()
+
+    def test_reject_when_full(self):
+        """测试排队已满时立即拒绝"""
+        import threading
+
+        release = threading.Event()
+        executor = BoundedExecutor(max_workers=1, max_queue=1)
+        futures = [executor.submit(release.wait) for _ in range(2)]
+
+        with pytest.raises(TooManyRequestsException):
+            executor.submit(release.wait)
+
+        release.set()
+        for future in futures:
+            future.result()
+        stats = executor.stats()
+        assert stats['rejected'] == 1
+        assert stats['completed'] == 2
+        executor.shutdown()
+
+
+
+class TestPasswordHashing:
+    """测试密码哈希工作因子"""
+
+    def test_hash_password_rounds(self):
+        """测试按指定工作因子生成哈希"""
+        password_hash = hash_password('Test1234', rounds=4)
+        assert get_hash_rounds(password_hash) == 4
+
+    def test_needs_rehash(self, app):
+        """测试工作因子低于配置时需要重新哈希，高于配置时不降级"""
+        with app.app_context():
+            app.extensions['bcrypt_rounds'] = 5
+            assert needs_rehash(hash_password('Test1234', rounds=4)) is True
+            assert needs_rehash(hash_password('Test1234', rounds=5)) is False
+            assert needs_rehash(hash_password('Test1234', rounds=6)) is False
+
+    def test_calibrate_bcrypt_rounds(self):
+        """测试校准结果在上下限范围内"""
+        rounds, estimated_ms = calibrate_bcrypt_rounds(50, min_rounds=4, max_rounds=8, samples=1)
+        assert 4 <= rounds <= 8
+        assert estimated_ms > 0
+
+
+
+class TestLoginThrottle:
+    """测试登录失败限流"""
+
+    def _make_throttle(self):
+        return LoginThrottle(
+            MemoryBucketBackend(),
+            user_capacity=2,
+            user_refill_seconds=60,
+            ip_capacity=10,
+            ip_refill_seconds=60
+        )
+
+    def test_reject_after_failures(self):
+        """测试连续失败超过额度后拒绝"""
+        throttle = self._make_throttle()
+        throttle.acquire('alice', '10.0.0.1')
+        throttle.acquire('alice', '10.0.0.1')
+
+        with pytest.raises(TooManyRequestsException):
+            throttle.acquire('alice', '10.0.0.1')
+        # 其他用户不受影响
+        throttle.acquire('bob', '10.0.0.1')
+
+    def test_success_does_not_consume(self):
+        """测试登录成功后退还额度"""
+        throttle = self._make_throttle()
+        for _ in range(5):
+            throttle.acquire('alice', '10.0.0.1')
+            throttle.release('alice', '10.0.0.1')
+
+        throttle.acquire('alice', '10.0.0.1')
+
+
+
+class TestUploadUtils:
+    """测试文件上传工具"""
+
+    def test_detect_file_type(self):
+        """测试根据魔数识别文件类型"""
+        assert detect_file_type(b'%PDF-1.7') == 'application/pdf'
+        assert detect_file_type(b'\x89PNG\r\n\x1a\n....') == 'image/png'
+        assert detect_file_type(b'PK\x03\x04') == 'application/zip'
+        assert detect_file_type(b'hello') is None
+
+    def test_generate_ulid(self):
+        """测试生成按时间排序的唯一ID"""
+        earlier = generate_ulid(1700000000)
+        later = generate_ulid(1700000001)
+
+        assert len(earlier) == 26
+        assert earlier < later
+        assert generate_ulid() != generate_ulid()
+
+    def test_safe_filename(self):
+        """测试清理文件名"""
+        assert safe_filename('../../etc/passwd') == 'passwd'
+        assert safe_filename('C:\\docs\\报告.pdf') == '报告.pdf'
+        assert safe_filename('') == 'file'
+
+    def test_write_and_commit(self, tmp_path):
+        """测试分块写入后原子重命名"""
+        from io import BytesIO
+
+        written = write_temp_file(BytesIO(b'a' * 10), str(tmp_path), chunk_size=3)
+        final_path = str(tmp_path / 'final.bin')
+        commit_temp_file(written['temp_path'], final_path)
+
+        assert written['size'] == 10
+        assert (tmp_path / 'final.bin').read_bytes() == b'a' * 10
+        assert [p.name for p in tmp_path.iterdir()] == ['final.bin']
+
+
+class TestUploadValidator:
+    """测试上传文件校验"""
+
+    def _validator(self):
+        return UploadValidator({'pdf', 'png'}, max_size_by_type={'png': 100}, max_size=1000)
+
+    def test_check_name(self):
+        """测试扩展名白名单与声明类型"""
+        validator = self._validator()
+
+        assert validator.check_name('报告.PDF', 'application/pdf') == 'pdf'
+        assert validator.check_name('scan.png', 'application/octet-stream') == 'png'
+        with pytest.raises(FileValidationException):
+            validator.check_name('setup.exe')
+        with pytest.raises(FileValidationException):
+            validator.check_name('report.pdf', 'image/png')
+
+    def test_check_head_on_first_chunk(self):
+        """测试收到文件头后立即校验内容"""
+        check = self._validator().start('report.pdf')
+
+        with pytest.raises(FileValidationException):
+            check.feed(b'MZ\x90\x00\x03\x00\x00\x00')
+
+    def test_size_limit_by_type(self):
+        """测试按类型限制大小"""
+        check = self._validator().start('scan.png')
+        check.feed(b'\x89PNG\r\n\x1a\n' + b'x' * 50)
+
+        with pytest.raises(FileValidationException):
+            check.feed(b'x' * 50)
+
+    def test_write_temp_file_rejects_early(self, tmp_path):
+        """测试写入临时文件时校验失败会删除临时文件"""
+        from io import BytesIO
+
+        check = self._validator().start('report.pdf')
+        with pytest.raises(FileValidationException):
+            write_temp_file(BytesIO(b'GIF89a' + b'x' * 100), str(tmp_path), chunk_size=16, check=check)
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestReceiptUtils:
+    """测试签名回执"""
+
+    def test_verify_receipt(self, app):
+        """测试回执与摘要、用户、用途绑定"""
+        with app.app_context():
+            receipt = sign_receipt('loan-validation', 'digest', 1, ttl=60)
+
+            assert verify_receipt('loan-validation', receipt, 'digest', 1)
+            assert not verify_receipt('loan-validation', receipt, 'other-digest', 1)
+            assert not verify_receipt('loan-validation', receipt, 'digest', 2)
+            assert not verify_receipt('other-purpose', receipt, 'digest', 1)
+            assert not verify_receipt('loan-validation', 'garbage', 'digest', 1)
+
+    def test_expired_receipt(self, app):
+        """测试过期回执无效"""
+        with app.app_context():
+            receipt = sign_receipt('loan-validation', 'digest', 1, ttl=-1)
+
+            assert not verify_receipt('loan-validation', receipt, 'digest', 1)
+
+
+class TestRuleEngine:
+    """测试声明式业务规则"""
+
+    RULES = {
+        'rules': [
+            {'id': 'credit-term', 'loan_purpose': 'credit', 'field': 'loan_term',
+             'require': {'max': 5}, 'msg': '信用贷款期限不能超过5年'},
+            {'id': 'big-amount', 'when': {'loan_amount': {'min': 1000000}}, 'field': 'industry_category',
+             'require': {'not_in': ['03']}, 'msg': '该行业不支持大额贷款'},
+        ]
+    }
+
+    def test_rules_grouped_by_purpose(self):
+        """测试规则按贷款目的分组，通配规则适用于所有贷款目的"""
+        rules = compile_rules(self.RULES)
+
+        assert [rule.rule_id for rule in rules.rules_for('credit')] == ['credit-term', 'big-amount']
+        assert [rule.rule_id for rule in rules.rules_for('tax')] == ['big-amount']
+
+    def test_evaluate(self):
+        """测试一次遍历返回所有错误并统计命中次数"""
+        rules = compile_rules(self.RULES)
+
+        errors = rules.evaluate({
+            'loan_purpose': 'credit', 'loan_term': '10',
+            'loan_amount': 2000000, 'industry_category': '03'
+        })
+
+        assert [error['field'] for error in errors] == ['loan_term', 'industry_category']
+        assert errors[0] == {'field': 'loan_term', 'msg': '信用贷款期限不能超过5年', 'type': 'business_rule'}
+        assert rules.evaluate({'loan_purpose': 'credit', 'loan_term': '3', 'loan_amount': 10}) == []
+        assert rules.stats()['hits'] == {'credit-term': 1, 'big-amount': 1}
+
+    def test_invalid_rules(self):
+        """测试规则格式错误"""
+        with pytest.raises(ValueError):
+            compile_rules({'rules': [{'id': 'x', 'field': 'loan_term', 'require': {'between': 1}, 'msg': 'x'}]})
+        with pytest.raises(ValueError):
+            compile_rules({'rules': [self.RULES['rules'][0], self.RULES['rules'][0]]})
+
+
+
+class TestNgram:
+    """测试企业名称 n-gram 分词"""
+
+    def test_text_grams(self):
+        """测试规范化后按相邻两个字符切分"""
+        assert text_grams('华为 技术') == {'华为', '为技', '技术'}
+        assert text_grams('ＡＢc') == {'ab', 'bc'}
+        assert text_grams('华') == {'华'}
+
+    def test_query_grams_skip_common_suffix(self):
+        """测试查询时忽略企业名称常见后缀"""
+        assert query_grams('华为有限公司') == sorted({'华为', '为有'})
+        assert query_grams('有限公司') == sorted({'有限', '限公', '公司'})
+
+
+class TestPagination:
+    """测试分页游标"""
+
+    def test_cursor_round_trip(self):
+        """测试游标编码与解码"""
+        cursor = encode_cursor(['2024-01-01T00:00:00', 42])
+
+        assert decode_cursor(cursor, 2) == ['2024-01-01T00:00:00', 42]
+
+    def test_invalid_cursor(self):
+        """测试无效游标"""
+        with pytest.raises(BadRequestException):
+            decode_cursor('not-a-cursor', 2)
+        with pytest.raises(BadRequestException):
+            decode_cursor(encode_cursor([1]), 2)
+
+
+class TestBenchmarkStats:
+    """测试基准测试统计与基线比较"""
+
+    def test_summarize(self):
+        """测试百分位延迟与吞吐量"""
+        latencies = [i / 1000 for i in range(1, 101)]
+        result = summarize(latencies, wall_seconds=2.0)
+
+        assert percentile([], 50) == 0.0
+        assert result['requests'] == 100
+        assert result['p50_ms'] == 50.0
+        assert result['p99_ms'] == 99.0
+        assert result['throughput_rps'] == 50.0
+
+    def test_compare(self):
+        """测试超过阈值的延迟增长和吞吐量下降视为回退"""
+        baseline = {'login': {'p50_ms': 10.0, 'throughput_rps': 100.0}}
+        thresholds = {'default': {'p50_ms': 0.25, 'throughput_rps': 0.2},
+                      'scenarios': {'login': {'p50_ms': 0.5}}}
+
+        within = {'login': {'errors': 0, 'p50_ms': 14.0, 'throughput_rps': 85.0}}
+        assert compare(within, baseline, thresholds) == []
+
+        regressed = {'login': {'errors': 0, 'p50_ms': 16.0, 'throughput_rps': 70.0},
+                     'new_scenario': {'errors': 2, 'p50_ms': 1.0}}
+        regressions = compare(regressed, baseline, thresholds)
+        assert len(regressions) == 3
+        assert regressions[-1].startswith('new_scenario')
+
+
+class TestRequestTiming:
+    """测试请求阶段计时与慢请求性能分析"""
+
+    def test_phase_accumulates(self, app):
+        """测试同名阶段累加，请求上下文之外不计时"""
+        with phase('outside'):
+            pass
+
+        with app.test_request_context():
+            from flask import g
+            g.request_timings = {}
+            with phase('db'):
+                pass
+            with phase('db'):
+                pass
+            assert list(g.request_timings) == ['db']
+
+        header = server_timing_header({'db': 0.0012, 'encode': 0.0005}, 0.003)
+        assert header == 'db;dur=1.20, encode;dur=0.50, total;dur=3.00'
+
+    def test_server_timing_header_off_in_production(self):
+        """测试生产配置默认不输出 Server-Timing 头，仍输出计时日志"""
+        from app.config.config import ProductionConfig
+
+        assert ProductionConfig.SERVER_TIMING_HEADER is False
+        assert ProductionConfig.REQUEST_TIMING_ENABLED is True
+
+    def test_slowest_profiles_keeps_n(self, tmp_path):
+        """测试只保留最慢的 N 个分析文件"""
+        profiles = SlowestProfiles(str(tmp_path), keep=2)
+
+        def save(path):
+            with open(path, 'w') as f:
+                f.write('profile')
+
+        assert profiles.offer(0.1, 'a.prof', save)
+        assert profiles.offer(0.3, 'b.prof', save)
+        assert profiles.offer(0.05, 'c.prof', save) is None
+        assert profiles.offer(0.2, 'd.prof', save)
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['b.prof', 'd.prof']
@@ -5,11 +5,12 @@ import request from "@/utils/request";
 
 /**
  * 验证数据并上传文件（不保存到数据库）
- * 同时返回财务图表数据
+ * 财务图表数据由 getFinancialData 单独获取并缓存，这里不再随响应返回
  * @param {FormData} formData - 表单数据（包含文件）
  * @returns {Promise}
  */
 export function validateAndUpload(formData) {
+  formData.append("include_financial_data", "false");
   return request({
     url: "/loan/apply",
     method: "post",
@@ -35,3 +36,72 @@ export function confirmLoan(formData) {
     },
   });
 }
+
+/**
+ * 获取财务图表数据
+ * 服务端返回 ETag，数据未变化时浏览器缓存协商返回304
+ * @returns {Promise}
+ */
+export function getFinancialData() {
+  return request({
+    url: "/loan/financial-data",
+    method: "get",
+  });
+}
+
+/**
+ * 创建分块上传会话（断点续传）
+ * @param {string} fileName - 文件名
+ * @param {number} fileSize - 文件总大小（字节）
+ * @returns {Promise}
+ */
+export function createUploadSession(fileName, fileSize) {
+  return request({
+    url: "/loan/uploads",
+    method: "post",
+    data: { file_name: fileName, file_size: fileSize },
+  });
+}
+
+/**
+ * 查询分块上传会话的已确认偏移量
+ * @param {string} uploadId - 会话ID
+ * @returns {Promise}
+ */
+export function getUploadSession(uploadId) {
+  return request({
+    url: `/loan/uploads/${uploadId}`,
+    method: "get",
+  });
+}
+
+/**
+ * 上传一个分块
+ * @param {string} uploadId - 会话ID
+ * @param {number} offset - 分块起始偏移量
+ * @param {Blob} chunk - 分块数据
+ * @returns {Promise}
+ */
+export function uploadChunk(uploadId, offset, chunk) {
+  return request({
+    url: `/loan/uploads/${uploadId}`,
+    method: "put",
+    params: { offset },
+    data: chunk,
+    headers: {
+      "Content-Type": "application/octet-stream",
+    },
+  });
+}
+
+/**
+ * 完成分块上传，之后在 validateAndUpload / confirmLoan 的表单中传 upload_id 代替文件
+ * @param {string} uploadId - 会话ID
+ * @returns {Promise}
+ */
+export function finalizeUpload(uploadId) {
+  return request({
+    url: `/loan/uploads/${uploadId}/finalize`,
+    method: "post",
+  });
+}
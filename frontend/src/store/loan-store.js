@@ -2,6 +2,7 @@
  * 贷款申请数据管理store
  */
 import { defineStore } from "pinia";
+import { getFinancialData } from "@/api/loan";
 
 export const useLoanStore = defineStore("loan", {
   state: () => ({
@@ -69,5 +70,22 @@ export const useLoanStore = defineStore("loan", {
     getFinancialData() {
       return this.financialData;
     },
+
+    /**
+     * 从服务器加载财务数据，已加载过时直接使用缓存
+     * 强制刷新时服务端按 ETag 协商，数据未变化只返回304
+     * @param {boolean} force - 是否强制重新请求
+     * @returns {Promise<Array>} 财务数据数组
+     */
+    async loadFinancialData(force = false) {
+      if (!force && this.financialData.length > 0) {
+        return this.financialData;
+      }
+      const response = await getFinancialData();
+      if (response.code === 0) {
+        this.setFinancialData(response.data.financial_data || []);
+      }
+      return this.financialData;
+    },
   },
 });
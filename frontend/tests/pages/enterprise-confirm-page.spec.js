@@ -1,11 +1,24 @@
 import { describe, it, expect, vi, beforeEach } from "vitest";
-import { mount } from "@vue/test-utils";
+import { mount, flushPromises } from "@vue/test-utils";
 import { createPinia, setActivePinia } from "pinia";
 import EnterpriseConfirmPage from "../../src/pages/enterprise-confirm-page.vue";
 import { useLoanStore } from "../../src/store/loan-store";
+import { getFinancialData } from "../../src/api/loan";
 
 vi.mock("../../src/api/loan", () => ({
   submitLoanApplication: vi.fn(),
+  confirmLoan: vi.fn(),
+  getFinancialData: vi.fn(() =>
+    Promise.resolve({
+      code: 0,
+      data: {
+        financial_data: [
+          { quarter: "2023Q1", profit: 100000, percentage: 5 },
+          { quarter: "2023Q2", profit: 120000, percentage: 6 },
+        ],
+      },
+    }),
+  ),
 }));
 
 describe("EnterpriseConfirmPage", () => {
@@ -30,10 +43,6 @@ describe("EnterpriseConfirmPage", () => {
       propProofType: "REAL_ESTATE",
       industryCategory: "MANUFACTURING",
       fileName: "test.pdf",
-      financialData: [
-        { quarter: "2023Q1", profit: 100000, percentage: 5 },
-        { quarter: "2023Q2", profit: 120000, percentage: 6 },
-      ],
     });
 
     wrapper = mount(EnterpriseConfirmPage, {
@@ -69,4 +78,10 @@ describe("EnterpriseConfirmPage", () => {
   it("应该显示财务图表组件", () => {
     expect(wrapper.findComponent({ name: "FinancialChart" })).toBeDefined();
   });
+
+  it("应该单独加载财务数据", async () => {
+    await flushPromises();
+    expect(getFinancialData).toHaveBeenCalled();
+    expect(loanStore.financialData).toHaveLength(2);
+  });
 });
@@ -1,6 +1,11 @@
 import { describe, it, expect, beforeEach, vi } from "vitest";
 import { setActivePinia, createPinia } from "pinia";
 import { useLoanStore } from "../../src/store/loan-store";
+import { getFinancialData } from "../../src/api/loan";
+
+vi.mock("../../src/api/loan", () => ({
+  getFinancialData: vi.fn(),
+}));
 
 describe("useLoanStore", () => {
   let store;
@@ -62,6 +67,21 @@ describe("useLoanStore", () => {
     expect(store.getFinancialData()).toEqual(financialData);
   });
 
+  it("财务数据应只请求一次并缓存", async () => {
+    const financialData = [{ quarter: "2023Q1", profit: 100000 }];
+    getFinancialData.mockResolvedValue({
+      code: 0,
+      data: { financial_data: financialData },
+    });
+
+    expect(await store.loadFinancialData()).toEqual(financialData);
+    expect(await store.loadFinancialData()).toEqual(financialData);
+    expect(getFinancialData).toHaveBeenCalledTimes(1);
+
+    await store.loadFinancialData(true);
+    expect(getFinancialData).toHaveBeenCalledTimes(2);
+  });
+
   it("应该将数据保存到sessionStorage", () => {
     const testData = {
       entName: "测试企业",